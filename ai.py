@@ -1,16 +1,441 @@
 from board import Board
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR, ROWS, COLS
+from copy import deepcopy
 from game import Game
-import board_configs
-import random
-import unittest
+from move_tables import NEIGHBOURS
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND
+import math
+import multiprocessing
+import time
+import zobrist
 
 
-# TO DO: Implement this function. The four lines currently implemented including the return are in place to make the
-# gameplay visualization work. Replace all of it with your own code for the function.
+SearchResult = namedtuple('SearchResult', ['score', 'board', 'depth', 'nodes', 'elapsed_ms', 'pv'])
 
+# The names of the searches Search can run: plain alpha-beta, and principal variation search (PVS/NegaScout), which
+# searches every move after the first with a null window and only searches it again with the full window if it turns
+# out to be better.
+SEARCH_ALGORITHMS = ('alphabeta', 'pvs')
 
-def minimax_alpha_beta(board, depth, alpha, beta, max_player, game, eval_params=None):
+# The half-width of the aspiration window iterative_deepening() centres on the previous iteration's score when asked
+# to, in evaluation units (one piece is worth 1.0 with the default weights).
+ASPIRATION_WINDOW = 1.0
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its deadline has passed or it is cancelled. The iteration that was running is abandoned.
+    """
+
+
+class Search:
+    # How many nodes are visited between two checks of the clock.
+    TIME_CHECK_INTERVAL = 256
+
+    # How many killer moves are remembered per ply.
+    KILLER_SLOTS = 2
+
+    def __init__(self, game, eval_params=None, tt=None, deadline=None, ordering=False, incremental=True,
+                 batch_leaves=False, tablebase=None, stats=None, algorithm='alphabeta', cancel=None):
+        """
+        Holds the state of one in-place alpha-beta search: its settings, the counters it reports, and what it learned
+        in earlier iterations.
+
+        Args:
+            game (Game): The game instance
+            eval_params (tuple, optional): A tuple of weights for evaluating the board state
+            tt (TranspositionTable, optional): A transposition table shared with other searches of the same game
+            deadline (float, optional): A time.perf_counter() value after which the search raises SearchTimeout
+            ordering (bool, optional): If True, moves are ordered by order_moves() instead of board-scan order
+            incremental (bool, optional): If True, leaves are scored by an IncrementalEvaluator that is updated as
+                moves are made instead of by evaluate(). The scores are identical
+            batch_leaves (bool, optional): If True, the sibling leaves below each depth-1 node are scored together by
+                batch_eval.batch_evaluate(), which requires NumPy. The scores are identical. Ignored when a tablebase
+                is given, since batched leaves are not probed
+            tablebase (Tablebase, optional): An endgame tablebase probed below the root whenever few enough pieces are
+                left. Its positions are scored by Tablebase.score() instead of being searched
+            stats (SearchStats, optional): Filled in with node, leaf and cutoff counts as the search runs
+            algorithm (str, optional): One of SEARCH_ALGORITHMS. 'pvs' returns the same score and best move as
+                'alphabeta', usually visiting fewer nodes when the first move searched is the best one
+            cancel (threading.Event, optional): An event another thread sets to stop the search early. It is checked
+                with the deadline, so it only takes effect while a deadline is set
+
+        Raises:
+            ValueError: If the algorithm is not one of SEARCH_ALGORITHMS
+        """
+
+        if algorithm not in SEARCH_ALGORITHMS:
+            raise ValueError(f'unknown search algorithm {algorithm!r}, expected one of {", ".join(SEARCH_ALGORITHMS)}')
+
+        self.game = game
+        self.eval_params = eval_params
+        self.tt = tt
+        self.deadline = deadline
+        self.cancel = cancel
+        self.ordering = ordering
+        self.incremental = incremental
+        self.pvs = algorithm == 'pvs'
+        self.evaluator = None
+        self.tablebase = tablebase
+        self.stats = stats
+        self.piece_count = 0
+        self.batch_eval = None
+        if batch_leaves and tablebase is None:
+            # Imported here so that NumPy is only loaded by searches that use it.
+            import batch_eval
+            self.batch_eval = batch_eval
+        self.nodes = 0
+        self.interior_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.re_searches = 0
+        self.pv = []
+        self.previous_pv = []
+        self.follow_pv = False
+        self.killers = {}
+        self.history = {}
+
+    def cutoff_rate(self):
+        """
+        Returns the fraction of searched interior nodes (nodes whose moves were looped over) that ended in a cutoff.
+
+        Returns:
+            float: Cutoffs divided by interior nodes, or 0.0 if there were none
+        """
+
+        return self.cutoffs / self.interior_nodes if self.interior_nodes else 0.0
+
+    def first_move_cutoff_rate(self):
+        """
+        Returns the fraction of cutoffs that happened on the first move searched, which measures how good the move
+        ordering is.
+
+        Returns:
+            float: First-move cutoffs divided by all cutoffs, or 0.0 if there were none
+        """
+
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def order_moves(self, descriptors, ply, first_move=None):
+        """
+        Sorts moves so that those most likely to cause a cutoff are searched first: the given first move (from the
+        principal variation or transposition table), then captures with the most captured pieces first, then this
+        ply's killer moves, then the remaining moves by their history score. Ties keep board-scan order.
+
+        Args:
+            descriptors (list): The (piece, move, captured_pieces, king_hopeful) descriptors to sort in place
+            ply (int): The distance from the root of the search
+            first_move (tuple, optional): The key of a move to search before all others
+
+        Returns:
+            list: The sorted descriptors
+        """
+
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(descriptor):
+            move_key = _move_key(descriptor)
+            if move_key == first_move:
+                return 0, 0
+            if descriptor[2]:
+                return 1, -len(descriptor[2])
+            if move_key in killers:
+                return 2, killers.index(move_key)
+            return 3, -history.get(move_key, 0)
+
+        descriptors.sort(key=priority)
+        return descriptors
+
+    def _record_cutoff(self, descriptor, move_key, index, depth, ply):
+        """
+        Updates the cutoff counters, and the killer and history tables when the move causing the cutoff is quiet.
+        """
+
+        self.cutoffs += 1
+        if self.stats is not None:
+            self.stats.count_cutoff(depth)
+        if index == 0:
+            self.first_move_cutoffs += 1
+
+        if not descriptor[2]:
+            killers = self.killers.setdefault(ply, [])
+            if move_key not in killers:
+                killers.insert(0, move_key)
+                del killers[self.KILLER_SLOTS:]
+            self.history[move_key] = self.history.get(move_key, 0) + depth * depth
+
+    def search(self, board, depth, alpha, beta, max_player, ply=0):
+        """
+        Searches like minimax_alpha_beta() but applies and reverts each move on the given board instead of copying it.
+        The board is left exactly as it was found, unless SearchTimeout is raised.
+
+        Args:
+            board (Board): The current board state
+            depth (int): The remaining depth to search
+            alpha (float): The best value that the maximizing player can guarantee
+            beta (float): The best value that the minimizing player can guarantee
+            max_player (bool): True if the maximizing player (Player 2) is to move
+            ply (int, optional): The distance from the root of the search
+
+        Returns:
+            tuple: A tuple (score, best_move) where best_move is the (piece, move, captured_pieces, king_hopeful)
+            descriptor of the best move, or None if there is no move to make, the depth is 0, or the score came from the
+            transposition table
+        """
+
+        self.nodes += 1
+        if (self.deadline is not None and self.nodes % self.TIME_CHECK_INTERVAL == 0 and
+                (time.perf_counter() > self.deadline or self.cancel is not None and self.cancel.is_set())):
+            raise SearchTimeout()
+        stats = self.stats
+        if stats is not None:
+            stats.count_node(ply)
+
+        game = self.game
+        tt = self.tt
+        tablebase = self.tablebase
+        if ply == 0:
+            if self.incremental:
+                self.evaluator = IncrementalEvaluator(board, game)
+            if tablebase is not None:
+                self.piece_count = (len(board.get_all_pieces(PLAYER1_PIECE_COLOR)) +
+                                    len(board.get_all_pieces(PLAYER2_PIECE_COLOR)))
+        evaluator = self.evaluator
+        if len(self.pv) <= ply:
+            self.pv.append([])
+        self.pv[ply] = []
+
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        if tt is not None:
+            key = board.hash ^ zobrist.SIDE_KEY if max_player else board.hash
+            entry = tt.probe(key)
+            if entry is not None:
+                tt_move = entry.best_move
+                # The root always searches so that it has a move to return.
+                if ply > 0 and entry.depth >= depth:
+                    if entry.bound == EXACT:
+                        return entry.score, None
+                    if entry.bound == LOWER_BOUND:
+                        alpha = max(alpha, entry.score)
+                    else:
+                        beta = min(beta, entry.score)
+                    if alpha >= beta:
+                        return entry.score, None
+
+        if tablebase is not None and ply > 0 and self.piece_count <= tablebase.max_pieces:
+            value = tablebase.probe(board, max_player)
+            if value is not None:
+                return tablebase.score(value, max_player), None
+
+        if depth == 0:
+            if stats is not None:
+                stats.leaves += 1
+                start = time.perf_counter()
+            if evaluator is not None:
+                score = evaluator.evaluate(*self.eval_params) if self.eval_params else evaluator.evaluate()
+            else:
+                score = evaluate(board, game, *self.eval_params) if self.eval_params else evaluate(board, game)
+            if stats is not None:
+                stats.record_phase('evaluate', time.perf_counter() - start)
+            if tt is not None:
+                tt.store(key, 0, score, EXACT, None)
+            return score, None
+
+        player = PLAYER2_PIECE_COLOR if max_player else PLAYER1_PIECE_COLOR
+        best_move, best_score = None, float('-inf') if max_player else float('inf')
+
+        # Moves from the previous iteration's principal variation go first, then the transposition table's best move.
+        pv_move = None
+        if self.follow_pv:
+            if ply < len(self.previous_pv):
+                pv_move = self.previous_pv[ply]
+            else:
+                self.follow_pv = False
+        first_move = pv_move if pv_move is not None else tt_move
+
+        # Without anything to order by, the moves are generated one at a time, so a cutoff skips generating the rest.
+        if self.ordering or first_move is not None or (depth == 1 and self.batch_eval is not None):
+            descriptors = game.generate_all_move_descriptors(board, player)
+            if self.ordering:
+                self.order_moves(descriptors, ply, first_move)
+            elif first_move is not None:
+                descriptors.sort(key=lambda descriptor: _move_key(descriptor) != first_move)
+        else:
+            descriptors = game.iter_all_move_descriptors(board, player)
+
+        leaf_scores = None
+        if depth == 1 and self.batch_eval is not None and descriptors:
+            leaf_scores, leaf_keys = self._score_leaves(board, descriptors, max_player)
+            if len(self.pv) <= ply + 1:
+                self.pv.append([])
+            self.pv[ply + 1] = []
+
+        for index, descriptor in enumerate(descriptors):
+            if index == 0:
+                self.interior_nodes += 1
+            piece, move, captured_pieces, _ = descriptor
+            move_key = _move_key(descriptor)
+            if pv_move is not None and move_key != pv_move:
+                self.follow_pv = False
+
+            if leaf_scores is not None:
+                scr = self._batched_leaf(leaf_keys[index], leaf_scores[index], alpha, beta, ply + 1)
+            else:
+                undo = game.make_move(board, piece, move, captured_pieces)
+                if evaluator is not None:
+                    evaluator.apply(undo)
+                self.piece_count -= len(captured_pieces)
+                if self.pvs and index > 0:
+                    scr = self._search_null_window(board, depth - 1, alpha, beta, max_player, ply + 1)
+                else:
+                    scr, _ = self.search(board, depth - 1, alpha, beta, not max_player, ply + 1)
+                self.piece_count += len(captured_pieces)
+                game.unmake_move(board, undo)
+                if evaluator is not None:
+                    evaluator.revert()
+
+            if max_player:
+                if scr > best_score:
+                    best_move, best_score = descriptor, scr
+                    self.pv[ply] = [move_key] + self.pv[ply + 1]
+
+                alpha = max(best_score, alpha)
+                if beta <= alpha:
+                    self._record_cutoff(descriptor, move_key, index, depth, ply)
+                    break
+            else:
+                if scr < best_score:
+                    best_move, best_score = descriptor, scr
+                    self.pv[ply] = [move_key] + self.pv[ply + 1]
+
+                beta = min(best_score, beta)
+                if alpha >= beta:
+                    self._record_cutoff(descriptor, move_key, index, depth, ply)
+                    break
+
+        if best_move is None:
+            best_score = float('-inf') if max_player else float('inf')
+
+        if tt is not None:
+            if best_score <= alpha_orig:
+                bound = UPPER_BOUND
+            elif best_score >= beta_orig:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            tt.store(key, depth, best_score, bound, _move_key(best_move) if best_move is not None else None)
+
+        return best_score, best_move
+
+    def _search_null_window(self, board, depth, alpha, beta, max_player, ply):
+        """
+        Searches the position after a move that is not the first of its node, for PVS. The position is first searched
+        with a null window just above alpha (below beta for the minimizing player), which only tells whether the move
+        is better than the best so far. If it is, and does not cause a cutoff, it is searched again with the full
+        window for its exact score.
+
+        Args:
+            max_player (bool): True if the maximizing player made the move, i.e. is to move at the parent node
+
+        Returns:
+            float: The score search() would have returned with the full window, or a bound that does not change the
+            parent's result
+        """
+
+        if max_player:
+            scr, _ = self.search(board, depth, alpha, math.nextafter(alpha, math.inf), False, ply)
+        else:
+            scr, _ = self.search(board, depth, math.nextafter(beta, -math.inf), beta, True, ply)
+        if alpha < scr < beta:
+            self.re_searches += 1
+            scr, _ = self.search(board, depth, alpha, beta, not max_player, ply)
+        return scr
+
+    def _score_leaves(self, board, descriptors, max_player):
+        """
+        Applies each move in turn to collect the positions it leads to, and scores them all in one batch_evaluate()
+        call.
+
+        Returns:
+            tuple: A tuple (scores, keys) holding the score of each resulting position and its transposition table key
+            (with the opponent to move), in the order of the descriptors
+        """
+
+        game = self.game
+        configs, keys = [], []
+        for piece, move, captured_pieces, _ in descriptors:
+            undo = game.make_move(board, piece, move, captured_pieces)
+            configs.append(board.to_board_config())
+            keys.append(board.hash if max_player else board.hash ^ zobrist.SIDE_KEY)
+            game.unmake_move(board, undo)
+
+        positions = self.batch_eval.encode_boards(configs)
+        scores = self.batch_eval.batch_evaluate(positions, *(self.eval_params or ()))
+        return scores.tolist(), keys
+
+    def _batched_leaf(self, key, score, alpha, beta, ply):
+        """
+        Does what search() does at a depth-0 node whose score was computed in advance by _score_leaves(): counts the
+        node, checks the deadline and consults and updates the transposition table.
+
+        Returns:
+            float: The score search() would have returned for the leaf
+        """
+
+        self.nodes += 1
+        if (self.deadline is not None and self.nodes % self.TIME_CHECK_INTERVAL == 0 and
+                (time.perf_counter() > self.deadline or self.cancel is not None and self.cancel.is_set())):
+            raise SearchTimeout()
+        if self.stats is not None:
+            self.stats.count_node(ply)
+            self.stats.leaves += 1
+
+        tt = self.tt
+        if tt is None:
+            return score
+
+        entry = tt.probe(key)
+        if entry is not None:
+            if entry.bound == EXACT:
+                return entry.score
+            if entry.bound == LOWER_BOUND:
+                alpha = max(alpha, entry.score)
+            else:
+                beta = min(beta, entry.score)
+            if alpha >= beta:
+                return entry.score
+        tt.store(key, 0, score, EXACT, None)
+        return score
+
+    def search_root(self, board, depth, alpha, beta, max_player):
+        """
+        Runs one iteration of the search from the root and prepares the principal variation it finds to order the moves
+        of the next iteration.
+
+        Args:
+            board (Board): The root board state. It is searched in place
+            depth (int): The depth to search to
+            alpha (float): The best value that the maximizing player can guarantee
+            beta (float): The best value that the minimizing player can guarantee
+            max_player (bool): True if the maximizing player (Player 2) is to move
+
+        Returns:
+            tuple: A tuple (score, best_move) as returned by search()
+        """
+
+        self.follow_pv = bool(self.previous_pv)
+        result = self.search(board, depth, alpha, beta, max_player)
+        self.previous_pv = self.pv[0]
+        return result
+
+
+def minimax_alpha_beta(board, depth, alpha, beta, max_player, game, eval_params=None, in_place=True, tt=None,
+                       ordering=False, workers=None, stats=None, algorithm='alphabeta'):
     """
         Executes the Minimax algorithm with Alpha-Beta pruning to determine the optimal move in a two-player game.
 
@@ -22,129 +447,334 @@ def minimax_alpha_beta(board, depth, alpha, beta, max_player, game, eval_params=
             max_player (bool): True if the current player is the maximizing player (AI), False if minimizing (human)
             game (Game): The game instance
             eval_params (tuple, optional): A tuple of weights for evaluating the board state.
+            in_place (bool, optional): If True (the default), the tree is walked with Game.make_move() and
+                Game.unmake_move() on the given board, and only the chosen child is copied. If False, the reference
+                implementation that deep-copies a board for every child is used. Both return the same result.
+            tt (TranspositionTable, optional): A transposition table to reuse results from earlier searches of the same
+                positions. Keep one table for the whole game so iterations and turns share it. Only used when
+                in_place is True.
+            ordering (bool, optional): If True, captures, killer moves and history-table moves are searched first.
+                The score is unchanged but, among equally scored moves, a different one may be returned. Only used
+                when in_place is True.
+            workers (int, optional): If given, the root moves are searched in parallel by this many worker processes
+                (see parallel_minimax_alpha_beta()). The result is the same as the serial search's. The workers search
+                without a transposition table, move ordering or PVS, so tt, ordering and algorithm cannot be combined
+                with it.
+            stats (SearchStats, optional): Filled in with diagnostics about the search: phase times always, and node,
+                leaf and cutoff counts when in_place is True. Ignored when workers is given
+            algorithm (str, optional): The search to run, one of SEARCH_ALGORITHMS: 'alphabeta' (the default) or
+                'pvs'. Both return the same result. Only used when in_place is True and workers is not given
 
         Returns:
             tuple: A tuple (evaluation, best_move) where:
                 - score (float): The score for the best move at this depth
                 - best_move (Board): The board state after the best move
-        """
 
+        Raises:
+            ValueError: If workers is combined with tt, ordering or an algorithm other than 'alphabeta'
+        """
 
+    if workers:
+        if tt is not None or ordering or algorithm != 'alphabeta':
+            raise ValueError('the parallel search (workers) does not support tt, ordering or algorithm')
+        return parallel_minimax_alpha_beta(board, depth, alpha, beta, max_player, game, eval_params, workers)
+    with stats.instrument(game) if stats is not None else nullcontext():
+        if not in_place:
+            return _minimax_alpha_beta_copy(board, depth, alpha, beta, max_player, game, eval_params, stats)
 
-    player = PLAYER2_PIECE_COLOR if max_player else PLAYER1_PIECE_COLOR
+        search = Search(game, eval_params, tt, ordering=ordering, stats=stats, algorithm=algorithm)
+        best_score, best_move = search.search(board, depth, alpha, beta, max_player)
+        return best_score, _apply_descriptor(board, best_move, game)
 
-    moves = game.generate_all_moves(board, player)
-    if depth == 0:
-        return (evaluate(board, game, *eval_params) if eval_params else evaluate(board,game)), board
-    
-    best_move, best_score = None, float('-inf') if max_player else float('inf')
-    
-  
-    
+def parallel_minimax_alpha_beta(board, depth, alpha, beta, max_player, game, eval_params=None, workers=None):
+    """
+    Executes minimax_alpha_beta() with the root moves split across a process pool. Each root move is searched by a
+    worker, and every finished worker publishes its exact score in shared memory. A worker starting on a move uses the
+    scores published so far to narrow its window. Scores of earlier moves in generation order are used as they are.
+    Scores of later moves are moved one step toward the worse side, because an earlier move that ties them still wins.
+    So the best move and score are the same as the serial search's.
 
-    #comparator = max if max_player else min
+    Args:
+        board (Board): The current board state
+        depth (int): The maximum depth to go to on the search tree
+        alpha (float): The best value that the maximizing player can guarantee
+        beta (float): The best value that the minimizing player can guarantee
+        max_player (bool): True if the current player is the maximizing player (AI), False if minimizing (human)
+        game (Game): The game instance
+        eval_params (tuple, optional): A tuple of weights for evaluating the board state
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs
 
-    #print(f"COUNTMOVES::{len(moves)}::DEPTH::{depth}")
-    for move in moves:
-        #print(f"DEPTH::{depth}::INDEX::{index}")
+    Returns:
+        tuple: A tuple (evaluation, best_move) in the same format as minimax_alpha_beta()
+    """
 
+    player = PLAYER2_PIECE_COLOR if max_player else PLAYER1_PIECE_COLOR
+    children = game.generate_all_moves(board, player)
+    if depth == 0 or not children:
+        return minimax_alpha_beta(board, depth, alpha, beta, max_player, game, eval_params)
 
-        scr, _ = minimax_alpha_beta(move, depth-1, alpha, beta, not max_player, game, eval_params)
-        #proj_score = evaluate(move, game, eval_params)
-        
-        #print(f"MINIMAX::/ SCORE: {scr}::{max_player}:::{depth}:: ")
+    root_scores = multiprocessing.Array('d', [math.nan] * len(children))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_root_worker, initargs=(root_scores,)) as executor:
+        futures = [executor.submit(_search_root_move, child, index, depth - 1, alpha, beta, max_player, eval_params)
+                   for index, child in enumerate(children)]
+        scores = [future.result() for future in futures]
 
-        #brd.print_board_config(brd.to_board_config())
-        #best_move, best_score = comparator((best_score, best_move), (scr, brd))
+    # Replay the serial root loop over the scores to pick the same move it would.
+    best_move, best_score = None, float('-inf') if max_player else float('inf')
+    for child, scr in zip(children, scores):
         if max_player:
             if scr > best_score:
-                best_move, best_score = move, scr
-
-            #best_move.print_board_config(best_move.to_board_config())
+                best_move, best_score = child, scr
             alpha = max(best_score, alpha)
             if beta <= alpha:
                 break
-        
-        elif not max_player:
-
+        else:
             if scr < best_score:
-                best_move, best_score = move, scr
-
+                best_move, best_score = child, scr
             beta = min(best_score, beta)
             if alpha >= beta:
                 break
-    
-    if best_move is None:
-        #return board
-    #     print('none')
-         best_move = board
-         best_score = float('-inf') if max_player else float('inf')
-
-    #     return (evaluate(board, game, *eval_params) if eval_params else evaluate(board,game)), best_move
 
     return best_score, best_move
 
-def find_moves(board, piece):
+_root_scores = None
 
-    possible = []
-    
-    incr_moves = [(piece.row + 1, piece.col + 1), (piece.row + 1, piece.col - 1)]
+def _init_root_worker(root_scores):
+    """
+    Gives a parallel root search worker access to the shared array of root move scores.
+    """
 
-    decr_moves = [(piece.row - 1, piece.col + 1), (piece.row - 1, piece.col - 1)]
+    global _root_scores
+    _root_scores = root_scores
 
+def _search_root_move(child, index, depth, alpha, beta, max_player, eval_params):
+    """
+    Searches one root move in a worker process, using the root scores published so far to narrow the window, and
+    publishes the score if it is exact.
 
-    king_moves = incr_moves + decr_moves
+    Returns:
+        float: The score of the root move, or a bound that proves it is not the best root move
+    """
 
-    if piece.king:
-        moves = king_moves
-    else:
-        moves = incr_moves if piece.color == PLAYER2_PIECE_COLOR else decr_moves
+    published = list(_root_scores)
+    for other, scr in enumerate(published):
+        if math.isnan(scr) or other == index:
+            continue
+        if max_player:
+            alpha = max(alpha, scr if other < index else math.nextafter(scr, -math.inf))
+        else:
+            beta = min(beta, scr if other < index else math.nextafter(scr, math.inf))
+
+    scr, _ = Search(Game(), eval_params).search(child, depth, alpha, beta, not max_player)
+    if alpha < scr < beta:
+        _root_scores[index] = scr
+    return scr
+
+def iterative_deepening(board, game, time_budget_ms, max_player=True, eval_params=None, tt=None, max_depth=64,
+                        ordering=True, book=None, tablebase=None, stats=None, algorithm='alphabeta',
+                        aspiration_window=None, progress=None, cancel=None):
+    """
+    Searches the board to increasing depths until the time budget runs out, and returns the best move of the deepest
+    iteration that completed. Each iteration searches the previous iteration's principal variation first. The first
+    iteration always completes so that there is a move to return.
 
-    opp_color = PLAYER2_PIECE_COLOR if piece.color == PLAYER1_PIECE_COLOR else PLAYER1_PIECE_COLOR
-    #print(f"FIND MOVES///:king:{piece.king}:", end = ' ')
-    #print(moves)
-    for move in moves:
+    With an aspiration window, each iteration after the first searches a narrow window centred on the previous
+    iteration's score, and searches again with the full window only if the score falls outside it.
 
-        if not move[0] < ROWS or not move[1] < COLS or not move[0] >= 0 or not move[1] >= 0:
-            #print(f"FIND MOVES///:OUT OF BOUNDS::: PIECE AT point({piece.row}, {piece.col}) couln't move to {move[0]}, {move[1]}  ")
-            continue
+    Args:
+        board (Board): The current board state. It is not modified
+        game (Game): The game instance
+        time_budget_ms (float): The wall-clock time the search may take, in milliseconds
+        max_player (bool, optional): True if the maximizing player (AI) is to move
+        eval_params (tuple, optional): A tuple of weights for evaluating the board state
+        tt (TranspositionTable, optional): A transposition table shared across iterations and turns of the game
+        max_depth (int, optional): The deepest iteration to run even if time remains
+        ordering (bool, optional): If True, moves are ordered with captures, killer moves and the history table
+        book (OpeningBook, optional): An opening book consulted before searching. When it has the position, its move
+            is played without searching, and the unused time budget is added to the book's `saved_ms`
+        tablebase (Tablebase, optional): An endgame tablebase probed by the search (see Search)
+        stats (SearchStats, optional): Filled in with diagnostics about the search, including the nodes of each
+            completed iteration
+        algorithm (str, optional): The search to run each iteration, one of SEARCH_ALGORITHMS
+        aspiration_window (float, optional): The half-width of the aspiration window, e.g. ASPIRATION_WINDOW. If
+            None (the default), every iteration searches the full window
+        progress (callable, optional): Called with a SearchResult after each completed iteration, as the final result
+            would be if the search stopped there
+        cancel (threading.Event, optional): An event another thread sets to stop the search early. The iteration
+            that is running is abandoned, except the first, and the result of the deepest completed one is returned
 
+    Returns:
+        SearchResult: A named tuple (score, board, depth, nodes, elapsed_ms, pv) holding the score and resulting board
+        of the chosen move, the depth of the deepest completed iteration, the nodes searched across all iterations
+        (including the abandoned one), the time taken, and the principal variation as (from, to) square pairs. For a
+        book move, the depth is the depth the book position was searched to and no nodes are searched
+    """
 
+    start = time.perf_counter()
+    if book is not None:
+        entry = book.probe(board, max_player)
+        if entry is not None:
+            player = PLAYER2_PIECE_COLOR if max_player else PLAYER1_PIECE_COLOR
+            for descriptor in game.generate_all_move_descriptors(board, player):
+                # The move is checked against the legal moves in case of a hash collision.
+                if _move_key(descriptor) == entry.move:
+                    new_board = _apply_descriptor(board, descriptor, game)
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    book.saved_ms += max(time_budget_ms - elapsed_ms, 0.0)
+                    return SearchResult(entry.score, new_board, entry.depth, 0, elapsed_ms, [entry.move])
+
+    search = Search(game, eval_params, tt, ordering=ordering, tablebase=tablebase, stats=stats, algorithm=algorithm,
+                    cancel=cancel)
+    search_board = deepcopy(board)
+    best_score, best_move, completed_depth = None, None, 0
+
+    with stats.instrument(game) if stats is not None else nullcontext():
+        for depth in range(1, max_depth + 1):
+            if depth > 1:
+                search.deadline = start + time_budget_ms / 1000
+            nodes = search.nodes
+            try:
+                if aspiration_window and best_score is not None and abs(best_score) != float('inf'):
+                    alpha, beta = best_score - aspiration_window, best_score + aspiration_window
+                    score, move = search.search_root(search_board, depth, alpha, beta, max_player)
+                    if not alpha < score < beta:
+                        search.re_searches += 1
+                        score, move = search.search_root(search_board, depth, float('-inf'), float('inf'),
+                                                         max_player)
+                else:
+                    score, move = search.search_root(search_board, depth, float('-inf'), float('inf'), max_player)
+            except SearchTimeout:
+                break
+            if stats is not None:
+                stats.nodes_by_iteration.append(search.nodes - nodes)
+
+            # The pieces in the descriptor keep moving in later iterations, so keep a snapshot of them.
+            best_score, best_move, completed_depth = score, game.copy(move), depth
+            if progress is not None:
+                progress(SearchResult(score, _apply_descriptor(board, best_move, game), depth, search.nodes,
+                                      (time.perf_counter() - start) * 1000, search.previous_pv[:depth]))
+            # Stop when there is nothing left to choose between or the game is decided within the horizon.
+            if move is None or abs(score) == float('inf') or time.perf_counter() - start >= time_budget_ms / 1000:
+                break
+            if cancel is not None and cancel.is_set():
+                break
 
-        spot = board.get_piece(move[0], move[1])
-        #print(f"FIND MOVES///:SPOT VALUE:::  ", end = ' ')
-        #print(f"SPOT:: {str(spot)}, OPP COLOR:: {str(opp_color)}, PIECE COLOR: {piece.color}")
-        #print(spot == 0)
-        #print(f"spot type {type(spot)} vs opp type: {type(opp_color)}")
-        #if hasattr(spot, 'color'):
-            #print("same type:")
-            #print(spot.color == opp_color)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return SearchResult(best_score, _apply_descriptor(board, best_move, game), completed_depth, search.nodes, elapsed_ms,
+                        search.previous_pv[:completed_depth])
 
+def _apply_descriptor(board, descriptor, game):
+    """
+    Builds the board that results from a move found by the in-place search, leaving the given board untouched.
 
-        if spot == 0:
-            #print(f"FIND MOVES///:NOT OCCUPPIED::: PIECE AT point({piece.row}, {piece.col}) can move to {move[0]}, {move[1]}  ")
+    Args:
+        board (Board): The board the move was found on
+        descriptor (tuple): A (piece, move, captured_pieces, king_hopeful) move descriptor, or None
+        game (Game): The game instance
 
+    Returns:
+        Board: A new board with the move applied, or the given board itself if the descriptor is None
+    """
 
-            possible.append(move)
-            continue
-        elif spot.color == opp_color:
-            #print(f"FIND MOVES///:OPP COLOR::: PIECE AT point({piece.row}, {piece.col}) couldn't move to {move[0]}, {move[1]}  ")
+    if descriptor is None:
+        return board
 
-            row_incr =  1 if piece.row < move[0] else -1
-            col_incr =  1 if piece.col < move[1] else -1
+    piece, move, captured_pieces, _ = descriptor
+    new_board = game.copy(board)
+    new_piece = new_board.get_piece(piece.row, piece.col)
+    return game.simulate_move(new_piece, move, new_board, captured_pieces)
 
-            new_mv = (move[0] + row_incr, move[1] + col_incr)
+def _move_key(descriptor):
+    """
+    Identifies a move independently of the Piece objects in its descriptor, so it can be stored in a transposition
+    table and matched against the moves generated for the same position later.
 
-            #print(f"FIND MOVES///:OPP COLOR::: try to go to {new_mv[0]}, {new_mv[1]}  ")
+    Args:
+        descriptor (tuple): A (piece, move, captured_pieces, king_hopeful) move descriptor
 
-            if not new_mv[0] < ROWS or not new_mv[1] < COLS or not new_mv[0] >= 0 or not new_mv[1] >= 0:
-                continue
-            #might return out of bounds
-            if board.get_piece(new_mv[0], new_mv[1]) == 0:
-                #print(f"FIND MOVES///:CAPTURE::: PIECE AT point({piece.row}, {piece.col}) can to {move[0]}, {move[1]}")
+    Returns:
+        tuple: The (row, col) the piece moves from followed by the (row, col) it moves to
+    """
+
+    piece, move, _, _ = descriptor
+    return (piece.row, piece.col), tuple(move)
+
+def _minimax_alpha_beta_copy(board, depth, alpha, beta, max_player, game, eval_params, stats=None):
+    """
+    The reference search used by minimax_alpha_beta(in_place=False). Every child position is a deep copy of its parent
+    built by Game.iter_all_moves(). With stats, the time spent evaluating the leaves is added to it.
+
+    Returns:
+        tuple: A tuple (score, best_move) in the same format as minimax_alpha_beta()
+    """
+
+    player = PLAYER2_PIECE_COLOR if max_player else PLAYER1_PIECE_COLOR
+
+    if depth == 0:
+        if stats is None:
+            return (evaluate(board, game, *eval_params) if eval_params else evaluate(board,game)), board
+        start = time.perf_counter()
+        score = evaluate(board, game, *eval_params) if eval_params else evaluate(board, game)
+        stats.record_phase('evaluate', time.perf_counter() - start)
+        return score, board
+
+    # Children are copied one at a time as they are visited, so a cutoff skips copying the rest.
+    moves = game.iter_all_moves(board, player)
+    best_move, best_score = None, float('-inf') if max_player else float('inf')
+
+    for move in moves:
+        scr, _ = _minimax_alpha_beta_copy(move, depth-1, alpha, beta, not max_player, game, eval_params, stats)
+        if max_player:
+            if scr > best_score:
+                best_move, best_score = move, scr
+            alpha = max(best_score, alpha)
+            if beta <= alpha:
+                break
+        else:
+            if scr < best_score:
+                best_move, best_score = move, scr
+            beta = min(best_score, beta)
+            if alpha >= beta:
+                break
+
+    if best_move is None:
+        best_move = board
+        best_score = float('-inf') if max_player else float('inf')
+
+    return best_score, best_move
+
+def find_moves(board, piece, cache=None):
+    """
+    Finds the single-hop moves and single captures available to a piece, using the precomputed neighbour and jump
+    tables for its color and king status.
+
+    Args:
+        board (Board): The current board state
+        piece (Piece): The piece to find moves for
+        cache (MoveCache, optional): A cache to look the moves up in, and to store them in when they are not there
+
+    Returns:
+        list: The (row, col) squares the piece can move to
+    """
+
+    if cache is not None:
+        # The last element keeps these keys apart from those of Game.find_moves(), which finds whole capture sequences.
+        key = (board.hash, piece.row, piece.col, False)
+        moves = cache.get(key)
+        if moves is None:
+            moves = tuple(find_moves(board, piece))
+            cache.put(key, moves)
+        return list(moves)
 
-                possible.append(new_mv)
-        #print('=' * 100)
+    possible = []
+    opp_color = PLAYER2_PIECE_COLOR if piece.color == PLAYER1_PIECE_COLOR else PLAYER1_PIECE_COLOR
+
+    for move, jump in NEIGHBOURS[piece.color, piece.king][piece.row][piece.col]:
+        spot = board.get_piece(move[0], move[1])
+        if spot == 0:
+            possible.append(move)
+        elif spot.color == opp_color and jump is not None and board.get_piece(jump[0], jump[1]) == 0:
+            possible.append(jump)
 
     return possible
 
@@ -200,14 +830,13 @@ def evaluate(board, game, pieces_weight=1.0, kings_weight=1.0, moves_weight=0.0,
 
     return score
 
-# TO DO: Implement this function.
 def counts(board, game, color):
     """
     Counts various metrics for pieces of a given color on the board.
 
     Args:
         board (Board): The current board state
-        game (Game): The game instance
+        game (Game): The game instance. Its move_cache, if it has one, caches the moves of each piece
         color (tuple): The RGB color of the pieces to evaluate, formatted as a tuple (e.g., (255, 240, 125)).
 
     Returns:
@@ -222,39 +851,158 @@ def counts(board, game, color):
     num_pieces = num_kings = num_moves = num_opportunitites = num_king_hopefuls = 0
     for i in range(ROWS):
         for j in range(COLS):
-            #print(f"COUNTS//: CHECKING POINT::: {i}, {j}")
             piece = board.get_piece(i, j)
-            #print('COUNTS//: PIECE:::', end=' ')
-            #print(piece)
-            # if hasattr(piece, 'color'):
-            #     print('COUNTS//: PIECE COLOR:::', end = ' ')
-            #     print(piece.color)
-            #     print(f"COLOR// COMPARING THE COLORS: {str(piece.color)} vs {str(color)}")
-            #     print(piece.color == color)
-
             if piece != 0 and piece.color == color:
-                #print("DID ENTER")
                 num_pieces += 1
                 if piece.king:
                     num_kings += 1
 
-                moves = find_moves(board, piece)
+                moves = find_moves(board, piece, game.move_cache)
                 num_moves += len(moves)
                 for move in moves:
-
-                    #print(f"COUNTS//:for move in moves::: PIECE AT point({piece.row}, {piece.col}) to ({move[0]}, {move[1]})")
                     if abs(move[0] - i) == 2:
-                        #print(f"JUMP::: PIECE AT point({piece.row}, {piece.col}) captured a piece and is at {move[0]}, {move[1]}  ")
-
                         num_opportunitites += 1
-                    #else:
-                        #print(f"NOTHING::: PIECE AT point({piece.row}, {piece.col}) to {move[0]}, {move[1]}  isn't a capture")
-
-                    if not piece.king and game.check_king_hopeful(piece,  move[0], piece.row, piece.col ):
+                    if not piece.king and game.check_king_hopeful(piece, move[0], piece.row, piece.col):
                         num_king_hopefuls += 1
-                
-    #print('',num_pieces, num_kings, num_moves, num_opportunitites, num_king_hopefuls )
-    return num_pieces, num_kings, num_moves, num_opportunitites, num_king_hopefuls 
+
+    return num_pieces, num_kings, num_moves, num_opportunitites, num_king_hopefuls
+
+# The squares whose contents find_moves() reads for a piece on a given square: the square itself and the squares one
+# and two diagonal steps away. When a square changes, only pieces on the squares "near" it can change their counts.
+NEARBY_SQUARES = [[[(row + row_step * distance, col + col_step * distance)
+                    for row_step in (-1, 1) for col_step in (-1, 1) for distance in (1, 2)
+                    if 0 <= row + row_step * distance < ROWS and 0 <= col + col_step * distance < COLS] + [(row, col)]
+                   for col in range(COLS)] for row in range(ROWS)]
+
+
+class IncrementalEvaluator:
+    def __init__(self, board, game):
+        """
+        Keeps the counts() terms of both colors for a board that is changed in place with Game.make_move() and
+        Game.unmake_move(). Each piece's contribution (piece, king, moves, capture opportunities and king hopefuls) is
+        stored per square, so after a move only the pieces near the moved and captured pieces are recomputed.
+
+        Args:
+            board (Board): The board to follow. It must only be changed through moves reported to apply()/revert()
+            game (Game): The game instance
+        """
+
+        self.board = board
+        self.game = game
+        self.contributions = {}
+        self.totals = {PLAYER1_PIECE_COLOR: [0, 0, 0, 0, 0], PLAYER2_PIECE_COLOR: [0, 0, 0, 0, 0]}
+        self.changes = []
+
+        for row in range(ROWS):
+            for col in range(COLS):
+                self._recompute(row, col)
+
+    def counts(self, color):
+        """
+        Returns the same tuple as counts(board, game, color) for the current board.
+
+        Args:
+            color (tuple): The RGB color of the pieces to evaluate, formatted as a tuple (e.g., (255, 240, 125)).
+
+        Returns:
+            tuple: (num_pieces, num_kings, num_moves, num_opportunities, num_king_hopefuls)
+        """
+
+        return tuple(self.totals[color])
+
+    def evaluate(self, pieces_weight=1.0, kings_weight=1.0, moves_weight=0.0, opportunities_weight=0.0,
+                 king_hopefuls_weight=0.0):
+        """
+        Returns the same score as evaluate(board, game, ...) for the current board.
+
+        Returns:
+            float: A score representing the board's goodness for Player 2
+        """
+
+        p1 = self.totals[PLAYER1_PIECE_COLOR]
+        p2 = self.totals[PLAYER2_PIECE_COLOR]
+
+        return ((p2[0] - p1[0]) * pieces_weight +
+                (p2[1] - p1[1]) * kings_weight +
+                (p2[2] - p1[2]) * moves_weight +
+                (p2[3] - p1[3]) * opportunities_weight +
+                (p2[4] - p1[4]) * king_hopefuls_weight)
+
+    def apply(self, undo):
+        """
+        Updates the counts after a move was made on the board.
+
+        Args:
+            undo (tuple): The undo record returned by the Game.make_move() call that made the move
+        """
+
+        piece, row, col, _, captured = undo
+        changed = {(row, col), (piece.row, piece.col)}
+        changed.update((captured_piece.row, captured_piece.col) for captured_piece in captured)
+
+        squares = set()
+        for changed_row, changed_col in changed:
+            squares.update(NEARBY_SQUARES[changed_row][changed_col])
+
+        self.changes.append([(square, self.contributions.get(square)) for square in squares])
+        for square in squares:
+            self._recompute(*square)
+
+    def revert(self):
+        """
+        Restores the counts from before the last apply(), once the move has been unmade on the board.
+        """
+
+        for square, contribution in self.changes.pop():
+            self._set(square, contribution)
+
+    def _recompute(self, row, col):
+        """
+        Recomputes the contribution of whatever is on a square.
+        """
+
+        piece = self.board.get_piece(row, col)
+        if piece == 0:
+            self._set((row, col), None)
+            return
+
+        moves = find_moves(self.board, piece)
+        num_opportunities = num_king_hopefuls = 0
+        for move in moves:
+            if abs(move[0] - row) == 2:
+                num_opportunities += 1
+            if not piece.king and self.game.check_king_hopeful(piece, move[0], piece.row, piece.col):
+                num_king_hopefuls += 1
+
+        self._set((row, col), (piece.color, 1, 1 if piece.king else 0, len(moves), num_opportunities,
+                               num_king_hopefuls))
+
+    def _set(self, square, contribution):
+        """
+        Replaces the contribution stored for a square and updates the totals.
+        """
+
+        old = self.contributions.get(square)
+        if old is contribution:
+            return
+        if old is not None:
+            totals = self.totals[old[0]]
+            totals[0] -= old[1]
+            totals[1] -= old[2]
+            totals[2] -= old[3]
+            totals[3] -= old[4]
+            totals[4] -= old[5]
+
+        if contribution is None:
+            del self.contributions[square]
+        else:
+            self.contributions[square] = contribution
+            totals = self.totals[contribution[0]]
+            totals[0] += contribution[1]
+            totals[1] += contribution[2]
+            totals[2] += contribution[3]
+            totals[3] += contribution[4]
+            totals[4] += contribution[5]
 
 def compare_boards(board1, board2):
     """
@@ -295,307 +1043,3 @@ def compare_boards(board1, board2):
                 return False
 
     return True
-
-
-class AiTest(unittest.TestCase):
-
-    def test_counts_with_boards(self):
-        for b in range(0, 6):  # num_configs is the number of board configs you have
-            config = getattr(board_configs, f'board_config{b + 1}')
-            board = Board(config)
-            game = Game()
-            colors = [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]
-
-            piece_counts = [[7, 13], [7, 12], [6, 12], [1, 11], [1, 10], [2, 12]]
-            king_counts  = [[2, 2], [2, 3], [3, 2], [1, 0], [1, 0], [1, 0]]
-            move_counts  = [[8, 17], [10, 14], [7, 11], [0, 12], [1, 12], [0, 12]]
-            opportunity_counts  = [[3, 4], [4, 3], [1, 3], [0, 0], [1, 0], [0, 1]]
-            king_hopeful_counts  = [[0, 0], [1, 0], [1, 0], [0, 2], [0, 2], [0, 2]]
-            print("CONFIG:" + '='*30)
-            board.print_board_config(board.to_board_config())
-
-            for c in range(2):
-
-                color = colors[c]
-                num_pieces, num_kings, num_moves, num_opportunities, num_king_hopefuls = counts(board, game, color)
-                self.assertEqual(num_pieces, piece_counts[b][c])
-                self.assertEqual(num_kings, king_counts[b][c])
-                self.assertEqual(num_moves, move_counts[b][c])
-                self.assertEqual(num_opportunities, opportunity_counts[b][c])
-                self.assertEqual(num_king_hopefuls, king_hopeful_counts[b][c])
-
-    def test_evaluate_1(self):
-
-        expected_scores = [6.0, 6.0, 5.0, 9.0, 8.0, 9.0, 8.0, 10.0, 10.0, 4.0, 3.0, 4.0]
-
-        game = Game()
-        for b in range(0, 12):  # num_configs is the number of board configs you have
-            config = getattr(board_configs, f'board_config{b + 1}')
-            board = Board(config)
-            score = evaluate(board, game)
-            self.assertEqual(score, expected_scores[b])
-
-    def test_evaluate_2(self):
-
-        expected_scores = [16.0, 8.0, 10.0, 23.0, 20.0, 24.0, 22.0, 25.0, 23.0, 9.0, 10.0, 13.0]
-
-        game = Game()
-        for b in range(0, 12):  # num_configs is the number of board configs you have
-            config = getattr(board_configs, f'board_config{b + 1}')
-            board = Board(config)
-            score = evaluate(board, game, moves_weight=1.0, opportunities_weight=1.0, king_hopefuls_weight=1.0)
-            self.assertEqual(score, expected_scores[b])
-
-    def test_evaluate_3(self):
-
-        expected_scores = [11.0, 7.25, 7.75, 15.5, 13.5, 16.0, 14.5, 16.75, 16.0, 6.25, 6.25, 8.25]
-
-        game = Game()
-        for b in range(0, 12):  # num_configs is the number of board configs you have
-            config = getattr(board_configs, f'board_config{b + 1}')
-            board = Board(config)
-            score = evaluate(board, game, pieces_weight=1.0, kings_weight=1.0, moves_weight=0.5, opportunities_weight=0.5, king_hopefuls_weight=0.25)
-            self.assertEqual(score, expected_scores[b])
-
-    def test_evaluate_4(self):
-
-        expected_scores = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-
-        game = Game()
-        for b in range(0, 12):  # num_configs is the number of board configs you have
-            config = getattr(board_configs, f'board_config{b + 1}')
-            board = Board(config)
-            score = evaluate(board, game, pieces_weight=0.0, kings_weight=0.0, moves_weight=0.0, opportunities_weight=0.0, king_hopefuls_weight=0.0)
-            self.assertEqual(score, expected_scores[b])
-
-    def test_minimax_alpha_beta_1(self):
-
-        game = Game()
-        board = Board()
-
-        value, new_board = minimax_alpha_beta(board, 1, float('-inf'), float('inf'), True, game)
-
-        true_board = Board(board_configs.board_config13)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_2(self):
-
-        game = Game()
-        board = Board()
-
-
-        value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), True, game)
-
-        true_board = Board(board_configs.board_config14)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_3(self):
-
-        game = Game()
-        board = Board()
-
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game)
-
-        true_board = Board(board_configs.board_config15)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_4(self):
-
-        game = Game()
-        board = Board()
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 1, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config16)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_5(self):
-
-        game = Game()
-        board = Board()
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config17)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_6(self):
-
-        game = Game()
-        board = Board()
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config18)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_7(self):
-
-        game = Game()
-        board = Board(board_configs.board_config1)
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config19)
-
- 
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_8(self):
-
-        game = Game()
-        board = Board(board_configs.board_config2)
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 4, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config20)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_9(self):
-
-        game = Game()
-        board = Board(board_configs.board_config3)
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config21)
- 
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_10(self):
-
-        game = Game()
-        board = Board(board_configs.board_config4)
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-        
-
-        true_board = Board(board_configs.board_config22)
-        
-
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_11(self):
-
-        game = Game()
-        board = Board(board_configs.board_config6)
-
-        eval_params = (0.0, 1.0, 1.0, 0.0, 0.25)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config23)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_12(self):
-
-        game = Game()
-        board = Board(board_configs.board_config7)
-
-        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
-        value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config24)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_13(self):
-
-        game = Game()
-        board = Board(board_configs.board_config9)
-
-        eval_params = (1.0, 1.0, 0.0, 0.0, 1.0)
-        value, new_board = minimax_alpha_beta(board, 4, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config25)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_14(self):
-
-        game = Game()
-        board = Board(board_configs.board_config10)
-
-        eval_params = (0.0, 0.0, 0.0, 0.0, 0.0)
-        value, new_board = minimax_alpha_beta(board, 4, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config26)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_15(self):
-
-        game = Game()
-        board = Board(board_configs.board_config11)
-
-        eval_params = (1.0, 1.0, 1.5, 1.5, 1.25)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config27)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-    def test_minimax_alpha_beta_16(self):
-
-        game = Game()
-        board = Board(board_configs.board_config12)
-
-        eval_params = (1.0, 1.0, 1.0, 1.0, 1.0)
-        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
-
-        true_board = Board(board_configs.board_config28)
-
-        self.assertTrue(compare_boards(new_board, true_board))
-
-
-tester = AiTest()
-
-tester.test_minimax_alpha_beta_1()
-print("TEST 1 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_2()
-print("TEST 2 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_3()
-print("TEST 3 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_4()
-print("TEST 4 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_5()
-print("TEST 5 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_6()
-print("TEST 6 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_7()
-print("TEST 7 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_8()
-print("TEST 8 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_9()
-print("TEST 9 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_10()
-print("TEST 10 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_11()
-print("TEST 11 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_12()
-print("TEST 12 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_13()
-print("TEST 13 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_14()
-print("TEST 14 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_15()
-print("TEST 15 PASSED: ++++++++++++++++++++++++++++++")
-tester.test_minimax_alpha_beta_16()
-print("TEST 16 PASSED: ++++++++++++++++++++++++++++++")
-
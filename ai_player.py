@@ -0,0 +1,288 @@
+from ai import _apply_descriptor, _move_key, iterative_deepening
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+from copy import deepcopy
+from game import Game
+from opening_book import position_key
+import threading
+import time
+
+
+class AIPlayer:
+    def __init__(self, time_budget_ms, max_player=True, eval_params=None, tt=None, book=None, tablebase=None,
+                 algorithm='alphabeta', move_cache=None):
+        """
+        Runs the AI's searches in a background thread so that the caller (the pygame frame loop) keeps running while
+        the AI thinks. A search is started with start(), its progress is read from `progress`, and its result is
+        collected with poll() once it has finished or been cancelled.
+
+        While the opponent is thinking, ponder() searches on their time. If the AI's last search predicted their reply,
+        the position after that reply is searched exactly as start() would search it, and when the reply is played
+        (a ponder hit) the search already under way becomes the AI's search, with the time it has pondered counted
+        against its budget. Otherwise, or when the opponent plays something else (a ponder miss), the positions
+        searched while pondering are only reused through the transposition table.
+
+        Args:
+            time_budget_ms (float): The wall-clock time each search may take, in milliseconds
+            max_player (bool, optional): True if the AI plays the maximizing player (Player 2)
+            eval_params (tuple, optional): A tuple of weights for evaluating the board state
+            tt (TranspositionTable, optional): A transposition table shared by the searches of a game. It must not
+                be used by the caller while a search is running or pondering. Pondering without one only helps on
+                ponder hits
+            book (OpeningBook, optional): An opening book consulted before searching
+            tablebase (Tablebase, optional): An endgame tablebase probed by the search
+            algorithm (str, optional): The search to run, one of ai.SEARCH_ALGORITHMS
+            move_cache (MoveCache, optional): A move generation cache for the searches, which may be shared with the
+                caller's Game
+        """
+
+        self.time_budget_ms = time_budget_ms
+        self.max_player = max_player
+        self.eval_params = eval_params
+        self.tt = tt
+        self.book = book
+        self.tablebase = tablebase
+        self.algorithm = algorithm
+        self.move_cache = move_cache
+        self.progress = None
+        self.moves = 0
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.ponder_saved_ms = 0.0
+        self._cancel = threading.Event()
+        self._thread = None
+        self._timer = None
+        self._result = None
+        self._error = None
+        self._last_result = None
+        self._pondering = False
+        self._ponder_board = None
+        self._ponder_start = 0.0
+
+    @property
+    def thinking(self):
+        """
+        True from start() until the result has been collected by poll(). Pondering is not thinking.
+        """
+
+        return self._thread is not None and not self._pondering
+
+    @property
+    def pondering(self):
+        """
+        True from ponder() until the next start() or stop().
+        """
+
+        return self._pondering
+
+    def start(self, board):
+        """
+        Starts searching a position in the background. The board is copied, so the caller may keep drawing it. If the
+        position is the one being pondered, the ponder search carries on as this search instead.
+
+        Args:
+            board (Board): The position to search, with the AI to move
+
+        Raises:
+            RuntimeError: If a search is already running or its result has not been collected
+        """
+
+        if self.thinking:
+            raise RuntimeError('the AI is already thinking')
+
+        self.moves += 1
+        if self._pondering:
+            self._pondering = False
+            if self._ponder_board is not None and self._ponder_board.to_board_config() == board.to_board_config():
+                self._ponder_hit()
+                return
+            self.ponder_misses += 1
+            self._stop_thread()
+
+        if self.tt is not None:
+            self.tt.new_search()
+        self._start_thread(deepcopy(board), self.max_player, self.time_budget_ms)
+
+    def ponder(self, board):
+        """
+        Starts searching on the opponent's time. Call it once the AI's move has been played, and start() as usual once
+        the opponent has replied. Pondering never ends on its own before start() or stop().
+
+        Args:
+            board (Board): The position after the AI's move, with the opponent to move
+
+        Raises:
+            RuntimeError: If a search is already running or its result has not been collected
+        """
+
+        if self._thread is not None:
+            raise RuntimeError('the AI is already thinking')
+
+        self._ponder_board = self._predicted_board(board)
+        if (self._ponder_board is not None and self.book is not None and
+                position_key(self._ponder_board, self.max_player) in self.book):
+            self._ponder_board = None  # The book answers the predicted position at once, so there is no time to save.
+        self._pondering = True
+        self._ponder_start = time.perf_counter()
+        if self.tt is not None:
+            self.tt.new_search()
+        if self._ponder_board is not None:
+            self._start_thread(deepcopy(self._ponder_board), self.max_player, float('inf'))
+        else:
+            # Without a predicted reply, search the opponent's position to fill the table for all of their replies.
+            self._start_thread(deepcopy(board), not self.max_player, float('inf'))
+
+    def ponder_hit_rate(self):
+        """
+        Returns the fraction of pondered moves on which the opponent played the predicted reply.
+
+        Returns:
+            float: Ponder hits divided by pondered moves, or 0.0 if nothing was pondered
+        """
+
+        pondered = self.ponder_hits + self.ponder_misses
+        return self.ponder_hits / pondered if pondered else 0.0
+
+    def saved_ms_per_move(self):
+        """
+        Returns the thinking time pondering saved, on average over all of the AI's moves.
+
+        Returns:
+            float: Milliseconds saved per move, or 0.0 if the AI has not moved
+        """
+
+        return self.ponder_saved_ms / self.moves if self.moves else 0.0
+
+    def cancel(self):
+        """
+        Asks the running search to stop. It returns the best move of the deepest iteration completed so far, which
+        poll() then delivers as usual. Pondering is not affected.
+        """
+
+        if not self._pondering:
+            self._cancel.set()
+
+    def poll(self):
+        """
+        Collects the result of the search if it has finished. Never blocks.
+
+        Returns:
+            SearchResult: The result of the search, once, or None while it is still running, while pondering or if
+            none was started
+
+        Raises:
+            Exception: Whatever the search raised, if it failed
+        """
+
+        if self._thread is None or self._pondering or self._thread.is_alive():
+            return None
+
+        self._thread = None
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._error is not None:
+            raise self._error
+        self._last_result = self._result
+        return self._result
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the running search has finished, then collects its result like poll().
+
+        Args:
+            timeout (float, optional): The most seconds to wait
+
+        Returns:
+            SearchResult: The result of the search, or None if it is still running after the timeout or pondering
+        """
+
+        if self._thread is not None and not self._pondering:
+            self._thread.join(timeout)
+        return self.poll()
+
+    def stop(self):
+        """
+        Cancels the running search or pondering, if any, and waits for it to finish, discarding its result.
+        """
+
+        self._pondering = False
+        self._last_result = None
+        self._stop_thread()
+
+    def _ponder_hit(self):
+        """
+        Turns the ponder search into the AI's search, giving it what is left of the time budget.
+        """
+
+        pondered_ms = (time.perf_counter() - self._ponder_start) * 1000
+        self.ponder_hits += 1
+        self.ponder_saved_ms += min(pondered_ms, self.time_budget_ms)
+        remaining_ms = self.time_budget_ms - pondered_ms
+        if remaining_ms <= 0:
+            self._cancel.set()
+        else:
+            self._timer = threading.Timer(remaining_ms / 1000, self._cancel.set)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _predicted_board(self, board):
+        """
+        Returns the position after the opponent's reply predicted by the principal variation of the last search, or
+        None if there is no prediction or it is not a legal move.
+        """
+
+        if self._last_result is None or len(self._last_result.pv) < 2:
+            return None
+        color = PLAYER1_PIECE_COLOR if self.max_player else PLAYER2_PIECE_COLOR
+        game = Game()
+        for descriptor in game.generate_all_move_descriptors(board, color):
+            if _move_key(descriptor) == self._last_result.pv[1]:
+                return _apply_descriptor(board, descriptor, game)
+        return None
+
+    def _start_thread(self, board, max_player, time_budget_ms):
+        """
+        Starts a search thread.
+        """
+
+        self.progress = None
+        self._result = self._error = None
+        self._cancel.clear()
+        self._thread = threading.Thread(target=self._run, args=(board, max_player, time_budget_ms), name='ai-search',
+                                        daemon=True)
+        self._thread.start()
+
+    def _stop_thread(self):
+        """
+        Cancels the search thread, if any, and waits for it to finish.
+        """
+
+        self._cancel.set()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _run(self, board, max_player, time_budget_ms):
+        """
+        The body of the search thread.
+        """
+
+        try:
+            # Ponder searches have no time budget to save by playing from the book.
+            book = self.book if time_budget_ms != float('inf') else None
+            self._result = iterative_deepening(board, Game(self.move_cache), time_budget_ms, max_player,
+                                               self.eval_params, self.tt, book=book, tablebase=self.tablebase,
+                                               algorithm=self.algorithm, progress=self._publish, cancel=self._cancel)
+        except Exception as error:
+            self._error = error
+
+    def _publish(self, result):
+        """
+        Records the result of a completed iteration as the search's progress. Replacing the attribute is atomic, so
+        the caller always reads a complete result.
+        """
+
+        self.progress = result
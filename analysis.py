@@ -0,0 +1,155 @@
+"""
+Batch analysis: searches many positions to a fixed depth in a process pool, for offline analysis of position sets such
+as the 8x8 board configurations exported from games. Positions are read lazily and results are streamed back in input
+order, with at most a bounded number of positions in flight, so arbitrarily long inputs run in constant memory.
+
+The command line reads one position per line, each a JSON 2-D board configuration as in board_configs.py, and writes
+one JSON result per position:
+
+    {"position":0,"score":1.25,"winner":null,"move":[2,1,3,0],"nodes":4121,"elapsed_ms":38.2}
+
+`move` is [from_row, from_col, to_row, to_col], or null if the side to move has no legal move. When the search finds
+that a side wins, whatever the other plays, `winner` is "player1" or "player2" and `score` is null (the search scores
+these positions -inf and +inf, which JSON cannot hold).
+
+Usage:
+    python analysis.py [--input FILE] [--output FILE] [--depth D] [--workers W] [--eval W,W,W,W,W] [--min-player]
+                       [--ordering]
+"""
+
+from ai import _move_key, Search
+from board import Board
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from game import Game
+from selfplay import bounded_map, parse_eval_params
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+
+# The result of analysing one position: its index in the input, the minimax score, the best move as
+# ((from_row, from_col), (to_row, to_col)) or None, the nodes searched and the search's wall-clock time.
+AnalysisResult = namedtuple('AnalysisResult', ['index', 'score', 'move', 'nodes', 'elapsed_ms'])
+
+PENDING_PER_WORKER = 4  # Positions in flight per worker: enough to keep it busy while results are collected.
+
+
+def analyse_position(index, board_config, depth, max_player=True, eval_params=None, ordering=False):
+    """
+    Searches one position to a fixed depth, as minimax_alpha_beta() would.
+
+    Args:
+        index (int): The index of the position in the input, returned in the result
+        board_config (list): A 2-D board configuration
+        depth (int): The depth of the search
+        max_player (bool, optional): True if the maximizing player (Player 2) is to move
+        eval_params (tuple, optional): A tuple of weights for evaluating the board state
+        ordering (bool, optional): Search the moves in a heuristic order. The score is the same, but among equally
+            scored moves another may be returned
+
+    Returns:
+        AnalysisResult: The score, best move and cost of the search
+    """
+
+    start = time.perf_counter()
+    search = Search(Game(), eval_params, ordering=ordering)
+    score, descriptor = search.search(Board(board_config), depth, float('-inf'), float('inf'), max_player)
+    move = _move_key(descriptor) if descriptor is not None else None
+    return AnalysisResult(index, score, move, search.nodes, (time.perf_counter() - start) * 1000)
+
+
+def analyse_positions(positions, depth, workers=None, max_player=True, eval_params=None, ordering=False,
+                      max_pending=None):
+    """
+    Analyses positions in a process pool and yields their results in input order, each as soon as it and the ones
+    before it are finished.
+
+    Args:
+        positions (iterable): 2-D board configurations. It is consumed lazily, so it may be a generator or a stream
+        depth (int): The depth of the searches
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs. With 1, the positions
+            are analysed in this process
+        max_player (bool, optional): True if the maximizing player (Player 2) is to move in every position
+        eval_params (tuple, optional): A tuple of weights for evaluating the board state
+        ordering (bool, optional): Search the moves in a heuristic order, see analyse_position()
+        max_pending (int, optional): The most positions submitted to the pool and not yet yielded. Defaults to
+            PENDING_PER_WORKER per worker
+
+    Yields:
+        AnalysisResult: One result per position
+    """
+
+    if workers == 1:
+        for index, board_config in enumerate(positions):
+            yield analyse_position(index, board_config, depth, max_player, eval_params, ordering)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    tasks = ((index, board_config, depth, max_player, eval_params, ordering)
+             for index, board_config in enumerate(positions))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from bounded_map(executor, analyse_position, tasks, max_pending or workers * PENDING_PER_WORKER)
+
+
+def _result_record(result):
+    """
+    Returns the JSON record of an analysis result, as documented at the top of the module.
+    """
+
+    winner = None
+    if not math.isfinite(result.score):
+        winner = 'player2' if result.score > 0 else 'player1'
+    return {'position': result.index, 'score': result.score if winner is None else None, 'winner': winner,
+            'move': [*result.move[0], *result.move[1]] if result.move is not None else None, 'nodes': result.nodes,
+            'elapsed_ms': round(result.elapsed_ms, 1)}
+
+
+def _read_positions(file):
+    """
+    Yields the board configurations of a file holding one JSON 2-D array per line, skipping blank lines.
+    """
+
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', help='file of positions, one JSON board configuration per line (default: standard '
+                                        'input)')
+    parser.add_argument('--output', help='file to write the results to (default: standard output)')
+    parser.add_argument('--depth', type=int, default=4, help='search depth')
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--eval', type=parse_eval_params, help='evaluation weights')
+    parser.add_argument('--min-player', action='store_true', help='Player 1 is to move (default: Player 2)')
+    parser.add_argument('--ordering', action='store_true', help='search the moves in a heuristic order')
+    args = parser.parse_args()
+
+    input_file = open(args.input) if args.input else sys.stdin
+    output = open(args.output, 'w') if args.output else sys.stdout
+    count = nodes = 0
+    start = time.perf_counter()
+    try:
+        for result in analyse_positions(_read_positions(input_file), args.depth, args.workers, not args.min_player,
+                                        args.eval, args.ordering):
+            output.write(json.dumps(_result_record(result), separators=(',', ':'), allow_nan=False) + '\n')
+            count += 1
+            nodes += result.nodes
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    print(f'{count} positions in {elapsed:.1f} s ({count / elapsed:.2f} positions/s, {nodes / elapsed:,.0f} nodes/s)',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
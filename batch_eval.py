@@ -0,0 +1,129 @@
+from constants import ROWS, COLS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only the batched evaluator needs it.
+    np = None
+
+
+# (row step, column step) of the four diagonal directions, with whether Player 1 and Player 2 men may move that way.
+# Player 1 moves toward row 0 and Player 2 toward row 7; kings move every way.
+_DIRECTIONS = [((-1, 1), True, False), ((-1, -1), True, False), ((1, 1), False, True), ((1, -1), False, True)]
+
+
+def encode_boards(boards):
+    """
+    Stacks boards into one array in the encoding of Board.to_board_config(): 0 for an empty square, 1 and 2 for Player
+    1 and Player 2 pieces, 11 and 22 for their kings.
+
+    Args:
+        boards (iterable): Board objects, or 2-D board configuration arrays
+
+    Returns:
+        numpy.ndarray: An N x 8 x 8 int8 array
+    """
+
+    _require_numpy()
+    configs = [board if isinstance(board, (list, tuple)) else board.to_board_config() for board in boards]
+    return np.array(configs, dtype=np.int8).reshape(len(configs), ROWS, COLS)
+
+
+def batch_counts(positions):
+    """
+    Computes the counts() terms of both players for a batch of positions with array operations.
+
+    Args:
+        positions (numpy.ndarray): An N x 8 x 8 array as returned by encode_boards()
+
+    Returns:
+        numpy.ndarray: An N x 2 x 5 int64 array. [:, 0] holds Player 1's terms and [:, 1] Player 2's, in the order
+        counts() returns them: pieces, kings, moves, capture opportunities, king hopefuls
+    """
+
+    _require_numpy()
+    positions = np.asarray(positions)
+
+    # Surround the boards with two rows and columns of off-board squares so that looking one or two squares away in
+    # any direction is a slice of the same array.
+    padded = np.full((len(positions), ROWS + 4, COLS + 4), -1, dtype=np.int8)
+    padded[:, 2:ROWS + 2, 2:COLS + 2] = positions
+    empty = padded == 0
+    rows = np.arange(ROWS).reshape(1, ROWS, 1)
+
+    result = np.zeros((len(positions), 2, 5), dtype=np.int64)
+    for side, (man, king, opponent_man, opponent_king, promotion_row) in enumerate(((1, 11, 2, 22, 0),
+                                                                                     (2, 22, 1, 11, ROWS - 1))):
+        men = positions == man
+        kings = positions == king
+        opponents = (padded == opponent_man) | (padded == opponent_king)
+
+        moves = opportunities = king_hopefuls = 0
+        for (row_step, col_step), player1_forward, player2_forward in _DIRECTIONS:
+            forward = player1_forward if side == 0 else player2_forward
+            movers = (men | kings) if forward else kings
+
+            steps = movers & _shift(empty, row_step, col_step)
+            jumps = movers & _shift(opponents, row_step, col_step) & _shift(empty, 2 * row_step, 2 * col_step)
+            num_jumps = jumps.sum(axis=(1, 2))
+            moves = moves + steps.sum(axis=(1, 2)) + num_jumps
+            opportunities = opportunities + num_jumps
+
+            # Only men can be king hopefuls, and only by landing on the far row.
+            if forward:
+                king_hopefuls = (king_hopefuls + (men & steps & (rows + row_step == promotion_row)).sum(axis=(1, 2)) +
+                                 (men & jumps & (rows + 2 * row_step == promotion_row)).sum(axis=(1, 2)))
+
+        result[:, side, 0] = (men | kings).sum(axis=(1, 2))
+        result[:, side, 1] = kings.sum(axis=(1, 2))
+        result[:, side, 2] = moves
+        result[:, side, 3] = opportunities
+        result[:, side, 4] = king_hopefuls
+
+    return result
+
+
+def batch_evaluate(positions, pieces_weight=1.0, kings_weight=1.0, moves_weight=0.0, opportunities_weight=0.0,
+                   king_hopefuls_weight=0.0):
+    """
+    Scores a batch of positions exactly like ai.evaluate() scores each of them.
+
+    Args:
+        positions (numpy.ndarray): An N x 8 x 8 array as returned by encode_boards()
+        pieces_weight (float): Weight for the difference in piece count
+        kings_weight (float): Weight for the difference in king count
+        moves_weight (float): Weight for the difference in available moves
+        opportunities_weight (float): Weight for the difference in capture opportunities
+        king_hopefuls_weight (float): Weight for the difference in king hopefuls.
+
+    Returns:
+        numpy.ndarray: The N scores, each representing the board's goodness for Player 2
+    """
+
+    terms = batch_counts(positions)
+    diffs = terms[:, 1] - terms[:, 0]
+
+    # Summed in the same order as evaluate() so that the floating-point results are identical.
+    return (diffs[:, 0] * pieces_weight +
+            diffs[:, 1] * kings_weight +
+            diffs[:, 2] * moves_weight +
+            diffs[:, 3] * opportunities_weight +
+            diffs[:, 4] * king_hopefuls_weight)
+
+
+def _shift(padded, row_step, col_step):
+    """
+    Returns an 8 x 8 view of a padded batch whose value at (row, col) is the value at (row + row_step,
+    col + col_step) of the board.
+    """
+
+    return padded[:, 2 + row_step:ROWS + 2 + row_step, 2 + col_step:COLS + 2 + col_step]
+
+
+def _require_numpy():
+    """
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+
+    if np is None:
+        raise ImportError('The batched evaluator requires NumPy (pip install numpy)')
@@ -0,0 +1,105 @@
+"""
+Measures leaf evaluation speed, in leaves scored per second, of ai.evaluate() one board at a time against
+batch_eval.batch_evaluate() on the same positions at once, and the effect of batching on a fixed-depth search.
+
+The leaves are every position one and two plies away from the board_configs positions and the starting position.
+The batched rate is given both including the time to encode the boards into an array and for already-encoded arrays.
+
+Usage:
+    python -m benchmarks.bench_batch_eval [--seconds S] [--depth D]
+
+Requires NumPy.
+"""
+
+from benchmarks.common import REPO_ROOT
+import argparse
+import sys
+import time
+
+
+EVAL_PARAMS = (1.0, 1.0, 0.5, 0.5, 0.25)
+
+
+def rate(function, count, seconds):
+    """
+    Calls a function repeatedly for roughly the given time.
+
+    Returns:
+        float: How many items per second were processed, `count` items being processed per call
+    """
+
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        function()
+        calls += 1
+    return calls * count / (time.perf_counter() - start)
+
+
+def measure(seconds, depth):
+    """
+    Times each way of scoring the benchmark leaves, then a search of every benchmark position with and without
+    batched leaves.
+
+    Args:
+        seconds (float): Roughly how long to spend on each evaluator
+        depth (int): The depth of the searches
+
+    Returns:
+        tuple: The number of leaves, and a dict of leaves per second keyed by evaluator and search seconds keyed by
+        search settings
+    """
+
+    sys.path.insert(0, REPO_ROOT)
+    import ai
+    import batch_eval
+    import board_configs
+    from board import Board
+    from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+    from game import Game
+
+    game = Game()
+    roots = [Board(config) for config in [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]]
+    leaves = []
+    for root in roots:
+        for color, other in ((PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR), (PLAYER2_PIECE_COLOR, PLAYER1_PIECE_COLOR)):
+            for child in game.generate_all_moves(root, color):
+                leaves.append(child)
+                leaves.extend(game.generate_all_moves(child, other))
+    positions = batch_eval.encode_boards(leaves)
+
+    results = {
+        'ai.evaluate': rate(lambda: [ai.evaluate(leaf, game, *EVAL_PARAMS) for leaf in leaves], len(leaves), seconds),
+        'batch_evaluate (with encoding)': rate(
+            lambda: batch_eval.batch_evaluate(batch_eval.encode_boards(leaves), *EVAL_PARAMS), len(leaves), seconds),
+        'batch_evaluate (encoded)': rate(lambda: batch_eval.batch_evaluate(positions, *EVAL_PARAMS), len(leaves),
+                                         seconds),
+    }
+
+    for batch_leaves in (False, True):
+        start = time.perf_counter()
+        for root in roots:
+            ai.Search(game, EVAL_PARAMS, ordering=True, batch_leaves=batch_leaves).search(
+                root, depth, float('-inf'), float('inf'), True)
+        results[f'search depth {depth}, batch_leaves={batch_leaves}'] = time.perf_counter() - start
+
+    return len(leaves), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=2.0, help='time to spend on each evaluator')
+    parser.add_argument('--depth', type=int, default=4, help='depth of the search comparison')
+    args = parser.parse_args()
+
+    num_leaves, results = measure(args.seconds, args.depth)
+    print(f'{num_leaves} leaves')
+    for name, value in results.items():
+        if name.startswith('search'):
+            print(f'{name:<34} {value:12.2f} s')
+        else:
+            print(f'{name:<34} {value:12,.0f} leaves/s')
+
+
+if __name__ == '__main__':
+    main()
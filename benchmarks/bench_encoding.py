@@ -0,0 +1,96 @@
+"""
+Measures how fast positions are converted to and from the packed 12-byte encoding, next to the nested-list
+configurations of Board.to_board_config(), and how fast a game record file is streamed through its memory-mapped reader.
+
+Usage:
+    python -m benchmarks.bench_encoding [--seconds S] [--positions N]
+"""
+
+from benchmarks.common import REPO_ROOT
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def rate(function, count, seconds):
+    """
+    Calls a function repeatedly for roughly the given time.
+
+    Returns:
+        float: How many items per second were processed, `count` items being processed per call
+    """
+
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        function()
+        calls += 1
+    return calls * count / (time.perf_counter() - start)
+
+
+def measure(seconds, num_positions):
+    """
+    Times each conversion over the board_configs positions, then writes a game record file of the requested size and
+    times reading it back.
+
+    Args:
+        seconds (float): Roughly how long to spend on each measurement
+        num_positions (int): The number of records in the streamed file
+
+    Returns:
+        dict: Positions per second, keyed by operation
+    """
+
+    sys.path.insert(0, REPO_ROOT)
+    import board_configs
+    import encoding
+    from bitboard import BitBoard
+    from board import Board
+
+    configs = [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]
+    results = {}
+    for board_class in (Board, BitBoard):
+        boards = [board_class(config) for config in configs]
+        board_list = [board.to_board_config() for board in boards]
+        packed = [encoding.encode(board) for board in boards]
+        name = board_class.__name__
+        results[f'to_board_config ({name})'] = rate(lambda: [board.to_board_config() for board in boards],
+                                                    len(boards), seconds)
+        results[f'{name}(board_config)'] = rate(lambda: [board_class(config) for config in board_list],
+                                                len(boards), seconds)
+        results[f'encode ({name})'] = rate(lambda: [encoding.encode(board) for board in boards], len(boards), seconds)
+        results[f'decode ({name})'] = rate(lambda: [encoding.decode(data, board_class) for data in packed],
+                                           len(boards), seconds)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'positions.ckgr')
+        boards = [BitBoard(config) for config in configs]
+        with encoding.GameRecordWriter(path) as writer:
+            for index in range(num_positions):
+                writer.write_position(boards[index % len(boards)], index // 100, index % 100, 1 + index % 2)
+
+        def stream():
+            with encoding.GameRecordReader(path) as reader:
+                for _ in reader:
+                    pass
+
+        results['stream records (mmap)'] = rate(stream, num_positions, seconds)
+        results['bytes per position on disk'] = os.path.getsize(path) / num_positions
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=1.0, help='time to spend on each measurement')
+    parser.add_argument('--positions', type=int, default=200000, help='records in the streamed file')
+    args = parser.parse_args()
+
+    for name, value in measure(args.seconds, args.positions).items():
+        unit = 'bytes' if name.startswith('bytes') else 'positions/s'
+        print(f'{name:<32} {value:14,.1f} {unit}')
+
+
+if __name__ == '__main__':
+    main()
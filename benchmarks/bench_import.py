@@ -0,0 +1,77 @@
+"""
+Measures the cold import time of the search engine: each run starts a fresh interpreter and times `import ai`.
+
+Usage:
+    python -m benchmarks.bench_import [--runs N] [--module NAME] [--compare GIT_REV]
+
+With --compare, the same measurement is repeated on a checkout of the given git revision (e.g. HEAD~1) so the numbers
+before and after a change can be read side by side.
+"""
+
+from benchmarks.common import checkout, REPO_ROOT
+from statistics import median
+import argparse
+import subprocess
+import sys
+
+
+# Output is discarded so that modules which print on import are not slowed down by the terminal.
+TIMER = '''
+import contextlib, io, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import {module}
+print(time.perf_counter() - start)
+'''
+
+
+def time_import(directory, module, runs):
+    """
+    Times importing a module in fresh interpreters.
+
+    Args:
+        directory (str): The directory to import the module from
+        module (str): The name of the module to import
+        runs (int): The number of fresh interpreters to start
+
+    Returns:
+        list: The import time of each run, in seconds
+    """
+
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(module=module)], cwd=directory, check=True,
+                                capture_output=True, text=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return times
+
+
+def report(label, times):
+    """
+    Prints the median, fastest and slowest of a set of import times.
+
+    Args:
+        label (str): What was measured
+        times (list): Import times in seconds
+    """
+
+    print(f'{label:<12} median {median(times) * 1000:10.1f} ms   min {min(times) * 1000:10.1f} ms   '
+          f'max {max(times) * 1000:10.1f} ms   ({len(times)} runs)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start per measurement')
+    parser.add_argument('--module', default='ai', help='the engine module to import')
+    parser.add_argument('--compare', metavar='GIT_REV', help='also measure this git revision')
+    args = parser.parse_args()
+
+    if args.compare:
+        with checkout(args.compare) as directory:
+            report(args.compare, time_import(directory, args.module, args.runs))
+
+    report('working tree', time_import(REPO_ROOT, args.module, args.runs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures the memory cost of a fixed-depth search: peak RSS of the process, peak memory traced by tracemalloc, and how
+many Piece and MoveNode objects are created per searched node. Each board backend is measured in a fresh interpreter so
+that peak RSS is not shared between runs.
+
+Usage:
+    python -m benchmarks.bench_memory [--depth D] [--compare GIT_REV]
+
+With --compare, the same measurement is repeated on a checkout of the given git revision (e.g. HEAD~1).
+"""
+
+from benchmarks.common import checkout, REPO_ROOT
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+
+def measure(root, board_class_name, depth):
+    """
+    Searches the starting position and board_config1 to a fixed depth and records the memory it takes.
+
+    Args:
+        root (str): The directory to import the engine from
+        board_class_name (str): 'Board' or 'BitBoard'
+        depth (int): The search depth
+
+    Returns:
+        dict: peak_rss_kb, traced_peak_kb, nodes, and objects_per_node (Piece and MoveNode objects created per node)
+    """
+
+    sys.path.insert(0, root)
+    import ai
+    import bitboard
+    import board
+    import board_configs
+    import move_node
+    import piece
+    from game import Game
+
+    # Every Piece and MoveNode goes through __new__, whether it is built directly or copied by deepcopy.
+    created = {'objects': 0}
+
+    def counting_new(cls, *args, **kwargs):
+        created['objects'] += 1
+        return object.__new__(cls)
+
+    piece.Piece.__new__ = staticmethod(counting_new)
+    move_node.MoveNode.__new__ = staticmethod(counting_new)
+
+    board_class = bitboard.BitBoard if board_class_name == 'BitBoard' else board.Board
+    game = Game()
+    created['objects'] = 0
+
+    tracemalloc.start()
+    nodes = 0
+    for config in (None, board_configs.board_config1):
+        search = ai.Search(game, (1.0, 1.0, 0.5, 0.5, 0.25))
+        search.search(board_class(config), depth, float('-inf'), float('inf'), True)
+        nodes += search.nodes
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'traced_peak_kb': traced_peak // 1024,
+        'nodes': nodes,
+        'objects_per_node': created['objects'] / nodes,
+    }
+
+
+def run(root, board_class_name, depth):
+    """
+    Runs measure() in a fresh interpreter and returns its results.
+    """
+
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_memory', '--root', root, '--board',
+                             board_class_name, '--depth', str(depth)], cwd=REPO_ROOT, check=True, capture_output=True,
+                            text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(label, board_class_name, results):
+    """
+    Prints one line of results.
+    """
+
+    print(f'{label:<12} {board_class_name:<8} peak RSS {results["peak_rss_kb"]:8,} KB   '
+          f'traced peak {results["traced_peak_kb"]:8,} KB   nodes {results["nodes"]:7,}   '
+          f'Piece/MoveNode objects per node {results["objects_per_node"]:8.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=4, help='search depth')
+    parser.add_argument('--compare', metavar='GIT_REV', help='also measure this git revision')
+    parser.add_argument('--root', help=argparse.SUPPRESS)
+    parser.add_argument('--board', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.root:
+        # Measuring in a fresh interpreter: print machine-readable results for the parent process.
+        print(json.dumps(measure(args.root, args.board, args.depth)))
+        return
+
+    for board_class_name in ('Board', 'BitBoard'):
+        if args.compare:
+            with checkout(args.compare) as directory:
+                report(args.compare, board_class_name, run(directory, board_class_name, args.depth))
+        report('working tree', board_class_name, run(REPO_ROOT, board_class_name, args.depth))
+
+
+if __name__ == '__main__':
+    main()
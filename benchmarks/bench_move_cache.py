@@ -0,0 +1,77 @@
+"""
+Measures what a MoveCache does to search speed: iterative deepening with a transposition table (the in-place search the
+AI plays with) and the copying minimax_alpha_beta() search (whose evaluate() calls counts()), over the starting
+position and board_config1 to board_config28, with and without a cache. Each variant is run several times, alternating,
+and its fastest run is kept; the results of every variant are checked to be the same.
+
+Usage:
+    python -m benchmarks.bench_move_cache [--depth D] [--copy-depth D] [--size N] [--rounds R]
+"""
+
+from benchmarks.common import REPO_ROOT
+import argparse
+import sys
+import time
+
+
+EVAL_PARAMS = (1.0, 1.0, 0.5, 0.5, 0.25)
+
+
+def measure(depth, copy_depth, size, rounds):
+    """
+    Times both searches with and without a cache.
+
+    Returns:
+        dict: (seconds, hit rate, results) per (search, cached), the hit rate being None without a cache
+    """
+
+    sys.path.insert(0, REPO_ROOT)
+    import ai
+    import board_configs
+    from board import Board
+    from game import Game
+    from move_cache import MoveCache
+    from transposition import TranspositionTable
+
+    configs = [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]
+
+    def deepening(game):
+        return [ai.iterative_deepening(Board(config), game, float('inf'), True, EVAL_PARAMS, TranspositionTable(),
+                                       max_depth=depth).pv for config in configs]
+
+    def copying(game):
+        return [ai.minimax_alpha_beta(Board(config), copy_depth, float('-inf'), float('inf'), True, game, EVAL_PARAMS,
+                                      in_place=False)[0] for config in configs]
+
+    measurements = {}
+    for _ in range(rounds):
+        for name, search in (('iterative deepening', deepening), ('copying minimax', copying)):
+            for cached in (False, True):
+                cache = MoveCache(size) if cached else None
+                start = time.perf_counter()
+                results = search(Game(cache))
+                seconds = time.perf_counter() - start
+                best = measurements.get((name, cached), (float('inf'),))[0]
+                measurements[name, cached] = (min(seconds, best), cache.hit_rate() if cached else None, results)
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=5, help='depth of the iterative deepening searches')
+    parser.add_argument('--copy-depth', type=int, default=3, help='depth of the copying minimax searches')
+    parser.add_argument('--size', type=int, default=1 << 16, help='entries of the move cache')
+    parser.add_argument('--rounds', type=int, default=5, help='runs of each variant')
+    args = parser.parse_args()
+
+    measurements = measure(args.depth, args.copy_depth, args.size, args.rounds)
+    for (name, cached), (seconds, hit_rate, results) in measurements.items():
+        uncached_seconds, _, uncached_results = measurements[name, False]
+        line = f'{name:<20} {"cache" if cached else "no cache":<9} {seconds:6.2f} s {seconds / uncached_seconds - 1:+7.1%}'
+        if cached:
+            line += f'  hit rate {hit_rate:.1%}, same results: {results == uncached_results}'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Measures move generation speed, in moves generated per second, over the board_configs positions and the starting
+position, for each move generator:
+
+- Game.find_moves(), which the search uses to build children (including multi-hop captures),
+- Game.find_moves_tree(), the MoveNode tree implementation it replaced (when the tree has it), and
+- ai.find_moves(), which counts() and evaluate() use for single moves and single jumps.
+
+Usage:
+    python -m benchmarks.bench_movegen [--seconds S] [--compare GIT_REV]
+
+With --compare, the same measurement is repeated on a checkout of the given git revision (e.g. HEAD~1).
+"""
+
+from benchmarks.common import checkout, REPO_ROOT
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+
+def measure(root, seconds):
+    """
+    Generates the moves of every piece in every benchmark position, repeatedly, for each move generator.
+
+    Args:
+        root (str): The directory to import the engine from
+        seconds (float): Roughly how long to spend on each move generator
+
+    Returns:
+        dict: Moves generated per second, keyed by move generator name
+    """
+
+    sys.path.insert(0, root)
+    import ai
+    import board_configs
+    from bitboard import BitBoard
+    from board import Board
+    from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+    from game import Game
+
+    game = Game()
+    configs = [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]
+
+    results = {}
+    for board_class in (Board, BitBoard):
+        boards = [board_class(config) for config in configs]
+        positions = [(board, piece) for board in boards
+                     for color in (PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR) for piece in board.get_all_pieces(color)]
+
+        generators = [('Game.find_moves', game.find_moves), ('ai.find_moves', ai.find_moves)]
+        if hasattr(game, 'find_moves_tree'):
+            generators.insert(1, ('Game.find_moves_tree', game.find_moves_tree))
+        for name, find_moves in generators:
+            moves = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                for board, piece in positions:
+                    moves += len(find_moves(board, piece))
+            results[f'{name} ({board_class.__name__})'] = moves / (time.perf_counter() - start)
+    return results
+
+
+def report(label, results):
+    """
+    Prints the moves per second of each move generator.
+
+    Args:
+        label (str): What was measured
+        results (dict): Moves generated per second, keyed by move generator name
+    """
+
+    for name, rate in results.items():
+        print(f'{label:<12} {name:<34} {rate:12,.0f} moves/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=2.0, help='time to spend on each move generator')
+    parser.add_argument('--compare', metavar='GIT_REV', help='also measure this git revision')
+    parser.add_argument('--root', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.root:
+        # Measuring another tree: print machine-readable results for the parent process.
+        print(json.dumps(measure(args.root, args.seconds)))
+        return
+
+    if args.compare:
+        with checkout(args.compare) as directory:
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_movegen', '--root', directory,
+                                     '--seconds', str(args.seconds)], cwd=REPO_ROOT, check=True,
+                                    capture_output=True, text=True).stdout
+            report(args.compare, json.loads(output.strip().splitlines()[-1]))
+
+    report('working tree', measure(REPO_ROOT, args.seconds))
+
+
+if __name__ == '__main__':
+    main()
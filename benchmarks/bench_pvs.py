@@ -0,0 +1,122 @@
+"""
+Compares the nodes visited by plain alpha-beta and principal variation search (PVS), and the effect of aspiration
+windows on iterative deepening, checking that every variant finds the same move and score.
+
+- Fixed depth: the positions and depths of the AiTest minimax_alpha_beta tests, each searched EXTRA plies deeper, with
+  and without move ordering.
+- Iterative deepening: the starting position and board_config1 to board_config12 searched to a fixed depth with a
+  transposition table, with and without an aspiration window.
+
+Usage:
+    python -m benchmarks.bench_pvs [--extra E] [--depth D] [--window W]
+"""
+
+from benchmarks.common import REPO_ROOT
+import argparse
+import sys
+import time
+
+
+# (board_config number or None for the starting position, depth, eval_params) of the minimax_alpha_beta tests.
+TEST_CASES = [
+    (None, 1, None), (None, 2, None), (None, 3, None),
+    (None, 1, (1.0, 1.0, 0.5, 0.5, 0.25)), (None, 2, (1.0, 1.0, 0.5, 0.5, 0.25)), (None, 3, (1.0, 1.0, 0.5, 0.5, 0.25)),
+    (1, 3, (1.0, 1.0, 0.5, 0.5, 0.25)), (2, 4, (1.0, 1.0, 0.5, 0.5, 0.25)), (3, 3, (1.0, 1.0, 0.5, 0.5, 0.25)),
+    (4, 3, (1.0, 1.0, 0.5, 0.5, 0.25)), (6, 3, (0.0, 1.0, 1.0, 0.0, 0.25)), (7, 2, (1.0, 1.0, 0.5, 0.5, 0.25)),
+    (9, 4, (1.0, 1.0, 0.0, 0.0, 1.0)), (10, 4, (0.0, 0.0, 0.0, 0.0, 0.0)), (11, 3, (1.0, 1.0, 1.5, 1.5, 1.25)),
+    (12, 3, (1.0, 1.0, 1.0, 1.0, 1.0)),
+]
+EVAL_PARAMS = (1.0, 1.0, 0.5, 0.5, 0.25)
+
+
+def measure_fixed_depth(extra, ordering):
+    """
+    Searches the test cases with each algorithm.
+
+    Returns:
+        dict: (nodes, seconds, results) per algorithm, where results lists the (score, move key) of each case
+    """
+
+    sys.path.insert(0, REPO_ROOT)
+    import ai
+    import board_configs
+    from board import Board
+    from game import Game
+
+    game = Game()
+    measurements = {}
+    for algorithm in ai.SEARCH_ALGORITHMS:
+        nodes, results = 0, []
+        start = time.perf_counter()
+        for config, depth, eval_params in TEST_CASES:
+            board = Board(getattr(board_configs, f'board_config{config}') if config else None)
+            search = ai.Search(game, eval_params, ordering=ordering, algorithm=algorithm)
+            score, move = search.search(board, depth + extra, float('-inf'), float('inf'), True)
+            nodes += search.nodes
+            results.append((score, ai._move_key(move) if move is not None else None))
+        measurements[algorithm] = nodes, time.perf_counter() - start, results
+    return measurements
+
+
+def measure_iterative_deepening(depth, window):
+    """
+    Runs iterative deepening to a fixed depth with each algorithm, with and without an aspiration window.
+
+    Returns:
+        dict: (nodes, seconds, results) per (algorithm, window), where results lists the (score, board config) of
+        each position
+    """
+
+    sys.path.insert(0, REPO_ROOT)
+    import ai
+    import board_configs
+    from board import Board
+    from game import Game
+    from transposition import TranspositionTable
+
+    game = Game()
+    configs = [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(12)]
+    measurements = {}
+    for algorithm in ai.SEARCH_ALGORITHMS:
+        for aspiration_window in (None, window):
+            nodes, results = 0, []
+            start = time.perf_counter()
+            for config in configs:
+                result = ai.iterative_deepening(Board(config), game, float('inf'), True, EVAL_PARAMS,
+                                                TranspositionTable(), max_depth=depth, algorithm=algorithm,
+                                                aspiration_window=aspiration_window)
+                nodes += result.nodes
+                results.append((result.score, result.board.to_board_config()))
+            measurements[algorithm, aspiration_window] = nodes, time.perf_counter() - start, results
+    return measurements
+
+
+def report(label, measurements, baseline):
+    """
+    Prints the nodes and time of each variant, the node savings against the baseline variant, and whether each variant
+    found the same scores and moves as the baseline.
+    """
+
+    base_nodes, _, base_results = measurements[baseline]
+    for name, (nodes, seconds, results) in measurements.items():
+        scores = sum(result[0] == base[0] for result, base in zip(results, base_results))
+        moves = sum(result == base for result, base in zip(results, base_results))
+        print(f'{label:<34} {str(name):<22} {nodes:9,} nodes {1 - nodes / base_nodes:+7.1%} saved {seconds:6.2f} s  '
+              f'same score {scores}/{len(results)}, same move {moves}/{len(results)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--extra', type=int, default=2, help='plies added to the depth of each test case')
+    parser.add_argument('--depth', type=int, default=7, help='depth of the iterative deepening comparison')
+    parser.add_argument('--window', type=float, default=1.0, help='aspiration window half-width')
+    args = parser.parse_args()
+
+    for ordering in (False, True):
+        report(f'fixed depth +{args.extra}, ordering={ordering}', measure_fixed_depth(args.extra, ordering), 'alphabeta')
+    report(f'iterative deepening to depth {args.depth}', measure_iterative_deepening(args.depth, args.window),
+           ('alphabeta', None))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Runs the engine's benchmark suite over the starting position and every position in board_configs.py, and checks the
+results against a stored baseline:
+
+- move generation: Game.generate_all_moves() for both colors, in moves generated per second,
+- counts() and evaluate(): calls per second,
+- minimax_alpha_beta() to a fixed depth: searches per second and nodes per second,
+- peak memory of the searches: traced Python allocations and the process's peak RSS.
+
+Usage:
+    python -m benchmarks.bench_suite [--seconds S] [--depth D] [--baseline FILE] [--save-baseline]
+                                     [--threshold F] [--metric-threshold NAME=F ...]
+
+Each metric is compared with the baseline file (benchmarks/baseline.json by default). A rate more than the threshold
+below its baseline, or a memory figure more than the threshold above it, is a regression, and the command exits with
+status 1. --save-baseline stores the current results as the new baseline instead. Baselines are only comparable on the
+machine they were recorded on, so the default baseline file is not part of the repository: record it locally, from the
+commit to compare against, before checking a change.
+"""
+
+from benchmarks.common import REPO_ROOT
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, 'benchmarks', 'baseline.json')
+
+# Whether a larger value of each metric is better. Metrics not listed (such as node counts) are reported but not gated.
+HIGHER_IS_BETTER = {
+    'movegen_moves_per_second': True,
+    'counts_per_second': True,
+    'evaluate_per_second': True,
+    'minimax_searches_per_second': True,
+    'minimax_nodes_per_second': True,
+    'minimax_traced_peak_kb': False,
+    'peak_rss_kb': False,
+}
+
+
+def rate(function, count, seconds, rounds=5):
+    """
+    Times a function over several rounds, calling it repeatedly for roughly the given total time and at least once per
+    round. The fastest round is kept, as it is the one least disturbed by the rest of the machine.
+
+    Returns:
+        float: How many items per second were processed, `count` items being processed per call
+    """
+
+    best = 0.0
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        while calls == 0 or time.perf_counter() - start < seconds / rounds:
+            function()
+            calls += 1
+        best = max(best, calls * count / (time.perf_counter() - start))
+    return best
+
+
+def measure(seconds, depth):
+    """
+    Runs every benchmark of the suite.
+
+    Args:
+        seconds (float): Roughly how long to spend on each timed benchmark
+        depth (int): The depth of the minimax_alpha_beta() searches
+
+    Returns:
+        dict: The value of each metric, keyed by metric name
+    """
+
+    sys.path.insert(0, REPO_ROOT)
+    import ai
+    import board_configs
+    from board import Board
+    from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+    from game import Game
+
+    game = Game()
+    colors = (PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR)
+    boards = [Board(config) for config in [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]]
+    num_moves = sum(len(game.generate_all_moves(board, color)) for board in boards for color in colors)
+
+    def search_all():
+        for board in boards:
+            ai.minimax_alpha_beta(board, depth, float('-inf'), float('inf'), True, game)
+
+    nodes = 0
+    for board in boards:
+        search = ai.Search(game)
+        search.search(board, depth, float('-inf'), float('inf'), True)
+        nodes += search.nodes
+    searches_per_second = rate(search_all, len(boards), seconds)
+
+    tracemalloc.start()
+    search_all()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'movegen_moves_per_second': rate(
+            lambda: [game.generate_all_moves(board, color) for board in boards for color in colors], num_moves,
+            seconds),
+        'counts_per_second': rate(lambda: [ai.counts(board, game, color) for board in boards for color in colors],
+                                  len(boards) * len(colors), seconds),
+        'evaluate_per_second': rate(lambda: [ai.evaluate(board, game) for board in boards],
+                                    len(boards), seconds),
+        'minimax_searches_per_second': searches_per_second,
+        'minimax_nodes_per_second': searches_per_second / len(boards) * nodes,
+        'minimax_nodes': nodes,
+        'minimax_traced_peak_kb': traced_peak // 1024,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def compare(results, baseline, threshold, metric_thresholds):
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (dict): The current metric values
+        baseline (dict): The baseline metric values
+        threshold (float): The fraction a metric may get worse by before it counts as a regression
+        metric_thresholds (dict): Thresholds overriding `threshold` for some metrics, keyed by metric name
+
+    Returns:
+        list: (metric, baseline value, current value, relative change, regressed) tuples, one per metric in both
+    """
+
+    rows = []
+    for metric, value in results.items():
+        if metric not in baseline:
+            continue
+        old = baseline[metric]
+        change = (value - old) / old if old else 0.0
+        regressed = False
+        if metric in HIGHER_IS_BETTER:
+            allowed = metric_thresholds.get(metric, threshold)
+            regressed = change < -allowed if HIGHER_IS_BETTER[metric] else change > allowed
+        rows.append((metric, old, value, change, regressed))
+    return rows
+
+
+def _parse_metric_threshold(text):
+    """
+    Parses a NAME=FRACTION metric threshold.
+    """
+
+    metric, _, fraction = text.partition('=')
+    if metric not in HIGHER_IS_BETTER or not fraction:
+        raise argparse.ArgumentTypeError(f'expected NAME=FRACTION with NAME one of {", ".join(HIGHER_IS_BETTER)}')
+    return metric, float(fraction)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=1.0, help='time to spend on each timed benchmark')
+    parser.add_argument('--depth', type=int, default=3, help='depth of the minimax_alpha_beta() searches')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='the baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='fraction a metric may get worse by before failing (default 0.10)')
+    parser.add_argument('--metric-threshold', type=_parse_metric_threshold, action='append', default=[],
+                        metavar='NAME=F', help='threshold for one metric, overriding --threshold')
+    args = parser.parse_args()
+
+    results = measure(args.seconds, args.depth)
+    results['depth'] = args.depth
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+        print(f'Baseline saved to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps(results, indent=2))
+        print(f'No baseline at {args.baseline}; run with --save-baseline to create one')
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if baseline.get('depth') != args.depth:
+        sys.exit(f'The baseline was recorded at depth {baseline.get("depth")}; rerun with --depth {baseline.get("depth")}')
+
+    rows = compare(results, baseline, args.threshold, dict(args.metric_threshold))
+    print(f'{"metric":<30} {"baseline":>16} {"current":>16} {"change":>9}')
+    for metric, old, value, change, regressed in rows:
+        if metric == 'depth':
+            continue
+        status = 'REGRESSION' if regressed else ''
+        print(f'{metric:<30} {old:16,.1f} {value:16,.1f} {change:+9.1%}  {status}')
+
+    if any(regressed for *_, regressed in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+from contextlib import contextmanager
+import os
+import subprocess
+import tempfile
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@contextmanager
+def checkout(rev):
+    """
+    Extracts the tree of a git revision into a temporary directory, so a benchmark can be repeated on the code as it
+    was before a change.
+
+    Args:
+        rev (str): Any git revision, e.g. HEAD~1
+
+    Yields:
+        str: The path of the temporary directory holding the revision's files
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = subprocess.run(['git', 'archive', rev], cwd=REPO_ROOT, check=True, capture_output=True).stdout
+        subprocess.run(['tar', '-x', '-C', directory], input=archive, check=True)
+        yield directory
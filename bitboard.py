@@ -0,0 +1,275 @@
+from board import Board
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR, ROWS, COLS
+from piece import Piece
+import zobrist
+
+
+# Only the 32 dark squares are playable. They are numbered 0-31 in board-scan order (row by row, left to right), so
+# square index = row * 4 + col // 2 and iterating the bits of a mask from low to high visits squares in the same order
+# as scanning the 8x8 list of lists.
+SQUARE_COORDS = [(row, col) for row in range(ROWS) for col in range(COLS) if col % 2 == ((row + 1) % 2)]
+SQUARE_BITS = [[0] * COLS for _ in range(ROWS)]
+for _index, (_row, _col) in enumerate(SQUARE_COORDS):
+    SQUARE_BITS[_row][_col] = 1 << _index
+
+PLAYER1_START_MASK = sum(1 << index for index, (row, _) in enumerate(SQUARE_COORDS) if row > 4)
+PLAYER2_START_MASK = sum(1 << index for index, (row, _) in enumerate(SQUARE_COORDS) if row < 3)
+
+
+class BitBoard(Board):
+    def __init__(self, board_config=None):
+        """
+        Initializes a bitboard-backed board. Instead of an 8x8 list of lists, the position is stored as three 32-bit
+        masks over the playable squares: one for Player 1's pieces, one for Player 2's pieces, and one marking kings.
+        Then it creates the board.
+
+        Args:
+            board_config (list, optional): A 2-D array in the same format accepted by Board.create_specific()
+        """
+
+        self.player1 = 0
+        self.player2 = 0
+        self.kings = 0
+        if not board_config:
+            self.create()
+        else:
+            self.create_specific(board_config)
+        self.hash = zobrist.hash_board(self)
+
+    def __deepcopy__(self, memo):
+        """
+        Copies the board by copying its three masks, which is much cheaper than copying a list of Piece objects.
+
+        Args:
+            memo (dict): The memo dictionary used by copy.deepcopy()
+
+        Returns:
+            BitBoard: An independent copy of this board
+        """
+
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.player1 = self.player1
+        new_board.player2 = self.player2
+        new_board.kings = self.kings
+        new_board.hash = self.hash
+        return new_board
+
+    def create(self):
+        """
+        Initializes the board with pieces in their starting positions.
+        """
+
+        self.player1 = PLAYER1_START_MASK
+        self.player2 = PLAYER2_START_MASK
+        self.kings = 0
+
+    def create_specific(self, board_config):
+        """
+        Initializes the board with pieces in specific positions as specified by a given board configuration.
+
+        Args:
+            board_config: A 2-D array where 1 indicates Player 1 piece, 2 indicates Player 2 piece, 11 and 22 indicate
+            their kings, and 0 indicates an empty square
+
+        Raises:
+            ValueError: If the configuration places a piece on a light (unplayable) square
+        """
+
+        for row in range(len(board_config)):
+            for col in range(len(board_config[row])):
+                value = board_config[row][col]
+                if value == 0:
+                    continue
+
+                bit = SQUARE_BITS[row][col]
+                if not bit:
+                    raise ValueError(f'Cannot place a piece on the light square ({row}, {col})')
+
+                if value in (1, 11):
+                    self.player1 |= bit
+                elif value in (2, 22):
+                    self.player2 |= bit
+                if value in (11, 22):
+                    self.kings |= bit
+
+    def get_piece(self, row, col):
+        """
+        Retrieves the piece at a given position on the board. A new Piece object is built from the masks on each call.
+
+        Args:
+            row (int): The row index of the piece
+            col (int): The column index of the piece
+
+        Returns:
+            Piece: The piece at the given position or 0 if no piece is present
+        """
+
+        bit = SQUARE_BITS[row][col]
+        if self.player1 & bit:
+            piece = Piece(row, col, PLAYER1_PIECE_COLOR)
+        elif self.player2 & bit:
+            piece = Piece(row, col, PLAYER2_PIECE_COLOR)
+        else:
+            return 0
+
+        if self.kings & bit:
+            piece.make_king()
+        return piece
+
+    def get_all_pieces(self, color):
+        """
+        Retrieves all pieces of a given color, in board-scan order.
+
+        Args:
+            color (tuple): The RGB color of the pieces to retrieve, formatted as a tuple (e.g., (255, 240, 125)).
+
+        Returns:
+            list: A list of Piece objects of the given color
+        """
+
+        mask = self.player1 if color == PLAYER1_PIECE_COLOR else self.player2 if color == PLAYER2_PIECE_COLOR else 0
+
+        pieces = []
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            row, col = SQUARE_COORDS[bit.bit_length() - 1]
+            piece = Piece(row, col, color)
+            if self.kings & bit:
+                piece.make_king()
+            pieces.append(piece)
+        return pieces
+
+    def move_piece(self, piece, row, col):
+        """
+        Moves a piece to a new position on the board and converts it to a king if applicable.
+
+        Args:
+            piece (Piece): The piece to move
+            row (int): The target row
+            col (int): The target column
+        """
+
+        from_row, from_col = piece.row, piece.col
+        from_bit = SQUARE_BITS[from_row][from_col]
+        to_bit = SQUARE_BITS[row][col]
+        both = from_bit | to_bit
+        self.hash ^= self._square_key(from_row, from_col, from_bit) ^ self._square_key(row, col, to_bit)
+
+        # Swap the contents of the two squares in every mask, mirroring Board.move_piece().
+        if bool(self.player1 & from_bit) != bool(self.player1 & to_bit):
+            self.player1 ^= both
+        if bool(self.player2 & from_bit) != bool(self.player2 & to_bit):
+            self.player2 ^= both
+        if bool(self.kings & from_bit) != bool(self.kings & to_bit):
+            self.kings ^= both
+        piece.move(row, col)
+
+        if row == ROWS - 1 or row == 0:
+            piece.make_king()
+            self.kings |= to_bit
+
+        self.hash ^= self._square_key(from_row, from_col, from_bit) ^ self._square_key(row, col, to_bit)
+
+    def remove_pieces(self, pieces):
+        """
+        Removes the given pieces from the board.
+
+        Args:
+            pieces (list): A list of Piece objects to remove from the board
+        """
+
+        for piece in pieces:
+            self.hash ^= self._square_key(piece.row, piece.col, SQUARE_BITS[piece.row][piece.col])
+            keep = ~SQUARE_BITS[piece.row][piece.col]
+            self.player1 &= keep
+            self.player2 &= keep
+            self.kings &= keep
+
+    def unmove_piece(self, piece, row, col, king):
+        """
+        Reverses a previous move_piece() call by moving the piece back to its original position and restoring its king
+        status. Unlike move_piece(), this never promotes the piece.
+
+        Args:
+            piece (Piece): The piece to move back
+            row (int): The original row
+            col (int): The original column
+            king (bool): Whether the piece was a king before the move
+        """
+
+        from_row, from_col = piece.row, piece.col
+        from_bit = SQUARE_BITS[from_row][from_col]
+        to_bit = SQUARE_BITS[row][col]
+        both = from_bit | to_bit
+        self.hash ^= self._square_key(from_row, from_col, from_bit) ^ self._square_key(row, col, to_bit)
+
+        if bool(self.player1 & from_bit) != bool(self.player1 & to_bit):
+            self.player1 ^= both
+        if bool(self.player2 & from_bit) != bool(self.player2 & to_bit):
+            self.player2 ^= both
+        self.kings &= ~both
+        if king:
+            self.kings |= to_bit
+        piece.move(row, col)
+        piece.set_king(king)
+
+        self.hash ^= self._square_key(from_row, from_col, from_bit) ^ self._square_key(row, col, to_bit)
+
+    def restore_pieces(self, pieces):
+        """
+        Puts previously removed pieces back on the board, reversing a remove_pieces() call.
+
+        Args:
+            pieces (list): A list of Piece objects to place back at their own row and column
+        """
+
+        for piece in pieces:
+            bit = SQUARE_BITS[piece.row][piece.col]
+            self.hash ^= self._square_key(piece.row, piece.col, bit) ^ zobrist.square_key(piece, piece.row, piece.col)
+            if piece.color == PLAYER1_PIECE_COLOR:
+                self.player1 |= bit
+            else:
+                self.player2 |= bit
+            if piece.king:
+                self.kings |= bit
+
+    def to_board_config(self):
+        """
+        Converts the current board state to a configuration array format. 0 is an empty square, 1 is Player 1's piece,
+        2 is Player 2's piece, 11 is Player 1's king, and 22 is Player 2's king.
+
+        Returns:
+            list: A 2-D array representing the board configuration
+        """
+
+        board_config = [[0] * COLS for _ in range(ROWS)]
+        for mask, value in ((self.player1, 1), (self.player2, 2)):
+            while mask:
+                bit = mask & -mask
+                mask ^= bit
+                row, col = SQUARE_COORDS[bit.bit_length() - 1]
+                board_config[row][col] = value * 11 if self.kings & bit else value
+
+        return board_config
+
+    def _square_key(self, row, col, bit):
+        """
+        Returns the Zobrist key of whatever currently occupies a square, read straight from the masks.
+
+        Args:
+            row (int): The row of the square
+            col (int): The column of the square
+            bit (int): The mask bit of the square
+
+        Returns:
+            int: The key of the piece on that square, or 0 for an empty square
+        """
+
+        if self.player1 & bit:
+            code = 11 if self.kings & bit else 1
+        elif self.player2 & bit:
+            code = 22 if self.kings & bit else 2
+        else:
+            return 0
+        return zobrist.PIECE_KEYS[code][row][col]
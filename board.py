@@ -1,10 +1,12 @@
 from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR, ROWS, COLS
 from piece import Piece
+import zobrist
 
 class Board:
     def __init__(self, board_config=None):
         """
-        Initializes the game board with what is to be used as a 2-D array. Then it creates the board.
+        Initializes the game board with what is to be used as a 2-D array. Then it creates the board and computes its
+        Zobrist hash, which move_piece() and remove_pieces() keep up to date.
         """
 
         self.board = []
@@ -12,6 +14,7 @@ class Board:
             self.create()
         else:
             self.create_specific(board_config)
+        self.hash = zobrist.hash_board(self)
 
     def create(self):
         """
@@ -99,12 +102,19 @@ class Board:
             col (int): The target column
         """
 
+        from_row, from_col = piece.row, piece.col
+        self.hash ^= (zobrist.square_key(self.board[from_row][from_col], from_row, from_col) ^
+                      zobrist.square_key(self.board[row][col], row, col))
+
         self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
         piece.move(row, col)
 
         if row == ROWS - 1 or row == 0:
             piece.make_king()
 
+        self.hash ^= (zobrist.square_key(self.board[from_row][from_col], from_row, from_col) ^
+                      zobrist.square_key(self.board[row][col], row, col))
+
     def remove_pieces(self, pieces):
         """
         Removes the given pieces from the board.
@@ -114,8 +124,45 @@ class Board:
         """
 
         for piece in pieces:
+            self.hash ^= zobrist.square_key(self.board[piece.row][piece.col], piece.row, piece.col)
             self.board[piece.row][piece.col] = 0
 
+    def unmove_piece(self, piece, row, col, king):
+        """
+        Reverses a previous move_piece() call by moving the piece back to its original position and restoring its king
+        status. Unlike move_piece(), this never promotes the piece.
+
+        Args:
+            piece (Piece): The piece to move back
+            row (int): The original row
+            col (int): The original column
+            king (bool): Whether the piece was a king before the move
+        """
+
+        from_row, from_col = piece.row, piece.col
+        self.hash ^= (zobrist.square_key(self.board[from_row][from_col], from_row, from_col) ^
+                      zobrist.square_key(self.board[row][col], row, col))
+
+        self.board[piece.row][piece.col], self.board[row][col] = self.board[row][col], self.board[piece.row][piece.col]
+        piece.move(row, col)
+        piece.set_king(king)
+
+        self.hash ^= (zobrist.square_key(self.board[from_row][from_col], from_row, from_col) ^
+                      zobrist.square_key(self.board[row][col], row, col))
+
+    def restore_pieces(self, pieces):
+        """
+        Puts previously removed pieces back on the board, reversing a remove_pieces() call.
+
+        Args:
+            pieces (list): A list of Piece objects to place back at their own row and column
+        """
+
+        for piece in pieces:
+            self.hash ^= (zobrist.square_key(self.board[piece.row][piece.col], piece.row, piece.col) ^
+                          zobrist.square_key(piece, piece.row, piece.col))
+            self.board[piece.row][piece.col] = piece
+
     def to_board_config(self):
         """
         Converts the current board state to a configuration array format. 0 is an empty square, 1 is Player 1's piece,
@@ -129,18 +176,7 @@ class Board:
             config_row = []
             for col in range(8):
                 piece = self.get_piece(row, col)
-                if piece == 0:
-                    config_row.append(0)
-                elif piece.color == PLAYER1_PIECE_COLOR:
-                    if piece.king:
-                        config_row.append(11)
-                    else:
-                        config_row.append(1)
-                elif piece.color == PLAYER2_PIECE_COLOR:
-                    if piece.king:
-                        config_row.append(22)
-                    else:
-                        config_row.append(2)
+                config_row.append(0 if piece == 0 else piece.code)
             board_config.append(config_row)
 
         return board_config
@@ -91,6 +91,16 @@ class Display:
 
         pygame.quit()
 
+    def set_status(self, text=None):
+        """
+        Shows a status line, such as the AI's progress, in the window caption.
+
+        Args:
+            text (str, optional): The status to show, or None to show the plain caption
+        """
+
+        pygame.display.set_caption(f'Checkers - {text}' if text else 'Checkers')
+
     def update(self, board, valid_moves):
         """
         Updates the display by drawing the board and indicating the valid moves. Then it refreshes the screen.
@@ -0,0 +1,304 @@
+from bitboard import BitBoard, SQUARE_BITS, SQUARE_COORDS
+from board import Board
+from collections import namedtuple
+from constants import ROWS, COLS
+import mmap
+import struct
+import zobrist
+
+
+# A position is packed as the bitboard triple (Player 1 mask, Player 2 mask, king mask) over the 32 playable squares,
+# little-endian, 12 bytes in all.
+POSITION = struct.Struct('<III')
+
+# Game record files start with a header (magic, format version, record size) followed by fixed-size records, one per
+# position: the packed position, the game it belongs to, the side to move (1 or 2), the result of the game and the
+# ply of the position in the game. New games are appended to the end of the file.
+RECORD_MAGIC = b'CKGR'
+RECORD_VERSION = 1
+RECORD_HEADER = struct.Struct('<4sHH')
+RECORD = struct.Struct('<IIIIBBH')
+
+# Game results stored in the records.
+RESULT_DRAW = 0
+RESULT_PLAYER1 = 1
+RESULT_PLAYER2 = 2
+RESULT_UNKNOWN = 255
+
+PositionRecord = namedtuple('PositionRecord', ['player1', 'player2', 'kings', 'game', 'side', 'result', 'ply'])
+
+
+def board_masks(board):
+    """
+    Returns the bitboard triple of a board.
+
+    Args:
+        board (Board): A Board or BitBoard
+
+    Returns:
+        tuple: The (player1, player2, kings) masks over the playable squares, as used by BitBoard
+    """
+
+    if isinstance(board, BitBoard):
+        return board.player1, board.player2, board.kings
+
+    player1 = player2 = kings = 0
+    for row, col in SQUARE_COORDS:
+        piece = board.get_piece(row, col)
+        if piece == 0:
+            continue
+        code = piece.code
+        bit = SQUARE_BITS[row][col]
+        if code in (1, 11):
+            player1 |= bit
+        else:
+            player2 |= bit
+        if code in (11, 22):
+            kings |= bit
+    return player1, player2, kings
+
+
+def board_from_masks(player1, player2, kings, board_class=Board):
+    """
+    Builds a board from its bitboard triple.
+
+    Args:
+        player1 (int): The mask of Player 1's pieces
+        player2 (int): The mask of Player 2's pieces
+        kings (int): The mask of the kings of both players
+        board_class (type, optional): Board or BitBoard
+
+    Returns:
+        Board: A new board of the given class
+    """
+
+    if board_class is BitBoard:
+        board = BitBoard.__new__(BitBoard)
+        board.player1, board.player2, board.kings = player1, player2, kings
+        board.hash = zobrist.hash_pieces(_iter_mask_pieces(player1, player2, kings))
+        return board
+
+    board_config = [[0] * COLS for _ in range(ROWS)]
+    for mask, value in ((player1, 1), (player2, 2)):
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            row, col = SQUARE_COORDS[bit.bit_length() - 1]
+            board_config[row][col] = value * 11 if kings & bit else value
+    return board_class(board_config)
+
+
+def encode(board):
+    """
+    Packs a board into 12 bytes.
+
+    Args:
+        board (Board): A Board or BitBoard
+
+    Returns:
+        bytes: The packed position
+    """
+
+    return POSITION.pack(*board_masks(board))
+
+
+def decode(data, board_class=Board, offset=0):
+    """
+    Unpacks a position packed by encode().
+
+    Args:
+        data (bytes): A buffer holding the packed position (bytes, memoryview, mmap, ...)
+        board_class (type, optional): Board or BitBoard
+        offset (int, optional): Where the packed position starts in the buffer
+
+    Returns:
+        Board: A new board of the given class
+    """
+
+    return board_from_masks(*POSITION.unpack_from(data, offset), board_class=board_class)
+
+
+class GameRecordWriter:
+    def __init__(self, path):
+        """
+        Opens a game record file for appending, creating it with a header if it does not exist yet.
+
+        Args:
+            path (str): The path of the file
+
+        Raises:
+            ValueError: If the file exists but is not a game record file of this version
+        """
+
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(RECORD_HEADER.pack(RECORD_MAGIC, RECORD_VERSION, RECORD.size))
+        else:
+            try:
+                with open(path, 'rb') as existing:
+                    _check_header(existing.read(RECORD_HEADER.size), path)
+            except ValueError:
+                self.file.close()
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_position(self, board, game, ply, side, result=RESULT_UNKNOWN):
+        """
+        Appends one position.
+
+        Args:
+            board (Board): The position
+            game (int): The number of the game it comes from
+            ply (int): How many plies into the game it occurs
+            side (int): The side to move, 1 for Player 1 or 2 for Player 2
+            result (int, optional): RESULT_DRAW, RESULT_PLAYER1, RESULT_PLAYER2 or RESULT_UNKNOWN
+        """
+
+        self.file.write(RECORD.pack(*board_masks(board), game, side, result, ply))
+
+    def write_game(self, game, boards, result=RESULT_UNKNOWN, first_side=1):
+        """
+        Appends every position of a game.
+
+        Args:
+            game (int): The number of the game
+            boards (iterable): The positions of the game in order, starting with the initial position
+            result (int, optional): The result of the game
+            first_side (int, optional): The side to move in the first position. The sides alternate after that
+        """
+
+        side = first_side
+        for ply, board in enumerate(boards):
+            self.write_position(board, game, ply, side, result)
+            side = 3 - side
+
+    def close(self):
+        """
+        Flushes and closes the file.
+        """
+
+        self.file.close()
+
+
+class GameRecordReader:
+    # How many records __iter__() copies out of the mapping at a time.
+    ITER_CHUNK_RECORDS = 4096
+
+    def __init__(self, path):
+        """
+        Memory-maps a game record file for reading. Records are decoded only when they are accessed, so files larger
+        than memory can be streamed.
+
+        Args:
+            path (str): The path of the file
+
+        Raises:
+            ValueError: If the file is not a game record file of this version
+        """
+
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file cannot be mapped.
+            self.file.close()
+            raise ValueError(f'{path} is not a game record file')
+        try:
+            _check_header(self.data[:RECORD_HEADER.size], path)
+        except ValueError:
+            self.close()
+            raise
+        self.count = (len(self.data) - RECORD_HEADER.size) // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """
+        Returns a record by its position in the file.
+
+        Args:
+            index (int): The index of the record. Negative indexes count from the end
+
+        Returns:
+            PositionRecord: The record
+        """
+
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError('record index out of range')
+        return PositionRecord(*RECORD.unpack_from(self.data, RECORD_HEADER.size + index * RECORD.size))
+
+    def __iter__(self):
+        """
+        Iterates over every record in file order.
+
+        Yields:
+            PositionRecord: The next record
+        """
+
+        end = RECORD_HEADER.size + self.count * RECORD.size
+        chunk_size = self.ITER_CHUNK_RECORDS * RECORD.size
+        for start in range(RECORD_HEADER.size, end, chunk_size):
+            for fields in RECORD.iter_unpack(self.data[start:min(start + chunk_size, end)]):
+                yield PositionRecord(*fields)
+
+    def board(self, index, board_class=Board):
+        """
+        Decodes the position of a record.
+
+        Args:
+            index (int): The index of the record
+            board_class (type, optional): Board or BitBoard
+
+        Returns:
+            Board: A new board holding the position
+        """
+
+        record = self[index]
+        return board_from_masks(record.player1, record.player2, record.kings, board_class)
+
+    def close(self):
+        """
+        Unmaps and closes the file.
+        """
+
+        self.data.close()
+        self.file.close()
+
+
+def _iter_mask_pieces(player1, player2, kings):
+    """
+    Yields the (code, row, col) of every piece of a bitboard triple, for zobrist.hash_pieces().
+    """
+
+    for mask, code in ((player1, 1), (player2, 2)):
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            row, col = SQUARE_COORDS[bit.bit_length() - 1]
+            yield code * 11 if kings & bit else code, row, col
+
+
+def _check_header(header, path):
+    """
+    Raises:
+        ValueError: If the header is not that of a game record file of this version
+    """
+
+    if len(header) < RECORD_HEADER.size:
+        raise ValueError(f'{path} is not a game record file')
+    magic, version, record_size = RECORD_HEADER.unpack(header)
+    if magic != RECORD_MAGIC or version != RECORD_VERSION or record_size != RECORD.size:
+        raise ValueError(f'{path} is not a version {RECORD_VERSION} game record file')
@@ -2,14 +2,35 @@ from board import Board
 from constants import PLAYER2_PIECE_COLOR, PLAYER1_PIECE_COLOR
 from copy import deepcopy
 from move_node import MoveNode
+from move_tables import TRAVERSE_TARGETS
+
+
+# The direction names traverse() jumps in to capture along each direction.
+HOP_SHIFTS = {(row_shift, col_shift): (row_shift + '_hop', col_shift + '_hop')
+              for row_shift in ('front', 'back') for col_shift in ('left', 'right')}
+
+# CAPTURE_DIRECTIONS[king][(row_shift, col_shift)] lists the directions a capture sequence continues in after a jump in
+# the given direction, in the order traverse() tries them: the same row direction to both sides, and for kings also the
+# other row direction on the same side.
+CAPTURE_DIRECTIONS = {
+    king: {(row_shift, col_shift): [(row_shift, 'left'), (row_shift, 'right')] +
+           ([('back' if row_shift == 'front' else 'front', col_shift)] if king else [])
+           for row_shift in ('front', 'back') for col_shift in ('left', 'right')}
+    for king in (False, True)
+}
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, move_cache=None):
         """
         Initializes the game.
+
+        Args:
+            move_cache (MoveCache, optional): A cache of the moves found by find_moves() and ai.find_moves(). It may be
+                shared with other Game instances, such as the one the AI searches with in the background
         """
 
+        self.move_cache = move_cache
         self._init()
 
     def select(self, row, col):
@@ -117,21 +138,207 @@ class Game:
             list: A list of board states resulting from all possible moves for the given color
         """
 
-        moves = []
+        return list(self.iter_all_moves(board, color))
+
+    def iter_all_moves(self, board, color):
+        """
+        Generates the board states of generate_all_moves() one at a time, in the same order. Each board is only copied
+        when it is requested, so a search that stops early (e.g. at a beta cutoff) does not pay for the rest.
+
+        Args:
+            board (Board): The current board state. It must not change while the generator is in use
+            color (tuple): The RGB color of the pieces to evaluate, formatted as a tuple (e.g., (255, 240, 125)).
+
+        Yields:
+            Board: The board state resulting from the next possible move for the given color
+        """
 
         for piece in board.get_all_pieces(color):
-            valid_moves = self.find_moves(board, piece)
-            for move, captured_pieces, king_hopeful in valid_moves:
-                temp_board = deepcopy(board)
+            for move, captured_pieces, king_hopeful in self.find_moves(board, piece):
+                temp_board = self.copy(board)
                 temp_piece = temp_board.get_piece(piece.row, piece.col)
-                new_board = self.simulate_move(temp_piece, move, temp_board, captured_pieces)
-                moves.append(new_board)
+                yield self.simulate_move(temp_piece, move, temp_board, captured_pieces)
 
-        return moves
+    def generate_all_move_descriptors(self, board, color):
+        """
+        Generates all possible moves for a given color as move descriptors instead of new board states. The descriptors
+        come in the same order as the boards returned by generate_all_moves() and can be applied in place with
+        make_move().
+
+        Args:
+            board (Board): The current board state
+            color (tuple): The RGB color of the pieces to evaluate, formatted as a tuple (e.g., (255, 240, 125)).
+
+        Returns:
+            list: A list of (piece, move, captured_pieces, king_hopeful) tuples, one per possible move
+        """
+
+        return list(self.iter_all_move_descriptors(board, color))
+
+    def iter_all_move_descriptors(self, board, color):
+        """
+        Generates the move descriptors of generate_all_move_descriptors() one at a time, in the same order. The moves
+        of a piece are only looked for once the moves of the pieces before it have been consumed.
+
+        The board may be changed with make_move() between two descriptors as long as it is restored with unmake_move()
+        before the next one is requested, as an in-place search does.
+
+        Args:
+            board (Board): The current board state
+            color (tuple): The RGB color of the pieces to evaluate, formatted as a tuple (e.g., (255, 240, 125)).
+
+        Yields:
+            tuple: The (piece, move, captured_pieces, king_hopeful) descriptor of the next possible move
+        """
+
+        for piece in board.get_all_pieces(color):
+            for move, captured_pieces, king_hopeful in self.find_moves(board, piece):
+                yield piece, move, captured_pieces, king_hopeful
+
+    def make_move(self, board, piece, move, captured_pieces):
+        """
+        Applies a move to the board in place and returns an undo record that unmake_move() uses to restore the
+        position.
+
+        Args:
+            board (Board): The board to update
+            piece (Piece): The piece being moved. It must be the piece currently on the board at its row and column
+            move (tuple): A tuple indicating the target row and column to move the piece to
+            captured_pieces (list): A list of pieces that are captured by the move
+
+        Returns:
+            tuple: An undo record (piece, row, col, king, captured) holding the piece's original position and king
+            status, and the captured pieces as they were on the board
+        """
+
+        captured = [board.get_piece(captured_piece.row, captured_piece.col) for captured_piece in captured_pieces]
+        undo = (piece, piece.row, piece.col, piece.king, captured)
+        self.simulate_move(piece, move, board, captured)
+
+        return undo
+
+    def unmake_move(self, board, undo):
+        """
+        Restores the position that existed before the make_move() call that produced the given undo record. Moves must
+        be unmade in the reverse order they were made.
+
+        Args:
+            board (Board): The board to restore
+            undo (tuple): The undo record returned by make_move()
+        """
+
+        piece, row, col, king, captured = undo
+        board.unmove_piece(piece, row, col, king)
+        board.restore_pieces(captured)
 
     def find_moves(self, board, piece):
         """
-        Finds all possible moves for the specified piece on the board, including multi-hop captures. This function calculates:
+        Finds all possible moves for the specified piece on the board, including multi-hop captures.
+
+        Args:
+            board (Board): The current board state
+            piece (Piece): The piece for which possible moves are being evaluated.
+
+        Returns:
+            list: A list of (destination, captured_pieces, king_hopeful) tuples as yielded by iter_moves()
+        """
+
+        if self.move_cache is None:
+            return list(self.iter_moves(board, piece))
+
+        # The cache holds the squares of the captured pieces rather than the pieces, which belong to a single board.
+        key = (board.hash, piece.row, piece.col)
+        cached = self.move_cache.get(key)
+        if cached is not None:
+            return [(destination, [board.get_piece(*square) for square in squares], king_hopeful)
+                    for destination, squares, king_hopeful in cached]
+        moves = list(self.iter_moves(board, piece))
+        self.move_cache.put(key, tuple((destination, tuple((captured.row, captured.col) for captured in captured),
+                                        king_hopeful) for destination, captured, king_hopeful in moves))
+        return moves
+
+    def iter_moves(self, board, piece):
+        """
+        Generates the moves of a piece without building a move tree: a single move or the first jump in each
+        direction, then the rest of each capture sequence depth first with an explicit stack. The squares of the
+        pieces captured so far on the current sequence are marked as empty in a set, and unmarked when the search
+        backtracks, so neither the board nor the piece is copied. Like traverse(), a capture sequence treats the
+        piece's starting square and the squares it has captured as empty, and only its complete sequences are moves.
+
+        Args:
+            board (Board): The current board state. It is not modified
+            piece (Piece): The piece for which possible moves are being generated
+
+        Yields:
+            tuple: (destination, captured_pieces, king_hopeful), where destination is the (row, col) the piece ends
+            on, captured_pieces the list of pieces it captures in order, and king_hopeful True if it reaches the
+            opponent's baseline on the way (See Notes for evaluate()). The moves come in the order of find_moves_tree()
+        """
+
+        row, col, color, king = piece.row, piece.col, piece.color, piece.king
+        directions = []
+        if color == PLAYER1_PIECE_COLOR or king:
+            directions += [('front', 'left'), ('front', 'right')]
+        if color == PLAYER2_PIECE_COLOR or king:
+            directions += [('back', 'left'), ('back', 'right')]
+
+        for row_shift, col_shift in directions:
+            target = TRAVERSE_TARGETS[row_shift, col_shift][row][col]
+            if target is None:
+                continue
+            target_piece = board.get_piece(*target)
+            if target_piece == 0:
+                yield target, [], self.check_king_hopeful(piece, target[0], row, col) is not None
+            elif target_piece.color != color:
+                landing = TRAVERSE_TARGETS[HOP_SHIFTS[row_shift, col_shift]][row][col]
+                if landing is not None and board.get_piece(*landing) == 0:
+                    yield from self._iter_captures(board, piece, target_piece, landing, row_shift, col_shift)
+
+    def _iter_captures(self, board, piece, first_capture, first_landing, row_shift, col_shift):
+        """
+        Generates the complete capture sequences that start with the given jump, for iter_moves().
+        """
+
+        color, king = piece.color, piece.king
+        empty = {(piece.row, piece.col)}  # The starting square and the squares captured on the current sequence.
+        captured = []
+        king_hopeful = self.check_king_hopeful(piece, first_landing[0], piece.row, piece.col) is not None
+
+        # Each entry is a jump still to be explored: the captured piece, the landing square, the direction of the
+        # jump, how many captures preceded it, and whether the sequence has reached the baseline once it is made.
+        stack = [(first_capture, first_landing, row_shift, col_shift, 0, king_hopeful)]
+        while stack:
+            capture, (row, col), row_shift, col_shift, depth, king_hopeful = stack.pop()
+            for undone in captured[depth:]:
+                empty.discard((undone.row, undone.col))
+            del captured[depth:]
+            captured.append(capture)
+            empty.add((capture.row, capture.col))
+
+            jumps = []
+            for next_row_shift, next_col_shift in CAPTURE_DIRECTIONS[king][row_shift, col_shift]:
+                target = TRAVERSE_TARGETS[next_row_shift, next_col_shift][row][col]
+                if target is None or target in empty:
+                    continue
+                target_piece = board.get_piece(*target)
+                if target_piece == 0 or target_piece.color == color:
+                    continue
+                landing = TRAVERSE_TARGETS[HOP_SHIFTS[next_row_shift, next_col_shift]][row][col]
+                if landing is None or (landing not in empty and board.get_piece(*landing) != 0):
+                    continue
+                jumps.append((target_piece, landing, next_row_shift, next_col_shift, depth + 1,
+                              king_hopeful or self.check_king_hopeful(piece, landing[0], row, col) is not None))
+
+            if jumps:
+                stack.extend(reversed(jumps))
+            else:
+                yield (row, col), captured[:], king_hopeful
+
+    def find_moves_tree(self, board, piece):
+        """
+        The reference implementation of find_moves(): builds a MoveNode tree of each direction with traverse() and
+        flattens it with dfs_collect_move_destinations(). It returns the same moves in the same order as find_moves(),
+        which is much faster, and is kept to check and benchmark it against. This function calculates:
 
         - The total number of possible moves for the specified piece, accounting for all hops and captures
         - The total number of captures achievable through multi-hop sequences
@@ -191,24 +398,13 @@ class Game:
             potential captures, and king hopefuls (See Notes for evaluate())
         """
 
-        steps = {
-            'left': -1,
-            'right': 1,
-            'front': -1,
-            'back': 1,
-            'left_hop': -2,
-            'right_hop': 2,
-            'front_hop': -2,
-            'back_hop': 2
-        }
-
         # Root of the moves tree at this level
         moves = MoveNode((curr_row, curr_col), None, None)
 
-        target_row = curr_row + steps[row_shift]
-        target_col = curr_col + steps[col_shift]
+        target = TRAVERSE_TARGETS[row_shift, col_shift][curr_row][curr_col]
 
-        if 0 <= target_row <= 7 and 0 <= target_col <= 7:
+        if target is not None:
+            target_row, target_col = target
             target_piece = board.get_piece(target_row, target_col)
             if target_piece == 0:
                 if skipped is None and not captured:
@@ -227,8 +423,8 @@ class Game:
                     curr_row = target_row
                     curr_col = target_col
 
-                    new_board = deepcopy(board)
-                    new_piece = deepcopy(piece)
+                    new_board = self.copy(board)
+                    new_piece = self.copy(piece)
                     new_board = self.simulate_move(new_piece, (curr_row, curr_col), new_board, [skipped])
 
                     directions = [
@@ -298,6 +494,20 @@ class Game:
 
         return board
 
+    def copy(self, obj):
+        """
+        Deep copies a board, piece or move descriptor for the search. The searches copy through this method, so that
+        SearchStats.instrument() can time the copies of one game instance.
+
+        Args:
+            obj: The object to copy
+
+        Returns:
+            A deep copy of the object
+        """
+
+        return deepcopy(obj)
+
     def dfs_collect_move_destinations(self, move_tree, current_path=None, captured_pieces=None, king_hopeful=False, destinations=None, is_root=True):
         """
         Performs a depth-first search (DFS) on a move tree to collect the final destinations for each possible move path,
@@ -1,11 +1,17 @@
-from ai import minimax_alpha_beta
+from ai_player import AIPlayer
 from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR, SQUARE_SIZE
 from display import Display
 from game import Game
+from opening_book import DEFAULT_BOOK_PATH, OpeningBook
+from tablebase import DEFAULT_TABLEBASE_PATH, Tablebase
+from transposition import TranspositionTable
+import os
 import pygame
 
 
 FPS = 60
+AI_TIME_BUDGET_MS = 1000
+PONDER = True  # Let the AI think on your time.
 
 def main():
     """
@@ -16,14 +22,30 @@ def main():
     clock = pygame.time.Clock()
     game = Game()
     display = Display()
+    tt = TranspositionTable()  # Shared by every AI search in a game so repeated positions are not searched again.
+    # Build the book with `python opening_book.py`; without it, every move is searched.
+    book = OpeningBook(DEFAULT_BOOK_PATH) if os.path.exists(DEFAULT_BOOK_PATH) else None
+    # Build the endgame tablebase with `python tablebase.py`; without it, endgames are searched like any position.
+    tablebase = Tablebase(DEFAULT_TABLEBASE_PATH) if os.path.exists(DEFAULT_TABLEBASE_PATH) else None
+    # The AI searches in a background thread so that the window keeps drawing and handling events while it thinks.
+    ai_player = AIPlayer(AI_TIME_BUDGET_MS, tt=tt, book=book, tablebase=tablebase)
 
     while run:
         clock.tick(FPS)
 
         if game.turn == PLAYER2_PIECE_COLOR:
-            # The AI's turn: Use the Minimax algorithm with Alpha-Beta pruning to make a move.
-            value, new_board = minimax_alpha_beta(game.get_board(), 3, float('-inf'), float('inf'), True, game)
-            game.ai_move(new_board)
+            # The AI's turn: Search as deep as the time budget allows with Minimax and Alpha-Beta pruning to make a move.
+            if not ai_player.thinking:
+                ai_player.start(game.get_board())
+            result = ai_player.poll()
+            if result is not None:
+                game.ai_move(result.board)
+                display.set_status()
+                if PONDER:
+                    ai_player.ponder(game.get_board())
+            elif ai_player.progress is not None:
+                progress = ai_player.progress
+                display.set_status(f'AI thinking: depth {progress.depth}, score {progress.score:+.2f}')
 
         # Check for a winner, and reset game if there is a winner.
         if game.winner() is not None:
@@ -31,13 +53,26 @@ def main():
                 print('\nYou won, Human!')
             elif game.winner() == PLAYER2_PIECE_COLOR:
                 print('\nThe AI won!')
+            if book is not None:
+                print(f'Opening book: {book.hits}/{book.probes} moves from the book ({book.hit_rate():.0%}), '
+                      f'about {book.saved_ms / 1000:.1f} s of searching saved')
+            if PONDER:
+                print(f'Pondering: predicted your reply {ai_player.ponder_hits} times out of '
+                      f'{ai_player.ponder_hits + ai_player.ponder_misses} ({ai_player.ponder_hit_rate():.0%}), '
+                      f'saving {ai_player.saved_ms_per_move():.0f} ms per AI move on average')
+            ai_player.stop()  # A search of the finished game may have just been started.
             game.reset()
+            tt.clear()
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 run = False
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                # Make the AI move now, with the best move it has found so far.
+                ai_player.cancel()
+
+            if event.type == pygame.MOUSEBUTTONDOWN and not ai_player.thinking:
                 # Your (human) turn: Select a piece to move.
                 pos = pygame.mouse.get_pos()
                 row, col = get_click_position_from_mouse(pos)
@@ -45,7 +80,12 @@ def main():
 
         display.update(game.get_board(), game.get_valid_moves())  # Update the game state, and draw the board.
 
+    ai_player.stop()
     pygame.quit()
+    if book is not None:
+        book.close()
+    if tablebase is not None:
+        tablebase.close()
 
 def get_click_position_from_mouse(pos):
     """
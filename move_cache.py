@@ -0,0 +1,80 @@
+from collections import OrderedDict
+import threading
+
+
+class MoveCache:
+    def __init__(self, size=1 << 16):
+        """
+        Initializes a bounded cache of generated moves, keyed by the Zobrist hash of a position and the square of the
+        piece that moves. When it is full, the least recently used entry is evicted.
+
+        The moves of a piece only depend on the placement of the pieces, which the board hash covers, so a cache can be
+        shared by every board of a game and by the GUI and the search. It is safe to use from several threads.
+
+        Args:
+            size (int, optional): The most entries the cache holds
+        """
+
+        self.size = size
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """
+        Removes every entry from the cache and resets its counters.
+        """
+
+        with self._lock:
+            self._entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Looks up the moves stored for a key, marking them as the most recently used.
+
+        Args:
+            key (tuple): The key of the moves, starting with the board hash and the piece's row and column
+
+        Returns:
+            The stored moves, or None if they are not in the cache
+        """
+
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return moves
+
+    def put(self, key, moves):
+        """
+        Stores the moves of a key, evicting the least recently used entry if the cache is full. The moves must not be
+        modified afterwards.
+
+        Args:
+            key (tuple): The key of the moves, starting with the board hash and the piece's row and column
+            moves: The moves to store
+        """
+
+        with self._lock:
+            self._entries[key] = moves
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def hit_rate(self):
+        """
+        Returns the fraction of lookups that found their moves.
+
+        Returns:
+            float: Hits divided by lookups, or 0.0 before the first lookup
+        """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
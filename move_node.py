@@ -13,6 +13,8 @@ class MoveNode:
             Adds a child MoveNode to the list of children, allowing for the construction of a move tree.
     """
 
+    __slots__ = ('move', 'capture', 'king_hopeful', 'children')
+
     def __init__(self, move, capture, king_hopeful):
         self.move = move  # A tuple representing the move coordinates
         self.capture = capture  # The piece captured in this move (if any)
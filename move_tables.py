@@ -0,0 +1,50 @@
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR, ROWS, COLS
+
+
+# Row and column offsets of the direction names used by Game.traverse(). Player 1 moves toward row 0 ('front').
+ROW_STEPS = {'front': -1, 'back': 1, 'front_hop': -2, 'back_hop': 2}
+COL_STEPS = {'left': -1, 'right': 1, 'left_hop': -2, 'right_hop': 2}
+
+
+def _target(row, col, row_step, col_step):
+    """
+    Returns the square reached from (row, col) by the given offsets, or None if it is off the board.
+    """
+
+    target_row, target_col = row + row_step, col + col_step
+    if 0 <= target_row < ROWS and 0 <= target_col < COLS:
+        return target_row, target_col
+    return None
+
+
+# TRAVERSE_TARGETS[(row_shift, col_shift)][row][col] is the square Game.traverse() looks at when shifting from
+# (row, col) in the named direction, or None if that square is off the board.
+TRAVERSE_TARGETS = {(row_shift, col_shift): [[_target(row, col, row_step, col_step) for col in range(COLS)]
+                                             for row in range(ROWS)]
+                    for row_shift, row_step in ROW_STEPS.items() for col_shift, col_step in COL_STEPS.items()}
+
+
+def _neighbours(row, col, row_steps):
+    """
+    Lists the (neighbour, jump landing square) pairs of a square for the given row directions. Neighbours off the board
+    are left out, and the landing square is None when it is off the board.
+    """
+
+    pairs = []
+    for row_step in row_steps:
+        for col_step in (1, -1):
+            neighbour = _target(row, col, row_step, col_step)
+            if neighbour is not None:
+                pairs.append((neighbour, _target(row, col, 2 * row_step, 2 * col_step)))
+    return pairs
+
+
+# NEIGHBOURS[(color, king)][row][col] lists the (neighbour, jump landing square) pairs a piece of that color and king
+# status can move to or jump over from (row, col), in the order ai.find_moves() checks them: Player 2 pieces move down
+# the board (increasing row), Player 1 pieces up, and kings both ways with the downward directions first.
+NEIGHBOURS = {
+    (PLAYER1_PIECE_COLOR, False): [[_neighbours(row, col, (-1,)) for col in range(COLS)] for row in range(ROWS)],
+    (PLAYER2_PIECE_COLOR, False): [[_neighbours(row, col, (1,)) for col in range(COLS)] for row in range(ROWS)],
+    (PLAYER1_PIECE_COLOR, True): [[_neighbours(row, col, (1, -1)) for col in range(COLS)] for row in range(ROWS)],
+    (PLAYER2_PIECE_COLOR, True): [[_neighbours(row, col, (1, -1)) for col in range(COLS)] for row in range(ROWS)],
+}
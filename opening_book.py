@@ -0,0 +1,307 @@
+"""
+Opening book: the best move of every position in the first plies of the game, found offline by deep searches and looked
+up by the AI instead of searching.
+
+A book file starts with a header (magic, format version, entry size, number of entries) followed by fixed-size entries
+sorted by key. Each entry holds the position's Zobrist hash (including the side to move, as in the transposition
+table), the move as from and to squares, its score and the depth it was searched to. The file is memory-mapped and
+looked up by binary search, so opening a book costs nothing however large it is.
+
+Usage:
+    python opening_book.py [--plies P] [--depth D] [--workers W] [--eval W,W,W,W,W] [--output FILE]
+
+builds a book of every position reachable in fewer than P plies from the starting position, for both sides.
+"""
+
+from ai import _move_key, Search
+from bitboard import BitBoard
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+from copy import deepcopy
+from game import Game
+from selfplay import parse_eval_params
+import argparse
+import mmap
+import struct
+import sys
+import time
+import zobrist
+
+
+BOOK_MAGIC = b'CKOB'
+BOOK_VERSION = 1
+BOOK_HEADER = struct.Struct('<4sHHI')
+BOOK_ENTRY = struct.Struct('<Q4BdH2x')
+BOOK_KEY = struct.Struct('<Q')
+
+DEFAULT_BOOK_PATH = 'opening_book.bin'
+
+# A book move: `move` is ((from_row, from_col), (to_row, to_col)), as identified by the search's move keys.
+BookEntry = namedtuple('BookEntry', ['key', 'move', 'score', 'depth'])
+
+
+def position_key(board, max_player):
+    """
+    Returns the key a position is stored under: its Zobrist hash, with the side key when Player 2 is to move.
+
+    Args:
+        board (Board): The position
+        max_player (bool): True if Player 2 (the maximizing player) is to move
+
+    Returns:
+        int: The 64-bit key
+    """
+
+    return board.hash ^ zobrist.SIDE_KEY if max_player else board.hash
+
+
+class OpeningBook:
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        """
+        Memory-maps a book file for lookups.
+
+        Args:
+            path (str, optional): The path of the book file
+
+        Raises:
+            ValueError: If the file is not a book file of this version
+        """
+
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file cannot be mapped.
+            self.file.close()
+            raise ValueError(f'{path} is not an opening book')
+
+        header = self.data[:BOOK_HEADER.size]
+        magic, version, entry_size, count = BOOK_HEADER.unpack(header) if len(header) == BOOK_HEADER.size else (
+            None, None, None, 0)
+        if (magic != BOOK_MAGIC or version != BOOK_VERSION or entry_size != BOOK_ENTRY.size or
+                len(self.data) < BOOK_HEADER.size + count * BOOK_ENTRY.size):
+            self.close()
+            raise ValueError(f'{path} is not a version {BOOK_VERSION} opening book')
+
+        self.count = count
+        self.probes = 0
+        self.hits = 0
+        self.saved_ms = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, key):
+        """
+        Finds the entry of a key by binary search over the mapped file, counting the probe.
+
+        Args:
+            key (int): The position key, as returned by position_key()
+
+        Returns:
+            BookEntry: The entry, or None if the position is not in the book
+        """
+
+        self.probes += 1
+        index = self._find(key)
+        if index is None:
+            return None
+        self.hits += 1
+        _, from_row, from_col, to_row, to_col, score, depth = BOOK_ENTRY.unpack_from(
+            self.data, BOOK_HEADER.size + index * BOOK_ENTRY.size)
+        return BookEntry(key, ((from_row, from_col), (to_row, to_col)), score, depth)
+
+    def __contains__(self, key):
+        """
+        Checks whether a key is in the book without counting a probe.
+
+        Args:
+            key (int): The position key, as returned by position_key()
+
+        Returns:
+            bool: True if the position is in the book
+        """
+
+        return self._find(key) is not None
+
+    def _find(self, key):
+        """
+        Returns the index of the entry of a key, found by binary search over the mapped file, or None.
+        """
+
+        data = self.data
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            middle_key, = BOOK_KEY.unpack_from(data, BOOK_HEADER.size + middle * BOOK_ENTRY.size)
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def probe(self, board, max_player):
+        """
+        Looks up a position.
+
+        Args:
+            board (Board): The position
+            max_player (bool): True if Player 2 (the maximizing player) is to move
+
+        Returns:
+            BookEntry: The entry, or None if the position is not in the book
+        """
+
+        return self.lookup(position_key(board, max_player))
+
+    def hit_rate(self):
+        """
+        Returns the fraction of probes that found their position.
+
+        Returns:
+            float: Hits divided by probes, or 0.0 if nothing was probed
+        """
+
+        return self.hits / self.probes if self.probes else 0.0
+
+    def close(self):
+        """
+        Unmaps and closes the book file.
+        """
+
+        self.data.close()
+        self.file.close()
+
+
+def write_book(path, entries):
+    """
+    Writes a book file.
+
+    Args:
+        path (str): The path of the file to write
+        entries (iterable): BookEntry tuples, in any order. Of several entries with the same key, the deepest is kept
+    """
+
+    best = {}
+    for entry in entries:
+        if entry.key not in best or entry.depth > best[entry.key].depth:
+            best[entry.key] = entry
+
+    with open(path, 'wb') as file:
+        file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, BOOK_ENTRY.size, len(best)))
+        for key in sorted(best):
+            entry = best[key]
+            (from_row, from_col), (to_row, to_col) = entry.move
+            file.write(BOOK_ENTRY.pack(key, from_row, from_col, to_row, to_col, entry.score, entry.depth))
+
+
+def book_positions(plies):
+    """
+    Lists every distinct position reachable in fewer than the given number of plies from the starting position, with
+    Player 1 moving first.
+
+    Args:
+        plies (int): How many plies deep the book goes
+
+    Returns:
+        list: (board, max_player) pairs, each board a BitBoard
+    """
+
+    game = Game()
+    frontier = [BitBoard()]
+    seen = set()
+    positions = []
+    for ply in range(plies):
+        max_player = ply % 2 == 1
+        color = PLAYER2_PIECE_COLOR if max_player else PLAYER1_PIECE_COLOR
+        next_frontier = []
+        for board in frontier:
+            key = position_key(board, max_player)
+            if key in seen:
+                continue
+            seen.add(key)
+            positions.append((board, max_player))
+            for piece, move, captured_pieces, _ in game.generate_all_move_descriptors(board, color):
+                child = deepcopy(board)
+                game.make_move(child, child.get_piece(piece.row, piece.col), move, captured_pieces)
+                next_frontier.append(child)
+        frontier = next_frontier
+    return positions
+
+
+def search_position(board, max_player, depth, eval_params=None):
+    """
+    Searches a book position to a fixed depth.
+
+    Returns:
+        BookEntry: The entry for the position, or None if the side to move has no move
+    """
+
+    game = Game()
+    search = Search(game, eval_params, ordering=True)
+    score, descriptor = search.search(board, depth, float('-inf'), float('inf'), max_player)
+    if descriptor is None:
+        return None
+    return BookEntry(position_key(board, max_player), _move_key(descriptor), score, depth)
+
+
+def _search_position(args):
+    """
+    Unpacks the arguments of search_position() for ProcessPoolExecutor.map().
+    """
+
+    return search_position(*args)
+
+
+def build_book(path, plies=4, depth=6, eval_params=None, workers=None):
+    """
+    Builds a book by searching every position of the first plies in a process pool.
+
+    Args:
+        path (str): The path of the book file to write
+        plies (int, optional): How many plies deep the book goes
+        depth (int, optional): The search depth of each position
+        eval_params (tuple, optional): The evaluation weights. Use the weights the AI plays with
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs. With 1, the
+            positions are searched in this process
+
+    Returns:
+        int: The number of entries written
+    """
+
+    tasks = [(board, max_player, depth, eval_params) for board, max_player in book_positions(plies)]
+    if workers == 1:
+        entries = list(map(_search_position, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            entries = list(executor.map(_search_position, tasks, chunksize=4))
+    entries = [entry for entry in entries if entry is not None]
+    write_book(path, entries)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--plies', type=int, default=4, help='how many plies deep the book goes')
+    parser.add_argument('--depth', type=int, default=6, help='search depth of each book position')
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--eval', type=parse_eval_params, help='evaluation weights (default: the AI defaults)')
+    parser.add_argument('--output', default=DEFAULT_BOOK_PATH, help='the book file to write')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = build_book(args.output, args.plies, args.depth, args.eval, args.workers)
+    print(f'{count} positions written to {args.output} in {time.perf_counter() - start:.1f} s', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
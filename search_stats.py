@@ -0,0 +1,196 @@
+from contextlib import contextmanager
+import inspect
+import json
+import time
+
+
+class SearchStats:
+    # The phases timed while searching with statistics: move generation, finding the moves of a piece, copying boards
+    # and evaluating leaves.
+    PHASES = ('generate_all_moves', 'find_moves', 'deepcopy', 'evaluate')
+
+    def __init__(self):
+        """
+        Collects diagnostics about one or more searches. Pass an instance as `stats` to minimax_alpha_beta(),
+        iterative_deepening() or Search to fill it in; searches without one skip all of this bookkeeping.
+
+        The node counters are filled in by the in-place search (Search). The evaluation time is recorded by the searches
+        and the other phase times are measured by instrument(). The outermost call of each phase is timed, so a phase
+        called from another (find_moves() from generate_all_moves()) is counted in both.
+        """
+
+        self.nodes = 0
+        self.leaves = 0
+        self.nodes_by_ply = {}
+        self.cutoffs_by_depth = {}
+        self.nodes_by_iteration = []
+        self.phase_seconds = dict.fromkeys(self.PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(self.PHASES, 0)
+        self.elapsed_seconds = 0.0
+
+    def count_node(self, ply):
+        """
+        Records a visited node.
+
+        Args:
+            ply (int): The distance of the node from the root
+        """
+
+        self.nodes += 1
+        self.nodes_by_ply[ply] = self.nodes_by_ply.get(ply, 0) + 1
+
+    def count_cutoff(self, depth):
+        """
+        Records a beta cutoff.
+
+        Args:
+            depth (int): The remaining depth of the node where the cutoff happened
+        """
+
+        self.cutoffs_by_depth[depth] = self.cutoffs_by_depth.get(depth, 0) + 1
+
+    def record_phase(self, phase, seconds):
+        """
+        Records a call of a phase.
+
+        Args:
+            phase (str): One of PHASES
+            seconds (float): The time the call took
+        """
+
+        self.phase_seconds[phase] += seconds
+        self.phase_calls[phase] += 1
+
+    def effective_branching_factor(self):
+        """
+        Returns the average factor by which the number of nodes grows with each extra ply of depth. After iterative
+        deepening, this is the geometric mean of the growth from one completed iteration to the next. Otherwise it is
+        the number of nodes at the deepest ply reached divided by the number at the root, to the power of one over that
+        ply.
+
+        Returns:
+            float: The effective branching factor, or 0.0 if no node below the root was visited
+        """
+
+        iterations = self.nodes_by_iteration
+        if len(iterations) >= 2:
+            return (iterations[-1] / iterations[0]) ** (1 / (len(iterations) - 1))
+
+        deepest = max(self.nodes_by_ply, default=0)
+        if deepest == 0:
+            return 0.0
+        return (self.nodes_by_ply[deepest] / self.nodes_by_ply[0]) ** (1 / deepest)
+
+    def to_dict(self):
+        """
+        Returns the statistics as a dictionary of plain values.
+
+        Returns:
+            dict: nodes, leaves, nodes_by_ply, cutoffs_by_depth, nodes_by_iteration, cutoffs,
+            effective_branching_factor, nodes_per_second, elapsed_seconds, phase_seconds and phase_calls
+        """
+
+        return {
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'nodes_by_ply': dict(sorted(self.nodes_by_ply.items())),
+            'cutoffs_by_depth': dict(sorted(self.cutoffs_by_depth.items())),
+            'nodes_by_iteration': list(self.nodes_by_iteration),
+            'cutoffs': sum(self.cutoffs_by_depth.values()),
+            'effective_branching_factor': self.effective_branching_factor(),
+            'nodes_per_second': self.nodes / self.elapsed_seconds if self.elapsed_seconds else 0.0,
+            'elapsed_seconds': self.elapsed_seconds,
+            'phase_seconds': dict(self.phase_seconds),
+            'phase_calls': dict(self.phase_calls),
+        }
+
+    def to_json(self, **kwargs):
+        """
+        Serializes the statistics as returned by to_dict().
+
+        Args:
+            **kwargs: Passed on to json.dumps(), e.g. indent
+
+        Returns:
+            str: A JSON object
+        """
+
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @contextmanager
+    def instrument(self, game):
+        """
+        Times the move generation and copying of the searches run inside the `with` block, and the block as a whole.
+        The Game methods are wrapped on the given instance for the duration of the block only, so searches with other
+        Game instances, in this thread or others, are not affected.
+
+        Args:
+            game (Game): The game instance the searches use
+
+        Yields:
+            SearchStats: This object
+        """
+
+        methods = [('generate_all_moves', 'generate_all_moves'), ('generate_all_move_descriptors', 'generate_all_moves'),
+                   ('iter_all_moves', 'generate_all_moves'), ('iter_all_move_descriptors', 'generate_all_moves'),
+                   ('find_moves', 'find_moves'), ('copy', 'deepcopy')]
+        # Wrappers of the same phase share one nesting counter, so that only the outermost call is timed.
+        nesting = dict.fromkeys(self.PHASES, 0)
+        originals = []
+        for name, phase in methods:
+            originals.append((name, vars(game).get(name)))
+            setattr(game, name, self._timed(getattr(game, name), phase, nesting))
+
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.elapsed_seconds += time.perf_counter() - start
+            for name, original in reversed(originals):
+                if original is None:
+                    delattr(game, name)  # The wrapper shadowed a method of the instance's class.
+                else:
+                    setattr(game, name, original)
+
+    def _timed(self, function, phase, nesting):
+        """
+        Wraps a function so that the time spent in its outermost calls is added to a phase. The time of a generator
+        function is the time spent producing its items, not the time its caller spends between them.
+        """
+
+        seconds, calls = self.phase_seconds, self.phase_calls
+
+        if inspect.isgeneratorfunction(function):
+            def generator_wrapper(*args, **kwargs):
+                if not nesting[phase]:
+                    calls[phase] += 1
+                iterator = function(*args, **kwargs)
+                while True:
+                    outermost = not nesting[phase]
+                    nesting[phase] += 1
+                    start = time.perf_counter()
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        if outermost:
+                            seconds[phase] += time.perf_counter() - start
+                        nesting[phase] -= 1
+                    yield item
+
+            return generator_wrapper
+
+        def wrapper(*args, **kwargs):
+            if nesting[phase]:
+                return function(*args, **kwargs)
+            nesting[phase] += 1
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[phase] += time.perf_counter() - start
+                calls[phase] += 1
+                nesting[phase] -= 1
+
+        return wrapper
@@ -0,0 +1,252 @@
+"""
+Headless self-play: the engine plays against itself, without pygame, to generate games for tuning and regression
+testing. Games are played in parallel by a process pool and streamed out as JSON lines, one compact record per game:
+
+    {"game":0,"result":"player2","plies":57,"moves":[[5,0,4,1],...],"nodes":[0,0,412,...]}
+
+Each move is [from_row, from_col, to_row, to_col], and `nodes` holds the nodes searched for each move (0 for the random
+opening moves). `result` is "player1", "player2" or "draw". A side with no piece or no legal move left loses, and a game
+still running after --max-plies plies is a draw.
+
+Usage:
+    python selfplay.py [--games N] [--workers W] [--depth1 D] [--depth2 D] [--eval1 W,W,W,W,W] [--eval2 W,W,W,W,W]
+                       [--random-plies P] [--max-plies P] [--seed S] [--output FILE] [--positions FILE]
+
+With --positions, every position of every game is also appended to a binary game record file (see encoding.py).
+"""
+
+from ai import Search
+from bitboard import BitBoard
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+from encoding import GameRecordWriter, RESULT_DRAW, RESULT_PLAYER1, RESULT_PLAYER2
+from game import Game
+from transposition import TranspositionTable
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+
+# The search settings of one side: its fixed search depth and its evaluation weights (None for the defaults).
+SideConfig = namedtuple('SideConfig', ['depth', 'eval_params'])
+
+PLAYER1_WINS = 'player1'
+PLAYER2_WINS = 'player2'
+DRAW = 'draw'
+
+# The result codes of game record files (see encoding.py).
+RESULT_CODES = {PLAYER1_WINS: RESULT_PLAYER1, PLAYER2_WINS: RESULT_PLAYER2, DRAW: RESULT_DRAW}
+
+
+def play_game(index, player1, player2, random_plies=0, max_plies=200, seed=0, board_config=None):
+    """
+    Plays one game of the engine against itself. Player 1 moves first, as in the graphical game.
+
+    Args:
+        index (int): The number of the game, recorded in the result and used to seed its random opening
+        player1 (SideConfig): The search settings of Player 1 (the minimizing player)
+        player2 (SideConfig): The search settings of Player 2 (the maximizing player)
+        random_plies (int, optional): How many plies at the start of the game are chosen at random instead of searched,
+            so that games between the same settings differ
+        max_plies (int, optional): The number of plies after which the game is declared a draw
+        seed (int, optional): Combined with the index to seed the random opening
+        board_config (list, optional): A 2-D board configuration to start from instead of the initial position
+
+    Returns:
+        dict: The game record, as described in the module docstring
+    """
+
+    rng = random.Random(seed * 1000003 + index)
+    game = Game()
+    board = BitBoard(board_config)
+    sides = {PLAYER1_PIECE_COLOR: (player1, False, TranspositionTable()),
+             PLAYER2_PIECE_COLOR: (player2, True, TranspositionTable())}
+
+    color = PLAYER1_PIECE_COLOR
+    moves, nodes = [], []
+    result = DRAW
+    while len(moves) < max_plies:
+        config, max_player, tt = sides[color]
+        descriptors = game.generate_all_move_descriptors(board, color)
+        if not descriptors:
+            result = PLAYER1_WINS if max_player else PLAYER2_WINS
+            break
+
+        if len(moves) < random_plies:
+            descriptor, searched = rng.choice(descriptors), 0
+        else:
+            tt.new_search()
+            search = Search(game, config.eval_params, tt, ordering=True)
+            _, descriptor = search.search(board, config.depth, float('-inf'), float('inf'), max_player)
+            searched = search.nodes
+            if descriptor is None:
+                # Every move loses within the horizon, so the search prefers none of them.
+                descriptor = descriptors[0]
+
+        piece, move, captured_pieces, _ = descriptor
+        moves.append([piece.row, piece.col, move[0], move[1]])
+        nodes.append(searched)
+        game.make_move(board, piece, move, captured_pieces)
+        color = PLAYER2_PIECE_COLOR if color == PLAYER1_PIECE_COLOR else PLAYER1_PIECE_COLOR
+
+    return {'game': index, 'result': result, 'plies': len(moves), 'moves': moves, 'nodes': nodes}
+
+
+def record_boards(record, board_config=None):
+    """
+    Replays a game record.
+
+    Args:
+        record (dict): A game record as returned by play_game()
+        board_config (list, optional): The board configuration the game started from, if not the initial position
+
+    Yields:
+        BitBoard: The position before each move, then the final position. The same board is updated in place between
+        yields, so copy it to keep a position
+    """
+
+    game = Game()
+    board = BitBoard(board_config)
+    yield board
+    for from_row, from_col, to_row, to_col in record['moves']:
+        piece = board.get_piece(from_row, from_col)
+        captured_pieces = {tuple(move): captured for move, captured, _ in game.find_moves(board, piece)}[to_row, to_col]
+        game.make_move(board, piece, (to_row, to_col), captured_pieces)
+        yield board
+
+
+PENDING_PER_WORKER = 2  # Games in flight per worker: enough to keep it busy while results are collected.
+
+
+def bounded_map(executor, function, tasks, max_pending):
+    """
+    Calls a function on the arguments of each task in an executor and yields the results in task order, each as soon as
+    it and the ones before it are finished. Unlike Executor.map(), which submits every task at once, it reads the tasks
+    lazily and keeps at most max_pending of them submitted and not yet yielded, so arbitrarily many tasks run in
+    constant memory. The other tools with a process pool use it too.
+
+    Args:
+        executor (concurrent.futures.Executor): The executor to run the calls in
+        function (callable): The function to call
+        tasks (iterable): A tuple of arguments per call. It may be a generator or a stream
+        max_pending (int): The most tasks submitted and not yet yielded
+
+    Yields:
+        The result of each call
+    """
+
+    pending = deque()
+    try:
+        for args in tasks:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # When the caller stops early, do not run the tasks still waiting for a worker.
+        for future in pending:
+            future.cancel()
+
+
+def run_selfplay(num_games, player1, player2, workers=None, random_plies=0, max_plies=200, seed=0, board_config=None,
+                 max_pending=None):
+    """
+    Plays games in a process pool and yields their records in game order, each as soon as it and the ones before it
+    are finished.
+
+    Args:
+        num_games (int): The number of games to play
+        player1 (SideConfig): The search settings of Player 1
+        player2 (SideConfig): The search settings of Player 2
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs. With 1, the games
+            are played in this process
+        random_plies (int, optional): How many opening plies of each game are random
+        max_plies (int, optional): The number of plies after which a game is a draw
+        seed (int, optional): Seeds the random openings, so that a run can be repeated exactly
+        board_config (list, optional): A 2-D board configuration to start every game from
+        max_pending (int, optional): The most games submitted to the pool and not yet yielded. Defaults to
+            PENDING_PER_WORKER per worker
+
+    Yields:
+        dict: One game record per game, as returned by play_game()
+    """
+
+    tasks = ((index, player1, player2, random_plies, max_plies, seed, board_config) for index in range(num_games))
+    if workers == 1:
+        for args in tasks:
+            yield play_game(*args)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from bounded_map(executor, play_game, tasks, max_pending or workers * PENDING_PER_WORKER)
+
+
+def parse_eval_params(text):
+    """
+    Parses comma-separated evaluation weights, e.g. '1,1,0.5,0.5,0.25'. The command lines of the other tools use it
+    too.
+
+    Args:
+        text (str): The weights, separated by commas
+
+    Returns:
+        tuple: The five weights, in the order of evaluate()'s weight arguments
+
+    Raises:
+        argparse.ArgumentTypeError: If there are not five weights
+    """
+
+    weights = tuple(float(weight) for weight in text.split(','))
+    if len(weights) != 5:
+        raise argparse.ArgumentTypeError('expected 5 comma-separated weights')
+    return weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--games', type=int, default=100, help='number of games to play')
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--depth1', type=int, default=3, help='search depth of Player 1')
+    parser.add_argument('--depth2', type=int, default=3, help='search depth of Player 2')
+    parser.add_argument('--eval1', type=parse_eval_params, help='evaluation weights of Player 1')
+    parser.add_argument('--eval2', type=parse_eval_params, help='evaluation weights of Player 2')
+    parser.add_argument('--random-plies', type=int, default=4, help='random opening plies per game')
+    parser.add_argument('--max-plies', type=int, default=200, help='plies after which a game is a draw')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random openings')
+    parser.add_argument('--output', help='file to write the game records to (default: standard output)')
+    parser.add_argument('--positions', help='game record file (see encoding.py) to append every position to')
+    args = parser.parse_args()
+
+    player1 = SideConfig(args.depth1, args.eval1)
+    player2 = SideConfig(args.depth2, args.eval2)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    positions = GameRecordWriter(args.positions) if args.positions else None
+    results = {PLAYER1_WINS: 0, PLAYER2_WINS: 0, DRAW: 0}
+
+    start = time.perf_counter()
+    try:
+        for record in run_selfplay(args.games, player1, player2, args.workers, args.random_plies, args.max_plies,
+                                   args.seed):
+            output.write(json.dumps(record, separators=(',', ':')) + '\n')
+            results[record['result']] += 1
+            if positions is not None:
+                positions.write_game(record['game'], record_boards(record), RESULT_CODES[record['result']])
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if positions is not None:
+            positions.close()
+    elapsed = time.perf_counter() - start
+
+    print(f'{args.games} games in {elapsed:.1f} s ({args.games / elapsed:.2f} games/s): Player 1 won '
+          f'{results[PLAYER1_WINS]}, Player 2 won {results[PLAYER2_WINS]}, {results[DRAW]} drawn', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+"""
+Game server: plays many games of checkers at once against remote clients over a JSON-lines protocol on TCP or a Unix
+socket. Each client request is one JSON object on a line, and each gets one JSON object back on a line, carrying the
+request's "id" if it had one:
+
+    {"id":1,"op":"new","time_budget_ms":500}
+    {"id":1,"game":1,"board":[[0,2,0,2,...],...],"turn":"player1","winner":null}
+    {"id":2,"op":"move","game":1,"move":[5,0,4,1]}
+    {"id":2,"game":1,"board":[...],"turn":"player1","winner":null,"ai_move":[2,1,3,0],"depth":6,"nodes":10412}
+
+The client plays Player 1 and moves first; the AI replies as Player 2 within the game's time budget. Requests:
+
+- new: starts a game. Optional "time_budget_ms" (capped by --max-budget) and "board", a 2-D board configuration
+  as in board_configs.py to start from.
+- move: plays the client's move [from_row, from_col, to_row, to_col] in "game", then the AI's reply. The move is
+  validated exactly as a click on the piece and then on its destination in the GUI would be.
+- state: returns the position, the side to move and the winner of "game".
+- close: ends "game". A game also ends when the connection that started it closes.
+- stats: returns the number of games, the search queue depth and the p50/p99 latency of move requests.
+
+An invalid request gets {"error": "..."} back. A side with no piece or no legal move left loses. Requests on one
+connection are served concurrently, so replies may come out of order; the requests of one game are served in order.
+
+The AI searches run in a bounded process pool. A search waits in the queue while every worker is busy, and a move is
+refused while the queue is full.
+
+Usage:
+    python server.py [--host HOST] [--port PORT] [--unix PATH] [--workers W] [--max-queue Q] [--budget MS]
+                     [--max-budget MS]
+"""
+
+from ai import _apply_descriptor, _move_key, iterative_deepening
+from bitboard import BitBoard
+from board import Board
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+from game import Game
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+
+
+DEFAULT_TIME_BUDGET_MS = 1000
+MAX_TIME_BUDGET_MS = 10000
+LATENCY_SAMPLES = 10000  # Latency percentiles are taken over this many of the most recent moves.
+
+COLOR_NAMES = {PLAYER1_PIECE_COLOR: 'player1', PLAYER2_PIECE_COLOR: 'player2'}
+
+
+def search_move(board_config, time_budget_ms, eval_params=None):
+    """
+    Searches the AI's move in a position. Runs in a worker process of the server's pool.
+
+    Args:
+        board_config (list): A 2-D board configuration with the AI (Player 2) to move
+        time_budget_ms (float): The wall-clock time the search may take, in milliseconds
+        eval_params (tuple, optional): A tuple of weights for evaluating the board state
+
+    Returns:
+        dict: The board configuration after the move ('board'), the move as [from_row, from_col, to_row, to_col]
+        ('move'), and the depth and nodes of the search. 'board' and 'move' are None if the AI has no legal move
+    """
+
+    game = Game()
+    board = BitBoard(board_config)
+    descriptors = game.generate_all_move_descriptors(board, PLAYER2_PIECE_COLOR)
+    if not descriptors:
+        return {'board': None, 'move': None, 'depth': 0, 'nodes': 0}
+
+    result = iterative_deepening(board, game, time_budget_ms, True, eval_params)
+    if result.pv:
+        (from_row, from_col), (to_row, to_col) = result.pv[0]
+        new_board = result.board
+    else:
+        # Every move loses within the horizon, so the search prefers none of them.
+        (from_row, from_col), (to_row, to_col) = _move_key(descriptors[0])
+        new_board = _apply_descriptor(board, descriptors[0], game)
+    return {'board': new_board.to_board_config(), 'move': [from_row, from_col, to_row, to_col],
+            'depth': result.depth, 'nodes': result.nodes}
+
+
+def percentile(samples, fraction):
+    """
+    Returns the nearest-rank percentile of some samples.
+
+    Args:
+        samples (list): The samples, sorted in increasing order
+        fraction (float): The percentile as a fraction, e.g. 0.99
+
+    Returns:
+        float: The smallest sample not exceeded by the given fraction of the samples, or None without samples
+    """
+
+    if not samples:
+        return None
+    return samples[max(math.ceil(fraction * len(samples)) - 1, 0)]
+
+
+class _Session:
+    def __init__(self, game, time_budget_ms):
+        """
+        A game being played on the server.
+        """
+
+        self.game = game
+        self.time_budget_ms = time_budget_ms
+        self.winner = None
+        self.lock = asyncio.Lock()  # Serves the requests of a game in order.
+
+
+class GameServer:
+    def __init__(self, workers=None, max_queue=64, default_budget_ms=DEFAULT_TIME_BUDGET_MS,
+                 max_budget_ms=MAX_TIME_BUDGET_MS, eval_params=None):
+        """
+        Holds the games and serves requests for them. Create it inside the event loop that serves it.
+
+        Args:
+            workers (int, optional): The number of worker processes searching AI moves. Defaults to the number of CPUs
+            max_queue (int, optional): How many searches may wait for a worker before further moves are refused
+            default_budget_ms (float, optional): The time budget of the AI's moves in games that do not set one
+            max_budget_ms (float, optional): The largest time budget a game may set
+            eval_params (tuple, optional): A tuple of weights for evaluating the board state
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.default_budget_ms = default_budget_ms
+        self.max_budget_ms = max_budget_ms
+        self.eval_params = eval_params
+        self.sessions = {}
+        self.queued = 0
+        self.searching = 0
+        self.moves = 0
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._game_ids = itertools.count(1)
+        self._slots = asyncio.Semaphore(self.workers)
+        # Forked workers would inherit the sockets of the connections open when the pool starts and keep them open
+        # after the server closes them, so the workers are started afresh instead.
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def close(self):
+        """
+        Shuts the worker processes down, waiting for the searches under way.
+        """
+
+        self._executor.shutdown()
+
+    async def serve_tcp(self, host='127.0.0.1', port=0):
+        """
+        Starts serving connections on a TCP port.
+
+        Returns:
+            asyncio.Server: The listening server. Port 0 picks a free port, found in its `sockets`
+        """
+
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_unix(self, path):
+        """
+        Starts serving connections on a Unix socket.
+
+        Returns:
+            asyncio.Server: The listening server
+        """
+
+        return await asyncio.start_unix_server(self.handle_connection, path)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves the requests of a connection until the client closes it.
+        """
+
+        tasks = set()
+        games = set()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(self._respond(line, writer, games))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            # Nobody is left to read the replies of a dropped connection, nor to play or close its games.
+            for task in tasks:
+                task.cancel()
+            for game_id in games:
+                self.sessions.pop(game_id, None)
+            writer.close()
+
+    async def _respond(self, line, writer, games):
+        """
+        Serves a request line and writes the response line.
+        """
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('expected a JSON object')
+        except ValueError as error:
+            response = {'error': f'invalid request: {error}'}
+        else:
+            response = await self.dispatch(request, games)
+        writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+        await writer.drain()
+
+    async def dispatch(self, request, games=None):
+        """
+        Serves a request.
+
+        Args:
+            request (dict): The decoded request
+            games (set, optional): The ids of the games started on the connection of the request, which are ended when
+                it closes. A game the request starts is added to it
+
+        Returns:
+            dict: The response, with the request's "id" if it had one
+        """
+
+        handlers = {'new': self._new, 'move': self._move, 'state': self._state, 'close': self._close,
+                    'stats': self._stats}
+        op = request.get('op')
+        try:
+            if not isinstance(op, str) or op not in handlers:
+                raise ValueError(f'unknown op {op!r}, expected one of {", ".join(handlers)}')
+            response = await handlers[op](request, games)
+        except ValueError as error:
+            response = {'error': str(error)}
+        except Exception as error:
+            # Whatever else goes wrong, the client still gets its reply line instead of waiting for it forever.
+            response = {'error': f'internal error: {type(error).__name__}: {error}'}
+        if 'id' in request:
+            response = {'id': request['id'], **response}
+        return response
+
+    def stats(self):
+        """
+        Returns the server's load and responsiveness.
+
+        Returns:
+            dict: The number of games, searches waiting for a worker ('queue_depth') and running, moves played, and
+            the p50 and p99 latency of the recent move requests in milliseconds (None before the first move)
+        """
+
+        latencies = sorted(self.latencies_ms)
+        return {'games': len(self.sessions), 'queue_depth': self.queued, 'searching': self.searching,
+                'workers': self.workers, 'moves': self.moves,
+                'latency_ms': {'p50': percentile(latencies, 0.50), 'p99': percentile(latencies, 0.99)}}
+
+    async def _new(self, request, games):
+        budget_ms = request.get('time_budget_ms', self.default_budget_ms)
+        if (isinstance(budget_ms, bool) or not isinstance(budget_ms, (int, float)) or not math.isfinite(budget_ms) or
+                budget_ms <= 0):
+            raise ValueError('time_budget_ms must be a positive number')
+        game = Game()
+        if request.get('board') is not None:
+            game.board = Board(_parse_board_config(request['board']))
+        session = _Session(game, min(budget_ms, self.max_budget_ms))
+        session.winner = _winner(game)
+        game_id = next(self._game_ids)
+        self.sessions[game_id] = session
+        if games is not None:
+            games.add(game_id)
+        return {'game': game_id, **_describe(session)}
+
+    async def _move(self, request, games):
+        start = time.perf_counter()
+        game_id, session = self._session(request)
+        move = request.get('move')
+        if (not isinstance(move, list) or len(move) != 4 or
+                not all(type(square) is int and 0 <= square < 8 for square in move)):
+            raise ValueError('move must be [from_row, from_col, to_row, to_col]')
+
+        async with session.lock:
+            if session.winner is not None:
+                raise ValueError('the game is over')
+            if self.queued >= self.max_queue:
+                raise ValueError('the server is busy, retry later')
+            board_config, turn = session.game.board.to_board_config(), session.game.turn
+            if not _play_human_move(session.game, *move):
+                raise ValueError(f'illegal move {move}')
+            session.winner = _winner(session.game)
+
+            response = {}
+            if session.winner is None:
+                try:
+                    result = await self._search(session)
+                except BaseException:
+                    # Take the client's move back, so that the game is left as it was and the move can be retried.
+                    session.game.board, session.game.turn = Board(board_config), turn
+                    session.winner = None
+                    raise
+                if result['board'] is None:
+                    session.winner = PLAYER1_PIECE_COLOR
+                else:
+                    session.game.ai_move(Board(result['board']))
+                    session.winner = _winner(session.game)
+                response = {'ai_move': result['move'], 'depth': result['depth'], 'nodes': result['nodes']}
+
+        self.moves += 1
+        self.latencies_ms.append((time.perf_counter() - start) * 1000)
+        return {'game': game_id, **_describe(session), **response}
+
+    async def _state(self, request, games):
+        game_id, session = self._session(request)
+        return {'game': game_id, **_describe(session)}
+
+    async def _close(self, request, games):
+        game_id, _ = self._session(request)
+        del self.sessions[game_id]
+        if games is not None:
+            games.discard(game_id)
+        return {'game': game_id, 'closed': True}
+
+    async def _stats(self, request, games):
+        return self.stats()
+
+    def _session(self, request):
+        """
+        Returns the game id and session of a request.
+        """
+
+        game_id = request.get('game')
+        if type(game_id) is not int or game_id not in self.sessions:
+            raise ValueError(f'unknown game {game_id!r}')
+        return game_id, self.sessions[game_id]
+
+    async def _search(self, session):
+        """
+        Searches the AI's move in the worker pool, waiting for a free worker first.
+        """
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.searching += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, search_move, session.game.board.to_board_config(), session.time_budget_ms,
+                self.eval_params)
+        finally:
+            self.searching -= 1
+            self._slots.release()
+
+
+def _parse_board_config(board_config):
+    """
+    Checks that a board configuration from a request is an 8x8 array of piece codes with pieces on dark squares only.
+    """
+
+    if (not isinstance(board_config, list) or len(board_config) != 8 or
+            not all(isinstance(row, list) and len(row) == 8 and all(code in (0, 1, 2, 11, 22) for code in row)
+                    for row in board_config)):
+        raise ValueError('board must be an 8x8 array of 0, 1, 2, 11 and 22')
+    for row, config_row in enumerate(board_config):
+        for col, code in enumerate(config_row):
+            if code and (row + col) % 2 == 0:
+                raise ValueError(f'board has a piece on the light square ({row}, {col})')
+    return board_config
+
+
+def _play_human_move(game, from_row, from_col, to_row, to_col):
+    """
+    Plays Player 1's move the way the GUI would: by selecting the piece and then its destination.
+
+    Returns:
+        bool: True if the move was legal and played
+    """
+
+    if game.turn != PLAYER1_PIECE_COLOR:
+        return False
+    game.selected = None
+    if not game.select(from_row, from_col):
+        return False
+    game.select(to_row, to_col)
+    if game.turn == PLAYER1_PIECE_COLOR:
+        # The click on the destination did not move the piece, at most selecting another one.
+        game.selected = None
+        game.valid_moves = {}
+        return False
+    game.selected = None
+    return True
+
+
+def _winner(game):
+    """
+    Returns the color of the winner of a game, or None while it goes on. A side with no piece or no legal move left
+    loses.
+    """
+
+    winner = game.winner()
+    if winner is None and not any(True for _ in game.iter_all_moves(game.board, game.turn)):
+        winner = PLAYER2_PIECE_COLOR if game.turn == PLAYER1_PIECE_COLOR else PLAYER1_PIECE_COLOR
+    return winner
+
+
+def _describe(session):
+    """
+    Returns the position, side to move and winner of a game as they are sent to clients.
+    """
+
+    return {'board': session.game.board.to_board_config(), 'turn': COLOR_NAMES[session.game.turn],
+            'winner': COLOR_NAMES.get(session.winner)}
+
+
+async def _serve(args):
+    server = GameServer(args.workers, args.max_queue, args.budget, args.max_budget)
+    try:
+        if args.unix:
+            listener = await server.serve_unix(args.unix)
+            print(f'Serving on {args.unix}')
+        else:
+            listener = await server.serve_tcp(args.host, args.port)
+            print(f'Serving on {args.host}:{listener.sockets[0].getsockname()[1]}')
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port to listen on (default: 8765)')
+    parser.add_argument('--unix', help='Unix socket path to listen on instead of TCP')
+    parser.add_argument('--workers', type=int, help='worker processes searching AI moves (default: number of CPUs)')
+    parser.add_argument('--max-queue', type=int, default=64, help='searches that may wait for a worker (default: 64)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_TIME_BUDGET_MS,
+                        help=f'default time budget of an AI move in ms (default: {DEFAULT_TIME_BUDGET_MS})')
+    parser.add_argument('--max-budget', type=float, default=MAX_TIME_BUDGET_MS,
+                        help=f'largest time budget a game may set in ms (default: {MAX_TIME_BUDGET_MS})')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
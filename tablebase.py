@@ -0,0 +1,382 @@
+"""
+Endgame tablebase: the exact result of every position with few pieces, found by retrograde analysis and probed by the
+search instead of searching those positions.
+
+A side with no legal move (including no piece left) loses. Positions are solved in slices of increasing piece count,
+since a capture always leads to a slice that is already solved. Within a slice, the successors of every position are
+generated in a process pool, and results are propagated backwards from the positions whose outcome is known in order
+of increasing distance, so that each win is as short and each loss as long as possible.
+
+A tablebase file starts with a header (magic, format version, record size, maximum piece count, number of records)
+followed by fixed-size records sorted by position: the bitboard triple (Player 1, Player 2 and king masks), the side to
+move, the result for the side to move (WIN or LOSS) and the distance to the end of the game in plies. Drawn positions
+are not stored: a position within the piece limit that is not in the file is a draw. The file is memory-mapped and
+looked up by binary search.
+
+Usage:
+    python tablebase.py [--pieces N] [--workers W] [--output FILE]
+
+Three pieces (about 480,000 positions) take half a minute on one core and 6 MB on disk. Every extra piece multiplies
+the number of positions by about thirty, and the generator keeps a slice's successors in memory.
+"""
+
+from bitboard import BitBoard, SQUARE_COORDS
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR, ROWS
+from encoding import board_from_masks, board_masks
+from game import Game
+from itertools import combinations, product
+import argparse
+import mmap
+import struct
+import sys
+import time
+
+
+TABLEBASE_MAGIC = b'CKTB'
+TABLEBASE_VERSION = 1
+TABLEBASE_HEADER = struct.Struct('<4sHHHI')
+TABLEBASE_RECORD = struct.Struct('<IIIBBH')
+TABLEBASE_POSITION = struct.Struct('<IIIB')
+
+DEFAULT_TABLEBASE_PATH = 'tablebase.bin'
+
+# Results, from the point of view of the side to move.
+DRAW = 0
+WIN = 1
+LOSS = 2
+
+# The magnitude of the search score of a tablebase win or loss, minus its distance so that shorter wins and longer
+# losses are preferred. It is far beyond any evaluation but below the infinite score of a position with no move.
+WIN_SCORE = 1e6
+
+# A probed position: its result for the side to move and the number of plies to the end of the game.
+TablebaseValue = namedtuple('TablebaseValue', ['result', 'distance'])
+
+# Sides to move as stored in the records.
+_SIDES = {1: PLAYER1_PIECE_COLOR, 2: PLAYER2_PIECE_COLOR}
+
+
+def _pack(player1, player2, kings, side):
+    """
+    Packs a position into one integer, used as a dict key while generating.
+    """
+
+    return player1 | player2 << 32 | kings << 64 | side << 96
+
+
+def _unpack(position):
+    """
+    Reverses _pack().
+    """
+
+    mask = (1 << 32) - 1
+    return position & mask, position >> 32 & mask, position >> 64 & mask, position >> 96
+
+
+def slice_positions(count):
+    """
+    Lists every position with the given number of pieces, both sides having at least one, with either side to move.
+    Men are never placed on the row where they would have been crowned.
+
+    Args:
+        count (int): The number of pieces
+
+    Returns:
+        list: The positions, packed with _pack()
+    """
+
+    positions = []
+    for squares in combinations(range(len(SQUARE_COORDS)), count):
+        for owners in product((1, 2), repeat=count):
+            if 1 not in owners or 2 not in owners:
+                continue
+            for crowned in product((False, True), repeat=count):
+                player1 = player2 = kings = 0
+                for square, owner, king in zip(squares, owners, crowned):
+                    row = SQUARE_COORDS[square][0]
+                    if not king and row == (0 if owner == 1 else ROWS - 1):
+                        break
+                    if owner == 1:
+                        player1 |= 1 << square
+                    else:
+                        player2 |= 1 << square
+                    if king:
+                        kings |= 1 << square
+                else:
+                    positions.extend(_pack(player1, player2, kings, side) for side in (1, 2))
+    return positions
+
+
+def successors(positions):
+    """
+    Generates the positions reachable in one move from each of the given positions.
+
+    Args:
+        positions (list): Packed positions
+
+    Returns:
+        list: For each position, the list of the packed positions its moves lead to (empty if it has no move)
+    """
+
+    game = Game()
+    result = []
+    for position in positions:
+        player1, player2, kings, side = _unpack(position)
+        board = board_from_masks(player1, player2, kings, BitBoard)
+        children = []
+        for piece, move, captured_pieces, _ in game.generate_all_move_descriptors(board, _SIDES[side]):
+            undo = game.make_move(board, piece, move, captured_pieces)
+            children.append(_pack(board.player1, board.player2, board.kings, 3 - side))
+            game.unmake_move(board, undo)
+        result.append(children)
+    return result
+
+
+def solve_slice(positions, children, solved):
+    """
+    Solves the positions of one piece count by retrograde analysis.
+
+    Args:
+        positions (list): The packed positions of the slice
+        children (list): The successors of each position, as returned by successors()
+        solved (dict): The TablebaseValue of every won or lost position with fewer pieces, keyed by packed position.
+            Positions of fewer pieces that are not in it are draws. The results of this slice are added to it
+    """
+
+    index = {position: i for i, position in enumerate(positions)}
+    size = len(positions)
+    predecessors = [[] for _ in range(size)]
+    remaining = [0] * size        # Successors in this slice not yet known to be won by the opponent.
+    longest = [0] * size          # The longest distance of the successors known to be won by the opponent.
+    can_lose = [True] * size      # False once a successor is a draw or a loss for the opponent.
+    buckets = defaultdict(list)   # (position index, result) candidates by distance.
+
+    for i, position_children in enumerate(children):
+        if not position_children:
+            buckets[0].append((i, LOSS))
+            continue
+        for child in position_children:
+            j = index.get(child)
+            if j is not None:
+                predecessors[j].append(i)
+                remaining[i] += 1
+                continue
+
+            player1, player2, _, side = _unpack(child)
+            if not (player1 if side == 1 else player2):
+                value = TablebaseValue(LOSS, 0)
+            else:
+                value = solved.get(child, TablebaseValue(DRAW, 0))
+            if value.result == LOSS:
+                buckets[value.distance + 1].append((i, WIN))
+                can_lose[i] = False
+            elif value.result == WIN:
+                longest[i] = max(longest[i], value.distance)
+            else:
+                can_lose[i] = False
+        if remaining[i] == 0 and can_lose[i]:
+            buckets[longest[i] + 1].append((i, LOSS))
+
+    results = [None] * size
+    distance = 0
+    while buckets:
+        for i, result in buckets.pop(distance, ()):
+            if results[i] is not None:
+                continue
+            results[i] = result
+            solved[positions[i]] = TablebaseValue(result, distance)
+            for predecessor in predecessors[i]:
+                if result == LOSS:
+                    can_lose[predecessor] = False
+                    buckets[distance + 1].append((predecessor, WIN))
+                else:
+                    remaining[predecessor] -= 1
+                    longest[predecessor] = max(longest[predecessor], distance)
+                    if remaining[predecessor] == 0 and can_lose[predecessor]:
+                        buckets[longest[predecessor] + 1].append((predecessor, LOSS))
+        distance += 1
+
+
+def generate(max_pieces, workers=None, chunk_size=2048):
+    """
+    Solves every position with up to the given number of pieces.
+
+    Args:
+        max_pieces (int): The largest number of pieces on the board
+        workers (int, optional): The number of worker processes generating successors. Defaults to the number of CPUs.
+            With 1, successors are generated in this process
+        chunk_size (int, optional): The number of positions handed to a worker at a time
+
+    Returns:
+        dict: The TablebaseValue of every won or lost position, keyed by packed position
+    """
+
+    solved = {}
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        for count in range(2, max_pieces + 1):
+            positions = slice_positions(count)
+            chunks = [positions[start:start + chunk_size] for start in range(0, len(positions), chunk_size)]
+            children = []
+            for chunk_children in (executor.map(successors, chunks) if executor else map(successors, chunks)):
+                children.extend(chunk_children)
+            solve_slice(positions, children, solved)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return solved
+
+
+def write_tablebase(path, max_pieces, solved):
+    """
+    Writes a tablebase file.
+
+    Args:
+        path (str): The path of the file to write
+        max_pieces (int): The piece limit the positions were generated for
+        solved (dict): The won and lost positions, as returned by generate()
+    """
+
+    with open(path, 'wb') as file:
+        file.write(TABLEBASE_HEADER.pack(TABLEBASE_MAGIC, TABLEBASE_VERSION, TABLEBASE_RECORD.size, max_pieces,
+                                         len(solved)))
+        for position in sorted(solved, key=_unpack):
+            value = solved[position]
+            file.write(TABLEBASE_RECORD.pack(*_unpack(position), value.result, value.distance))
+
+
+class Tablebase:
+    def __init__(self, path=DEFAULT_TABLEBASE_PATH):
+        """
+        Memory-maps a tablebase file for probing.
+
+        Args:
+            path (str, optional): The path of the tablebase file
+
+        Raises:
+            ValueError: If the file is not a tablebase file of this version
+        """
+
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # An empty file cannot be mapped.
+            self.file.close()
+            raise ValueError(f'{path} is not a tablebase')
+
+        header = self.data[:TABLEBASE_HEADER.size]
+        magic, version, record_size, max_pieces, count = TABLEBASE_HEADER.unpack(header) if (
+            len(header) == TABLEBASE_HEADER.size) else (None, None, None, 0, 0)
+        if (magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION or record_size != TABLEBASE_RECORD.size or
+                len(self.data) < TABLEBASE_HEADER.size + count * TABLEBASE_RECORD.size):
+            self.close()
+            raise ValueError(f'{path} is not a version {TABLEBASE_VERSION} tablebase')
+
+        self.max_pieces = max_pieces
+        self.count = count
+        self.probes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, player1, player2, kings, side):
+        """
+        Finds a position by binary search over the mapped file.
+
+        Args:
+            player1 (int): The mask of Player 1's pieces
+            player2 (int): The mask of Player 2's pieces
+            kings (int): The mask of the kings of both players
+            side (int): The side to move, 1 for Player 1 or 2 for Player 2
+
+        Returns:
+            TablebaseValue: The value of the position, or None if it is not covered by the tablebase (a side has no
+            piece, or there are too many pieces)
+        """
+
+        if not player1 or not player2 or bin(player1 | player2).count('1') > self.max_pieces:
+            return None
+
+        self.probes += 1
+        target = (player1, player2, kings, side)
+        data = self.data
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = TABLEBASE_HEADER.size + middle * TABLEBASE_RECORD.size
+            position = TABLEBASE_POSITION.unpack_from(data, offset)
+            if position < target:
+                low = middle + 1
+            elif position > target:
+                high = middle
+            else:
+                _, _, _, _, result, distance = TABLEBASE_RECORD.unpack_from(data, offset)
+                return TablebaseValue(result, distance)
+        return TablebaseValue(DRAW, 0)
+
+    def probe(self, board, max_player):
+        """
+        Looks up a position.
+
+        Args:
+            board (Board): The position
+            max_player (bool): True if Player 2 (the maximizing player) is to move
+
+        Returns:
+            TablebaseValue: The value of the position for the side to move, or None if it is not covered
+        """
+
+        return self.lookup(*board_masks(board), 2 if max_player else 1)
+
+    def score(self, value, max_player):
+        """
+        Converts a tablebase value to a search score.
+
+        Args:
+            value (TablebaseValue): The value returned by probe()
+            max_player (bool): True if Player 2 (the maximizing player) is to move in the probed position
+
+        Returns:
+            float: The score from Player 2's point of view: 0.0 for a draw, and close to +/-WIN_SCORE for a win or
+            loss, nearer for shorter distances
+        """
+
+        if value.result == DRAW:
+            return 0.0
+        score = WIN_SCORE - value.distance
+        return score if (value.result == WIN) == max_player else -score
+
+    def close(self):
+        """
+        Unmaps and closes the tablebase file.
+        """
+
+        self.data.close()
+        self.file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pieces', type=int, default=3, help='the largest number of pieces on the board')
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--output', default=DEFAULT_TABLEBASE_PATH, help='the tablebase file to write')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    solved = generate(args.pieces, args.workers)
+    write_tablebase(args.output, args.pieces, solved)
+    print(f'{len(solved)} won or lost positions written to {args.output} in {time.perf_counter() - start:.1f} s',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1184 @@
+from ai import _move_key, compare_boards, counts, evaluate, IncrementalEvaluator, iterative_deepening, minimax_alpha_beta, Search
+from ai_player import AIPlayer
+from bitboard import BitBoard
+from board import Board
+from concurrent.futures import ThreadPoolExecutor
+from constants import PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR
+from copy import deepcopy
+from game import Game
+from move_cache import MoveCache
+from search_stats import SearchStats
+from server import GameServer
+from transposition import TranspositionTable, EXACT
+import ai
+import analysis
+import asyncio
+import batch_eval
+import board_configs
+import encoding
+import gc
+import json
+import opening_book
+import os
+import selfplay
+import tablebase
+import tempfile
+import threading
+import time
+import unittest
+import warnings
+import zobrist
+
+
+class AiTest(unittest.TestCase):
+
+    def test_counts_with_boards(self):
+        for b in range(0, 6):  # num_configs is the number of board configs you have
+            config = getattr(board_configs, f'board_config{b + 1}')
+            board = Board(config)
+            game = Game()
+            colors = [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]
+
+            piece_counts = [[7, 13], [7, 12], [6, 12], [1, 11], [1, 10], [2, 12]]
+            king_counts  = [[2, 2], [2, 3], [3, 2], [1, 0], [1, 0], [1, 0]]
+            move_counts  = [[8, 17], [10, 14], [7, 11], [0, 12], [1, 12], [0, 12]]
+            opportunity_counts  = [[3, 4], [4, 3], [1, 3], [0, 0], [1, 0], [0, 1]]
+            king_hopeful_counts  = [[0, 0], [1, 0], [1, 0], [0, 2], [0, 2], [0, 2]]
+
+            for c in range(2):
+
+                color = colors[c]
+                num_pieces, num_kings, num_moves, num_opportunities, num_king_hopefuls = counts(board, game, color)
+                self.assertEqual(num_pieces, piece_counts[b][c])
+                self.assertEqual(num_kings, king_counts[b][c])
+                self.assertEqual(num_moves, move_counts[b][c])
+                self.assertEqual(num_opportunities, opportunity_counts[b][c])
+                self.assertEqual(num_king_hopefuls, king_hopeful_counts[b][c])
+
+    def test_evaluate_1(self):
+
+        expected_scores = [6.0, 6.0, 5.0, 9.0, 8.0, 9.0, 8.0, 10.0, 10.0, 4.0, 3.0, 4.0]
+
+        game = Game()
+        for b in range(0, 12):  # num_configs is the number of board configs you have
+            config = getattr(board_configs, f'board_config{b + 1}')
+            board = Board(config)
+            score = evaluate(board, game)
+            self.assertEqual(score, expected_scores[b])
+
+    def test_evaluate_2(self):
+
+        expected_scores = [16.0, 8.0, 10.0, 23.0, 20.0, 24.0, 22.0, 25.0, 23.0, 9.0, 10.0, 13.0]
+
+        game = Game()
+        for b in range(0, 12):  # num_configs is the number of board configs you have
+            config = getattr(board_configs, f'board_config{b + 1}')
+            board = Board(config)
+            score = evaluate(board, game, moves_weight=1.0, opportunities_weight=1.0, king_hopefuls_weight=1.0)
+            self.assertEqual(score, expected_scores[b])
+
+    def test_evaluate_3(self):
+
+        expected_scores = [11.0, 7.25, 7.75, 15.5, 13.5, 16.0, 14.5, 16.75, 16.0, 6.25, 6.25, 8.25]
+
+        game = Game()
+        for b in range(0, 12):  # num_configs is the number of board configs you have
+            config = getattr(board_configs, f'board_config{b + 1}')
+            board = Board(config)
+            score = evaluate(board, game, pieces_weight=1.0, kings_weight=1.0, moves_weight=0.5, opportunities_weight=0.5, king_hopefuls_weight=0.25)
+            self.assertEqual(score, expected_scores[b])
+
+    def test_evaluate_4(self):
+
+        expected_scores = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+        game = Game()
+        for b in range(0, 12):  # num_configs is the number of board configs you have
+            config = getattr(board_configs, f'board_config{b + 1}')
+            board = Board(config)
+            score = evaluate(board, game, pieces_weight=0.0, kings_weight=0.0, moves_weight=0.0, opportunities_weight=0.0, king_hopefuls_weight=0.0)
+            self.assertEqual(score, expected_scores[b])
+
+    def test_minimax_alpha_beta_1(self):
+
+        game = Game()
+        board = Board()
+
+        value, new_board = minimax_alpha_beta(board, 1, float('-inf'), float('inf'), True, game)
+
+        true_board = Board(board_configs.board_config13)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_2(self):
+
+        game = Game()
+        board = Board()
+
+
+        value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), True, game)
+
+        true_board = Board(board_configs.board_config14)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_3(self):
+
+        game = Game()
+        board = Board()
+
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game)
+
+        true_board = Board(board_configs.board_config15)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_4(self):
+
+        game = Game()
+        board = Board()
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 1, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config16)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_5(self):
+
+        game = Game()
+        board = Board()
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config17)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_6(self):
+
+        game = Game()
+        board = Board()
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config18)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_7(self):
+
+        game = Game()
+        board = Board(board_configs.board_config1)
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config19)
+
+ 
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_8(self):
+
+        game = Game()
+        board = Board(board_configs.board_config2)
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 4, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config20)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_9(self):
+
+        game = Game()
+        board = Board(board_configs.board_config3)
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config21)
+ 
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_10(self):
+
+        game = Game()
+        board = Board(board_configs.board_config4)
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+        
+
+        true_board = Board(board_configs.board_config22)
+        
+
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_11(self):
+
+        game = Game()
+        board = Board(board_configs.board_config6)
+
+        eval_params = (0.0, 1.0, 1.0, 0.0, 0.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config23)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_12(self):
+
+        game = Game()
+        board = Board(board_configs.board_config7)
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config24)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_13(self):
+
+        game = Game()
+        board = Board(board_configs.board_config9)
+
+        eval_params = (1.0, 1.0, 0.0, 0.0, 1.0)
+        value, new_board = minimax_alpha_beta(board, 4, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config25)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_14(self):
+
+        game = Game()
+        board = Board(board_configs.board_config10)
+
+        eval_params = (0.0, 0.0, 0.0, 0.0, 0.0)
+        value, new_board = minimax_alpha_beta(board, 4, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config26)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_15(self):
+
+        game = Game()
+        board = Board(board_configs.board_config11)
+
+        eval_params = (1.0, 1.0, 1.5, 1.5, 1.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config27)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_minimax_alpha_beta_16(self):
+
+        game = Game()
+        board = Board(board_configs.board_config12)
+
+        eval_params = (1.0, 1.0, 1.0, 1.0, 1.0)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config28)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_bitboard_round_trip(self):
+
+        for b in range(0, 28):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            self.assertEqual(BitBoard(config).to_board_config(), config)
+
+        self.assertEqual(BitBoard().to_board_config(), Board().to_board_config())
+
+    def test_bitboard_generate_all_moves(self):
+
+        game = Game()
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                moves = game.generate_all_moves(Board(config), color)
+                bit_moves = game.generate_all_moves(BitBoard(config), color)
+
+                self.assertEqual([move.to_board_config() for move in bit_moves],
+                                 [move.to_board_config() for move in moves])
+
+    def test_bitboard_counts(self):
+
+        game = Game()
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                self.assertEqual(counts(BitBoard(config), game, color), counts(Board(config), game, color))
+
+    def test_bitboard_minimax_alpha_beta(self):
+
+        game = Game()
+        board = BitBoard(board_configs.board_config4)
+
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        true_board = Board(board_configs.board_config22)
+
+        self.assertTrue(compare_boards(new_board, true_board))
+
+    def test_make_unmake_move(self):
+
+        game = Game()
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for board in [Board(config), BitBoard(config)]:
+                for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                    children = game.generate_all_moves(board, color)
+                    descriptors = game.generate_all_move_descriptors(board, color)
+                    self.assertEqual(len(descriptors), len(children))
+
+                    for (piece, move, captured_pieces, _), child in zip(descriptors, children):
+                        undo = game.make_move(board, piece, move, captured_pieces)
+                        self.assertEqual(board.to_board_config(), child.to_board_config())
+                        game.unmake_move(board, undo)
+                        self.assertEqual(board.to_board_config(), config)
+
+    def test_find_moves_matches_tree(self):
+
+        def summary(moves):
+            return [(tuple(move), [(captured.row, captured.col, captured.code) for captured in captured_pieces],
+                     king_hopeful) for move, captured_pieces, king_hopeful in moves]
+
+        game = Game()
+        configs = [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]
+        for config in configs:
+            for board in [Board(config), BitBoard(config)]:
+                before = board.to_board_config()
+                for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                    for piece in board.get_all_pieces(color):
+                        self.assertEqual(summary(game.find_moves(board, piece)),
+                                         summary(game.find_moves_tree(board, piece)))
+                self.assertEqual(board.to_board_config(), before)
+
+    def test_iter_all_moves(self):
+
+        game = Game()
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for board in [Board(config), BitBoard(config)]:
+                for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                    children = game.generate_all_moves(board, color)
+                    self.assertEqual([child.to_board_config() for child in game.iter_all_moves(board, color)],
+                                     [child.to_board_config() for child in children])
+
+                    # Moves may be made and unmade between descriptors, as the in-place search does.
+                    descriptors = []
+                    for descriptor in game.iter_all_move_descriptors(board, color):
+                        descriptors.append(_move_key(descriptor))
+                        piece, move, captured_pieces, _ = descriptor
+                        undo = game.make_move(board, piece, move, captured_pieces)
+                        game.unmake_move(board, undo)
+                    self.assertEqual(descriptors, [_move_key(descriptor)
+                                                   for descriptor in game.generate_all_move_descriptors(board, color)])
+
+        # Only the pieces whose moves are consumed are looked at.
+        calls = []
+        game.find_moves = lambda board, piece: calls.append(piece) or Game.find_moves(game, board, piece)
+        next(game.iter_all_moves(Board(), PLAYER1_PIECE_COLOR))
+        del game.find_moves
+        self.assertEqual(len(calls), 1)
+
+    def test_move_cache(self):
+
+        cache = MoveCache(size=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)  # Evicts 'b', the least recently used.
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c'), len(cache)), (1, 3, 2))
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(cache.hit_rate(), 0.75)
+
+        # Cached moves are the moves generated without a cache, captured pieces included, for either board class.
+        plain, cached = Game(), Game(MoveCache())
+        for b in range(0, 28):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for board in [Board(config), BitBoard(config)]:
+                for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                    self.assertEqual(counts(board, cached, color), counts(board, plain, color))
+                    for piece in board.get_all_pieces(color):
+                        expected = plain.find_moves(board, piece)
+                        for _ in range(2):
+                            moves = cached.find_moves(board, piece)
+                            self.assertEqual([(move, [(captured.row, captured.col) for captured in captured_pieces],
+                                               king_hopeful) for move, captured_pieces, king_hopeful in moves],
+                                             [(move, [(captured.row, captured.col) for captured in captured_pieces],
+                                               king_hopeful) for move, captured_pieces, king_hopeful in expected])
+                            if type(board) is Board:
+                                # The captured pieces are those of the board the moves were looked up for. (A BitBoard
+                                # builds new pieces on each get_piece(), so only a Board can be checked.)
+                                for _, captured_pieces, _ in moves:
+                                    for captured in captured_pieces:
+                                        self.assertIs(captured, board.get_piece(captured.row, captured.col))
+        self.assertGreater(cached.move_cache.hits, 0)
+
+        # The searches find the same moves with a cache shared by two threads.
+        shared = MoveCache(size=256)
+        expected = [minimax_alpha_beta(Board(getattr(board_configs, f'board_config{b + 1}')), 3, float('-inf'),
+                                       float('inf'), True, Game())[1].to_board_config() for b in range(6)]
+        results = {}
+
+        def search(name):
+            game = Game(shared)
+            results[name] = [minimax_alpha_beta(Board(getattr(board_configs, f'board_config{b + 1}')), 3,
+                                                float('-inf'), float('inf'), True, game)[1].to_board_config()
+                             for b in range(6)]
+
+        threads = [threading.Thread(target=search, args=(name,)) for name in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {0: expected, 1: expected})
+        self.assertLessEqual(len(shared), 256)
+
+    def test_minimax_alpha_beta_in_place_matches_copy(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for max_player in [True, False]:
+                board = Board(config)
+                value, new_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), max_player, game,
+                                                      eval_params)
+                ref_value, ref_board = minimax_alpha_beta(board, 2, float('-inf'), float('inf'), max_player, game,
+                                                          eval_params, in_place=False)
+
+                self.assertEqual(value, ref_value)
+                self.assertTrue(compare_boards(new_board, ref_board))
+                self.assertEqual(board.to_board_config(), config)
+
+    def test_zobrist_hash_is_incremental(self):
+
+        game = Game()
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for board in [Board(config), BitBoard(config)]:
+                self.assertEqual(board.hash, zobrist.hash_board(board))
+                for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                    for child in game.generate_all_moves(board, color):
+                        self.assertEqual(child.hash, zobrist.hash_board(child))
+
+                    for piece, move, captured_pieces, _ in game.generate_all_move_descriptors(board, color):
+                        undo = game.make_move(board, piece, move, captured_pieces)
+                        self.assertEqual(board.hash, zobrist.hash_board(board))
+                        game.unmake_move(board, undo)
+                        self.assertEqual(board.hash, zobrist.hash_board(board))
+
+    def test_minimax_alpha_beta_transposition_table(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        for config in [None, board_configs.board_config1, board_configs.board_config7]:
+            board = Board(config)
+            value, _ = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+            tt = TranspositionTable(1 << 12)
+            tt_value, tt_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params,
+                                                    tt=tt)
+            self.assertEqual(tt_value, value)
+            self.assertGreater(tt.stores, 0)
+
+            # A second search of the same position is answered from the table below the root.
+            hits = tt.hits
+            tt.new_search()
+            self.assertEqual(minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params,
+                                                tt=tt)[0], value)
+            self.assertGreater(tt.hits, hits)
+
+    def test_transposition_table_replacement(self):
+
+        tt = TranspositionTable(4)
+        tt.store(1, 3, 1.0, EXACT, None)
+        tt.store(5, 1, 2.0, EXACT, None)
+        self.assertEqual(tt.probe(1).score, 1.0)
+        self.assertIsNone(tt.probe(5))
+
+        tt.new_search()
+        tt.store(5, 1, 2.0, EXACT, None)
+        self.assertIsNone(tt.probe(1))
+        self.assertEqual(tt.probe(5).score, 2.0)
+
+    def test_iterative_deepening(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        for config in [None, board_configs.board_config1, board_configs.board_config7]:
+            board = Board(config)
+            value, _ = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+            result = iterative_deepening(board, game, 60000, eval_params=eval_params, tt=TranspositionTable(),
+                                         max_depth=3)
+            self.assertEqual(result.depth, 3)
+            self.assertEqual(result.score, value)
+            self.assertGreater(result.nodes, 0)
+            self.assertEqual(board.to_board_config(), Board(config).to_board_config())
+
+    def test_iterative_deepening_time_budget(self):
+
+        game = Game()
+        board = Board()
+
+        result = iterative_deepening(board, game, 1)
+        children = game.generate_all_moves(board, PLAYER2_PIECE_COLOR)
+        self.assertGreaterEqual(result.depth, 1)
+        self.assertTrue(any(compare_boards(result.board, child) for child in children))
+        self.assertLess(result.elapsed_ms, 1000)
+
+    def test_ai_player(self):
+
+        game = Game()
+        board = Board(board_configs.board_config1)
+        children = game.generate_all_moves(board, PLAYER2_PIECE_COLOR)
+
+        player = AIPlayer(200, eval_params=(1.0, 1.0, 0.5, 0.5, 0.25), tt=TranspositionTable())
+        self.assertIsNone(player.poll())
+        player.start(board)
+        self.assertTrue(player.thinking)
+        with self.assertRaises(RuntimeError):
+            player.start(board)
+        result = player.wait(10)
+        self.assertIsNotNone(result)
+        self.assertFalse(player.thinking)
+        self.assertIsNone(player.poll())
+        self.assertTrue(any(compare_boards(result.board, child) for child in children))
+        self.assertEqual(player.progress.depth, result.depth)
+        self.assertEqual(board.to_board_config(), board_configs.board_config1)
+
+        # A cancelled search delivers the best move found so far.
+        player = AIPlayer(60000)
+        player.start(board)
+        while player.progress is None or player.progress.depth < 2:
+            time.sleep(0.01)
+        player.cancel()
+        result = player.wait(10)
+        self.assertIsNotNone(result)
+        self.assertLess(result.elapsed_ms, 60000)
+        self.assertGreaterEqual(result.depth, 2)
+        self.assertTrue(any(compare_boards(result.board, child) for child in children))
+
+    def test_ai_player_pondering(self):
+
+        game = Game()
+        board = Board()
+        piece, move, captured_pieces, _ = game.generate_all_move_descriptors(board, PLAYER1_PIECE_COLOR)[0]
+        game.make_move(board, piece, move, captured_pieces)
+
+        player = AIPlayer(300, tt=TranspositionTable())
+        player.start(board)
+        result = player.wait(10)
+        self.assertGreaterEqual(len(result.pv), 2)
+
+        # The human plays the predicted reply: the ponder search becomes the AI's search.
+        board = result.board
+        player.ponder(board)
+        self.assertTrue(player.pondering)
+        self.assertFalse(player.thinking)
+        self.assertIsNone(player.poll())
+        time.sleep(0.1)
+        replies = {_move_key(descriptor): descriptor
+                   for descriptor in game.generate_all_move_descriptors(board, PLAYER1_PIECE_COLOR)}
+        piece, move, captured_pieces, _ = replies.pop(result.pv[1])
+        predicted = deepcopy(board)
+        game.make_move(predicted, predicted.get_piece(piece.row, piece.col), move, captured_pieces)
+        player.start(predicted)
+        self.assertTrue(player.thinking)
+        result = player.wait(10)
+        self.assertEqual(player.ponder_hits, 1)
+        self.assertGreaterEqual(player.ponder_saved_ms, 100)
+        self.assertTrue(any(compare_boards(result.board, child)
+                            for child in game.generate_all_moves(predicted, PLAYER2_PIECE_COLOR)))
+
+        # The human plays another reply: the AI searches it from scratch.
+        board = result.board
+        player.ponder(board)
+        replies = {_move_key(descriptor): descriptor
+                   for descriptor in game.generate_all_move_descriptors(board, PLAYER1_PIECE_COLOR)}
+        if len(result.pv) >= 2:
+            del replies[result.pv[1]]
+        piece, move, captured_pieces, _ = next(iter(replies.values()))
+        game.make_move(board, board.get_piece(piece.row, piece.col), move, captured_pieces)
+        player.start(board)
+        result = player.wait(10)
+        self.assertEqual(player.ponder_misses, 1)
+        self.assertEqual(player.ponder_hit_rate(), 0.5)
+        self.assertEqual(player.saved_ms_per_move(), player.ponder_saved_ms / 3)
+        self.assertTrue(any(compare_boards(result.board, child)
+                            for child in game.generate_all_moves(board, PLAYER2_PIECE_COLOR)))
+
+        player.ponder(result.board)
+        player.stop()
+        self.assertFalse(player.pondering)
+        self.assertIsNone(player.poll())
+
+    def test_move_ordering(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        nodes = ordered_nodes = 0
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+
+            search = Search(game, eval_params)
+            value, _ = search.search(Board(config), 4, float('-inf'), float('inf'), True)
+            ordered_search = Search(game, eval_params, ordering=True)
+            ordered_value, _ = ordered_search.search(Board(config), 4, float('-inf'), float('inf'), True)
+
+            self.assertEqual(ordered_value, value)
+            nodes += search.nodes
+            ordered_nodes += ordered_search.nodes
+            self.assertGreaterEqual(ordered_search.first_move_cutoff_rate(), 0.5)
+
+        self.assertLess(ordered_nodes, nodes)
+
+    def test_principal_variation_search(self):
+
+        game = Game()
+        weights = (1.0, 1.0, 0.5, 0.5, 0.25)
+        # The positions, depths and weights of the minimax_alpha_beta tests.
+        cases = [(None, 1, None), (None, 2, None), (None, 3, None), (None, 1, weights), (None, 2, weights),
+                 (None, 3, weights), (1, 3, weights), (2, 4, weights), (3, 3, weights), (4, 3, weights),
+                 (6, 3, (0.0, 1.0, 1.0, 0.0, 0.25)), (7, 2, weights), (9, 4, (1.0, 1.0, 0.0, 0.0, 1.0)),
+                 (10, 4, (0.0, 0.0, 0.0, 0.0, 0.0)), (11, 3, (1.0, 1.0, 1.5, 1.5, 1.25)), (12, 3, (1.0, 1.0, 1.0, 1.0, 1.0))]
+        nodes = pvs_nodes = 0
+        for config, depth, eval_params in cases:
+            config = getattr(board_configs, f'board_config{config}') if config else None
+            for ordering in [False, True]:
+                search = Search(game, eval_params, ordering=ordering)
+                value, move = search.search(Board(config), depth, float('-inf'), float('inf'), True)
+                pvs_search = Search(game, eval_params, ordering=ordering, algorithm='pvs')
+                pvs_value, pvs_move = pvs_search.search(Board(config), depth, float('-inf'), float('inf'), True)
+                self.assertEqual(pvs_value, value)
+                self.assertEqual(_move_key(pvs_move), _move_key(move))
+                if not ordering:
+                    nodes += search.nodes
+                    pvs_nodes += pvs_search.nodes
+
+            value, new_board = minimax_alpha_beta(Board(config), depth, float('-inf'), float('inf'), True, game,
+                                                  eval_params)
+            pvs_value, pvs_board = minimax_alpha_beta(Board(config), depth, float('-inf'), float('inf'), True, game,
+                                                      eval_params, algorithm='pvs')
+            self.assertEqual(pvs_value, value)
+            self.assertTrue(compare_boards(pvs_board, new_board))
+        self.assertLess(pvs_nodes, nodes)
+
+        # Aspiration windows change the windows searched, not the score.
+        board = Board(board_configs.board_config1)
+        result = iterative_deepening(board, game, float('inf'), eval_params=weights, tt=TranspositionTable(),
+                                     max_depth=4)
+        for algorithm in ai.SEARCH_ALGORITHMS:
+            aspiration_result = iterative_deepening(board, game, float('inf'), eval_params=weights,
+                                                    tt=TranspositionTable(), max_depth=4, algorithm=algorithm,
+                                                    aspiration_window=ai.ASPIRATION_WINDOW)
+            self.assertEqual(aspiration_result.score, result.score)
+            self.assertEqual(aspiration_result.depth, 4)
+
+        with self.assertRaises(ValueError):
+            Search(game, algorithm='negamax')
+
+    def test_order_moves_puts_captures_first(self):
+
+        game = Game()
+        board = Board(board_configs.board_config1)
+        search = Search(game, ordering=True)
+
+        descriptors = search.order_moves(game.generate_all_move_descriptors(board, PLAYER2_PIECE_COLOR), 0)
+        num_captured = [len(captured_pieces) for _, _, captured_pieces, _ in descriptors]
+        self.assertEqual(num_captured, sorted(num_captured, reverse=True))
+        self.assertGreater(num_captured[0], 0)
+
+    def test_parallel_minimax_alpha_beta(self):
+
+        game = Game()
+        cases = [(None, 3, None), (board_configs.board_config1, 3, (1.0, 1.0, 0.5, 0.5, 0.25)),
+                 (board_configs.board_config7, 2, (1.0, 1.0, 0.5, 0.5, 0.25)),
+                 (board_configs.board_config11, 3, (1.0, 1.0, 1.5, 1.5, 1.25))]
+        for config, depth, eval_params in cases:
+            for max_player in [True, False]:
+                board = Board(config)
+                value, new_board = minimax_alpha_beta(board, depth, float('-inf'), float('inf'), max_player, game,
+                                                      eval_params)
+                parallel_value, parallel_board = minimax_alpha_beta(board, depth, float('-inf'), float('inf'),
+                                                                    max_player, game, eval_params, workers=2)
+
+                self.assertEqual(parallel_value, value)
+                self.assertTrue(compare_boards(parallel_board, new_board))
+
+        # The options the workers do not support are refused rather than ignored.
+        for options in [{'tt': TranspositionTable()}, {'ordering': True}, {'algorithm': 'pvs'}]:
+            with self.assertRaises(ValueError):
+                minimax_alpha_beta(Board(), 3, float('-inf'), float('inf'), True, game, workers=2, **options)
+
+
+    def test_incremental_evaluator(self):
+
+        game = Game()
+        colors = [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        for b in range(0, 28):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for board in [Board(config), BitBoard(config)]:
+                evaluator = IncrementalEvaluator(board, game)
+                for color in colors:
+                    self.assertEqual(evaluator.counts(color), counts(board, game, color))
+                self.assertEqual(evaluator.evaluate(*eval_params), evaluate(board, game, *eval_params))
+
+                # Two plies deep from every position, for both sides to move.
+                for color in colors:
+                    other = colors[1 - colors.index(color)]
+                    for piece, move, captured_pieces, _ in game.generate_all_move_descriptors(board, color):
+                        undo = game.make_move(board, piece, move, captured_pieces)
+                        evaluator.apply(undo)
+                        for reply in game.generate_all_move_descriptors(board, other):
+                            reply_undo = game.make_move(board, *reply[:3])
+                            evaluator.apply(reply_undo)
+                            for counted_color in colors:
+                                self.assertEqual(evaluator.counts(counted_color), counts(board, game, counted_color))
+                            game.unmake_move(board, reply_undo)
+                            evaluator.revert()
+                        for counted_color in colors:
+                            self.assertEqual(evaluator.counts(counted_color), counts(board, game, counted_color))
+                        game.unmake_move(board, undo)
+                        evaluator.revert()
+
+                for color in colors:
+                    self.assertEqual(evaluator.counts(color), counts(board, game, color))
+
+    def test_minimax_alpha_beta_incremental_matches_evaluate(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            search = Search(game, eval_params)
+            full_search = Search(game, eval_params, incremental=False)
+            self.assertEqual(search.search(Board(config), 3, float('-inf'), float('inf'), True)[0],
+                             full_search.search(Board(config), 3, float('-inf'), float('inf'), True)[0])
+
+    @unittest.skipIf(batch_eval.np is None, 'NumPy is not installed')
+    def test_batch_evaluate(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        boards = []
+        for b in range(0, 28):
+            board = Board(getattr(board_configs, f'board_config{b + 1}'))
+            boards.append(board)
+            for color in [PLAYER1_PIECE_COLOR, PLAYER2_PIECE_COLOR]:
+                boards.extend(game.generate_all_moves(board, color))
+
+        positions = batch_eval.encode_boards(boards)
+        terms = batch_eval.batch_counts(positions)
+        scores = batch_eval.batch_evaluate(positions, *eval_params).tolist()
+        for index, board in enumerate(boards):
+            self.assertEqual(terms[index, 0].tolist(), list(counts(board, game, PLAYER1_PIECE_COLOR)))
+            self.assertEqual(terms[index, 1].tolist(), list(counts(board, game, PLAYER2_PIECE_COLOR)))
+            self.assertEqual(scores[index], evaluate(board, game, *eval_params))
+
+    @unittest.skipIf(batch_eval.np is None, 'NumPy is not installed')
+    def test_search_batch_leaves(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        for b in range(0, 12):
+            config = getattr(board_configs, f'board_config{b + 1}')
+            for tt in [None, TranspositionTable()]:
+                search = Search(game, eval_params, tt=tt, ordering=True)
+                batch_search = Search(game, eval_params, tt=tt and TranspositionTable(), ordering=True,
+                                      batch_leaves=True)
+                value, move = search.search(Board(config), 3, float('-inf'), float('inf'), True)
+                batch_value, batch_move = batch_search.search(Board(config), 3, float('-inf'), float('inf'), True)
+
+                self.assertEqual(batch_value, value)
+                self.assertEqual(batch_search.nodes, search.nodes)
+                if move is not None:
+                    self.assertEqual(_move_key(batch_move), _move_key(move))
+
+    def test_selfplay(self):
+
+        game = Game()
+        player1, player2 = selfplay.SideConfig(1, None), selfplay.SideConfig(2, (1.0, 1.0, 0.5, 0.5, 0.25))
+        records = list(selfplay.run_selfplay(3, player1, player2, workers=1, random_plies=2, max_plies=40, seed=7))
+        self.assertEqual([record['game'] for record in records], [0, 1, 2])
+        self.assertEqual(records, list(selfplay.run_selfplay(3, player1, player2, workers=2, random_plies=2,
+                                                             max_plies=40, seed=7, max_pending=2)))
+
+        # The tasks are read only a bounded distance ahead of the results, and not at all after the caller stops.
+        consumed = []
+
+        def tasks():
+            for index in range(20):
+                consumed.append(index)
+                yield index, 2
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for index, result in enumerate(selfplay.bounded_map(executor, pow, tasks(), 3)):
+                self.assertEqual(result, index ** 2)
+                self.assertLessEqual(len(consumed), index + 3)
+                if index == 5:
+                    break
+        self.assertEqual(len(consumed), 8)
+
+        for record in records:
+            self.assertEqual(len(record['moves']), record['plies'])
+            self.assertEqual(len(record['nodes']), record['plies'])
+            self.assertEqual(record['nodes'][:2], [0, 0])
+            self.assertTrue(all(nodes > 0 for nodes in record['nodes'][2:]))
+
+            # Every recorded move is legal when replayed.
+            board, color = Board(), PLAYER1_PIECE_COLOR
+            for from_row, from_col, to_row, to_col in record['moves']:
+                piece = board.get_piece(from_row, from_col)
+                self.assertEqual(piece.color, color)
+                moves = {tuple(move): captured for move, captured, _ in game.find_moves(board, piece)}
+                self.assertIn((to_row, to_col), moves)
+                game.make_move(board, piece, (to_row, to_col), moves[(to_row, to_col)])
+                color = PLAYER2_PIECE_COLOR if color == PLAYER1_PIECE_COLOR else PLAYER1_PIECE_COLOR
+
+            if record['result'] == selfplay.DRAW:
+                self.assertEqual(record['plies'], 40)
+            else:
+                self.assertEqual(game.generate_all_moves(board, color), [])
+
+    def test_analyse_positions(self):
+
+        game = Game()
+        configs = [getattr(board_configs, f'board_config{b + 1}') for b in range(12)]
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        results = list(analysis.analyse_positions(configs, 3, workers=1, eval_params=eval_params))
+        self.assertEqual([result.index for result in results], list(range(12)))
+        for config, result in zip(configs, results):
+            board = Board(config)
+            score, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+            self.assertEqual(result.score, score)
+            self.assertGreater(result.nodes, 0)
+            (from_row, from_col), (to_row, to_col) = result.move
+            piece = board.get_piece(from_row, from_col)
+            moves = {tuple(move): captured for move, captured, _ in game.find_moves(board, piece)}
+            game.make_move(board, piece, (to_row, to_col), moves[(to_row, to_col)])
+            self.assertTrue(compare_boards(board, new_board))
+
+        # The pool returns the same results in input order, reading the input only a bounded distance ahead.
+        consumed = []
+
+        def positions():
+            for index, config in enumerate(configs):
+                consumed.append(index)
+                yield config
+
+        pooled = []
+        for result in analysis.analyse_positions(positions(), 3, workers=2, eval_params=eval_params, max_pending=3):
+            self.assertLessEqual(len(consumed), result.index + 3)
+            pooled.append(result)
+        self.assertEqual([result[:4] for result in pooled], [result[:4] for result in results])
+
+        # A side without pieces has lost: the search scores it infinite, which the records hold as the winner instead.
+        lost = [[0] * 8 for _ in range(8)]
+        lost[0][1], lost[7][0] = 1, 1
+        for max_player, winner in ((True, 'player1'), (False, 'player1')):
+            record = analysis._result_record(analysis.analyse_position(0, lost, 3, max_player))
+            self.assertEqual((record['score'], record['winner']), (None, winner))
+            json.dumps(record, allow_nan=False)
+        lost[0][1], lost[7][0] = 2, 2
+        record = analysis._result_record(analysis.analyse_position(0, lost, 3, False))
+        self.assertEqual((record['score'], record['winner'], record['move']), (None, 'player2', None))
+        self.assertEqual(analysis._result_record(results[0])['score'], results[0].score)
+
+    def test_game_server(self):
+
+        async def request(reader, writer, **request):
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        async def play(port, moves):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            game = (await request(reader, writer, op='new', time_budget_ms=20))['game']
+            responses = [await request(reader, writer, id=ply, op='move', game=game, move=move)
+                         for ply, move in enumerate(moves)]
+            writer.close()
+            return responses
+
+        async def scenario():
+            server = GameServer(workers=2, max_queue=8)
+            listener = await server.serve_tcp()
+            port = listener.sockets[0].getsockname()[1]
+            try:
+                games = await asyncio.gather(*(play(port, [[5, 0, 4, 1]]) for _ in range(4)))
+
+                # The games of a connection end when it closes.
+                for _ in range(100):
+                    if not server.sessions:
+                        break
+                    await asyncio.sleep(0.01)
+                remaining = len(server.sessions)
+
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                unknown = await request(reader, writer, op='state', game=1)
+                new = await request(reader, writer, op='new', board=board_configs.board_config1)
+                illegal = await request(reader, writer, op='move', game=new['game'], move=[5, 0, 3, 2])
+                stats = await request(reader, writer, op='stats')
+
+                # Malformed requests get an error reply rather than no reply at all.
+                malformed = [await request(reader, writer, op='state', game=[1]),
+                             await request(reader, writer, op=[1]),
+                             await request(reader, writer, op='state', game=True),
+                             await request(reader, writer, op='move', game=new['game'], move=[5, 6, 4, True])]
+                light = [[0] * 8 for _ in range(8)]
+                light[0][0], light[5][0], light[1][2] = 2, 1, 2
+                malformed.append(await request(reader, writer, op='new', board=light))
+                for budget in (b'NaN', b'true'):
+                    writer.write(b'{"op":"new","time_budget_ms":' + budget + b'}\n')
+                    await writer.drain()
+                    malformed.append(json.loads(await reader.readline()))
+
+                # A failed search takes the client's move back.
+                async def fail(session):
+                    raise RuntimeError('search failed')
+
+                server._search = fail
+                failed = await request(reader, writer, op='move', game=new['game'], move=[5, 6, 4, 7])
+                state = await request(reader, writer, op='state', game=new['game'])
+                writer.close()
+            finally:
+                listener.close()
+                server.close()
+            return games, remaining, illegal, unknown, new, stats, malformed, failed, state
+
+        games, remaining, illegal, unknown, new, stats, malformed, failed, state = asyncio.run(scenario())
+        for (response,) in games:
+            self.assertEqual(response['id'], 0)
+            self.assertEqual(response['turn'], 'player1')
+            self.assertIsNone(response['winner'])
+            self.assertEqual(response['board'][5][0], 0)
+            self.assertEqual(response['board'][4][1], 1)
+
+            # The AI's reply is a legal move from the position after the client's move.
+            board = Board()
+            game = Game()
+            game.make_move(board, board.get_piece(5, 0), (4, 1), [])
+            from_row, from_col, to_row, to_col = response['ai_move']
+            piece = board.get_piece(from_row, from_col)
+            self.assertEqual(piece.color, PLAYER2_PIECE_COLOR)
+            moves = {tuple(move): captured for move, captured, _ in game.find_moves(board, piece)}
+            game.make_move(board, piece, (to_row, to_col), moves[(to_row, to_col)])
+            self.assertEqual(response['board'], board.to_board_config())
+
+        self.assertEqual(remaining, 0)
+        self.assertIn('illegal move', illegal['error'])
+        self.assertIn('unknown game', unknown['error'])
+        self.assertEqual(new['board'], board_configs.board_config1)
+        self.assertEqual(stats['games'], 1)
+        self.assertEqual(stats['moves'], 4)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertLessEqual(stats['latency_ms']['p50'], stats['latency_ms']['p99'])
+        self.assertIn('unknown game', malformed[0]['error'])
+        self.assertIn('unknown op', malformed[1]['error'])
+        self.assertIn('unknown game', malformed[2]['error'])
+        self.assertIn('move must be', malformed[3]['error'])
+        self.assertIn('light square', malformed[4]['error'])
+        for response in malformed[5:]:
+            self.assertIn('time_budget_ms', response['error'])
+        self.assertIn('search failed', failed['error'])
+        self.assertEqual((state['board'], state['turn']), (board_configs.board_config1, 'player1'))
+
+    def test_position_encoding(self):
+
+        for config in [None] + [getattr(board_configs, f'board_config{b + 1}') for b in range(28)]:
+            for board_class in [Board, BitBoard]:
+                board = board_class(config)
+                data = encoding.encode(board)
+                self.assertEqual(len(data), 12)
+                for decode_class in [Board, BitBoard]:
+                    decoded = encoding.decode(data, decode_class)
+                    self.assertIsInstance(decoded, decode_class)
+                    self.assertEqual(decoded.to_board_config(), board.to_board_config())
+                    self.assertEqual(decoded.hash, board.hash)
+
+    def test_game_record_file(self):
+
+        player = selfplay.SideConfig(1, None)
+        records = list(selfplay.run_selfplay(2, player, player, workers=1, random_plies=2, max_plies=30))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.ckgr')
+            for record in records:
+                # Reopening the file appends to it.
+                with encoding.GameRecordWriter(path) as writer:
+                    writer.write_game(record['game'], selfplay.record_boards(record),
+                                      selfplay.RESULT_CODES[record['result']])
+
+            with encoding.GameRecordReader(path) as reader:
+                self.assertEqual(len(reader), sum(record['plies'] + 1 for record in records))
+                self.assertEqual(list(reader)[-1], reader[-1])
+
+                index = 0
+                for record in records:
+                    for ply, board in enumerate(selfplay.record_boards(record)):
+                        position = reader[index]
+                        self.assertEqual((position.game, position.ply, position.side, position.result),
+                                         (record['game'], ply, 1 + ply % 2, selfplay.RESULT_CODES[record['result']]))
+                        self.assertEqual(reader.board(index).to_board_config(), board.to_board_config())
+                        index += 1
+
+            with open(path, 'r+b') as file:
+                file.write(b'XXXX')
+            with self.assertRaises(ValueError):
+                encoding.GameRecordReader(path)
+
+            # A writer that refuses the file closes it again.
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                with self.assertRaises(ValueError):
+                    encoding.GameRecordWriter(path)
+                gc.collect()
+            self.assertEqual([warning for warning in caught if warning.category is ResourceWarning], [])
+
+    def test_opening_book(self):
+
+        game = Game()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'book.bin')
+            count = opening_book.build_book(path, plies=3, depth=2, workers=1)
+            positions = opening_book.book_positions(3)
+            self.assertEqual(count, len(positions))
+
+            with opening_book.OpeningBook(path) as book:
+                self.assertEqual(len(book), count)
+                for board, max_player in positions:
+                    entry = book.probe(board, max_player)
+                    self.assertEqual(entry, opening_book.search_position(board, max_player, 2))
+
+                # The AI plays the book move without searching.
+                board = Board()
+                entry = book.probe(board, False)
+                result = iterative_deepening(board, game, 1000, max_player=False, book=book)
+                self.assertEqual(result.nodes, 0)
+                self.assertEqual(result.score, entry.score)
+                self.assertEqual(result.pv, [entry.move])
+                (from_row, from_col), (to_row, to_col) = entry.move
+                self.assertEqual(result.board.get_piece(from_row, from_col), 0)
+                self.assertNotEqual(result.board.get_piece(to_row, to_col), 0)
+                self.assertGreater(book.saved_ms, 0)
+
+                # Positions beyond the book are searched.
+                hits = book.hits
+                result = iterative_deepening(Board(board_configs.board_config1), game, 1000, book=book, max_depth=2)
+                self.assertGreater(result.nodes, 0)
+                self.assertEqual(book.hits, hits)
+                self.assertLess(book.hit_rate(), 1.0)
+
+    def test_tablebase(self):
+
+        game = Game()
+        solved = tablebase.generate(2, workers=1)
+        self.assertEqual(solved, tablebase.generate(2, workers=2))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tablebase.bin')
+            tablebase.write_tablebase(path, 2, solved)
+
+            with tablebase.Tablebase(path) as table:
+                self.assertEqual(len(table), len(solved))
+                positions = tablebase.slice_positions(2)
+                for position in positions[::7]:
+                    player1, player2, kings, side = tablebase._unpack(position)
+                    value = table.lookup(player1, player2, kings, side)
+                    self.assertEqual(value, solved.get(position, tablebase.TablebaseValue(tablebase.DRAW, 0)))
+                    if value.result == tablebase.DRAW or value.distance > 6:
+                        continue
+
+                    # A plain search one ply deeper than the distance sees the end of the game.
+                    board = encoding.board_from_masks(player1, player2, kings, BitBoard)
+                    max_player = side == 2
+                    score, _ = Search(game).search(board, value.distance + 1, float('-inf'), float('inf'), max_player)
+                    self.assertEqual(score > 0, (value.result == tablebase.WIN) == max_player)
+                    self.assertEqual(abs(score), float('inf'))
+
+                # Positions with more pieces than the tablebase holds are not covered.
+                self.assertIsNone(table.probe(Board(board_configs.board_config11), True))
+
+                # Below the root, the search takes two-piece positions from the tablebase instead of searching them.
+                board = Board([[0, 0, 0, 0, 0, 0, 0, 0],
+                               [0, 0, 0, 0, 0, 0, 0, 0],
+                               [0, 0, 0, 0, 0, 0, 0, 0],
+                               [0, 0, 0, 0, 0, 0, 0, 0],
+                               [0, 0, 0, 0, 0, 0, 0, 0],
+                               [0, 0, 0, 0, 1, 0, 0, 0],
+                               [0, 0, 0, 22, 0, 0, 0, 0],
+                               [0, 0, 0, 0, 0, 0, 0, 0]])
+                search = Search(game, tablebase=table)
+                score, best_move = search.search(board, 6, float('-inf'), float('inf'), True)
+                plain_search = Search(game)
+                plain_score, _ = plain_search.search(board, 6, float('-inf'), float('inf'), True)
+                self.assertGreater(table.probes, 0)
+                self.assertIsNotNone(best_move)
+                self.assertGreater(score, 0)
+                self.assertEqual(plain_score, float('inf'))
+                self.assertLess(search.nodes, plain_search.nodes)
+
+    def test_search_stats(self):
+
+        game = Game()
+        eval_params = (1.0, 1.0, 0.5, 0.5, 0.25)
+        board = Board(board_configs.board_config1)
+        value, new_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params)
+
+        stats = SearchStats()
+        stats_value, stats_board = minimax_alpha_beta(board, 3, float('-inf'), float('inf'), True, game, eval_params,
+                                                      stats=stats)
+        self.assertEqual(stats_value, value)
+        self.assertTrue(compare_boards(stats_board, new_board))
+
+        search = Search(game, eval_params)
+        search.search(Board(board_configs.board_config1), 3, float('-inf'), float('inf'), True)
+        self.assertEqual(stats.nodes, search.nodes)
+        self.assertEqual(sum(stats.nodes_by_ply.values()), stats.nodes)
+        self.assertEqual(stats.nodes_by_ply[0], 1)
+        self.assertEqual(stats.leaves, stats.nodes_by_ply[3])
+        self.assertEqual(sum(stats.cutoffs_by_depth.values()), search.cutoffs)
+        self.assertGreater(stats.effective_branching_factor(), 1.0)
+        for phase in SearchStats.PHASES:
+            self.assertGreater(stats.phase_calls[phase], 0)
+            self.assertGreater(stats.phase_seconds[phase], 0.0)
+        self.assertLessEqual(stats.phase_seconds['generate_all_moves'], stats.elapsed_seconds)
+
+        # The instrumentation only touches the given game, and is removed after the search.
+        self.assertNotIn('find_moves', vars(game))
+        other = Game()
+        with SearchStats().instrument(game):
+            self.assertIn('find_moves', vars(game))
+            self.assertEqual(vars(other).keys() & {'find_moves', 'copy', 'iter_all_move_descriptors'}, set())
+        self.assertEqual(vars(game).keys() & {'find_moves', 'copy', 'iter_all_move_descriptors'}, set())
+
+        exported = json.loads(stats.to_json())
+        self.assertEqual(exported['nodes'], stats.nodes)
+        self.assertEqual(exported['cutoffs'], search.cutoffs)
+
+        stats = SearchStats()
+        result = iterative_deepening(Board(), game, 60000, eval_params=eval_params, max_depth=3, stats=stats)
+        self.assertEqual(len(stats.nodes_by_iteration), result.depth)
+        self.assertEqual(sum(stats.nodes_by_iteration), result.nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
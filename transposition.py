@@ -0,0 +1,93 @@
+from collections import namedtuple
+
+
+# Bound types of a stored score.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+TranspositionEntry = namedtuple('TranspositionEntry', ['key', 'depth', 'score', 'bound', 'best_move', 'generation'])
+
+
+class TranspositionTable:
+    def __init__(self, size=1 << 18):
+        """
+        Initializes a fixed-size transposition table. Positions are stored in the slot given by their hash modulo the
+        table size, so the table never grows beyond `size` entries.
+
+        The table is meant to be kept for the whole game and shared by every search in it. Scores depend on the
+        evaluation weights, so a table should only be shared between searches that use the same eval_params.
+
+        Args:
+            size (int, optional): The number of slots in the table
+        """
+
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        """
+        Removes every entry from the table and resets its counters.
+        """
+
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """
+        Marks the start of a new search (e.g. a new turn). Entries stored by earlier searches are kept and can still be
+        probed, but they are the first to be replaced.
+        """
+
+        self.generation += 1
+
+    def probe(self, key):
+        """
+        Looks up a position.
+
+        Args:
+            key (int): The Zobrist hash of the position, including the side to move
+
+        Returns:
+            TranspositionEntry: The stored entry for the position, or None if it is not in the table
+        """
+
+        self.probes += 1
+        entry = self.entries[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Stores the result of searching a position. The slot is overwritten if it is empty, holds an entry from an
+        earlier search, or holds an entry searched no deeper than this one. Otherwise the deeper entry from the current
+        search is kept.
+
+        Args:
+            key (int): The Zobrist hash of the position, including the side to move
+            depth (int): The depth the position was searched to
+            score (float): The score found for the position
+            bound (int): EXACT, LOWER_BOUND or UPPER_BOUND, depending on how the score relates to the search window
+            best_move (tuple, optional): An identifier of the best move found, used to order moves in later searches
+        """
+
+        index = key % self.size
+        entry = self.entries[index]
+        if entry is None or entry.generation != self.generation or depth >= entry.depth:
+            self.entries[index] = TranspositionEntry(key, depth, score, bound, best_move, self.generation)
+            self.stores += 1
+
+    def hit_rate(self):
+        """
+        Returns the fraction of probes that found their position.
+
+        Returns:
+            float: Hits divided by probes, or 0.0 if nothing was probed
+        """
+
+        return self.hits / self.probes if self.probes else 0.0
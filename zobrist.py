@@ -0,0 +1,65 @@
+from constants import ROWS, COLS
+import random
+
+
+# The keys come from a fixed seed so that every process (and every file built from hashes, such as an opening book)
+# agrees on the hash of a position.
+_random = random.Random(20241018)
+
+# One random 64-bit key per square for each kind of piece, indexed by the board configuration codes used by
+# Board.to_board_config(): 1 and 2 for Player 1 and Player 2 pieces, 11 and 22 for their kings.
+PIECE_KEYS = {code: [[_random.getrandbits(64) for _ in range(COLS)] for _ in range(ROWS)] for code in (1, 11, 2, 22)}
+
+# XOR-ed into a board hash when Player 2 (the AI, the maximizing player) is the side to move.
+SIDE_KEY = _random.getrandbits(64)
+
+
+def square_key(piece, row, col):
+    """
+    Returns the Zobrist key of whatever occupies a square.
+
+    Args:
+        piece (Piece): The piece on the square, or 0 if the square is empty
+        row (int): The row of the square
+        col (int): The column of the square
+
+    Returns:
+        int: The key of the piece on that square, or 0 for an empty square
+    """
+
+    if piece == 0:
+        return 0
+    return PIECE_KEYS[piece.code][row][col]
+
+
+def hash_pieces(pieces):
+    """
+    Computes the Zobrist hash of a placement of pieces from scratch, whatever the board representation it comes from.
+
+    Args:
+        pieces (iterable): A (code, row, col) tuple per piece, with the board configuration codes of PIECE_KEYS
+
+    Returns:
+        int: The 64-bit hash of the piece placement (the side to move is not included)
+    """
+
+    key = 0
+    for code, row, col in pieces:
+        key ^= PIECE_KEYS[code][row][col]
+    return key
+
+
+def hash_board(board):
+    """
+    Computes the Zobrist hash of a board from scratch. Boards keep their `hash` attribute up to date incrementally, so
+    this is mainly useful to initialize or check that attribute.
+
+    Args:
+        board (Board): The board to hash
+
+    Returns:
+        int: The 64-bit hash of the piece placement (the side to move is not included)
+    """
+
+    return hash_pieces((code, row, col) for row, config_row in enumerate(board.to_board_config())
+                       for col, code in enumerate(config_row) if code)